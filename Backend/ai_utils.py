@@ -1,8 +1,12 @@
 import os
 import json
 import re
-import requests
-from typing import Dict, Any, Optional, Tuple
+import asyncio
+import importlib.util
+import hashlib
+import httpx
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
+from tutor_cache import get_tutor_cache
 
 OPENROUTER_API_KEY = os.environ["OPENROUTER_API_KEY"]
 OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
@@ -18,6 +22,30 @@ WATCHDOG_MODEL = os.getenv("OPENROUTER_WATCHDOG_MODEL", "deepseek/deepseek-chat"
 APP_URL = os.getenv("APP_URL", "http://localhost")
 APP_TITLE = os.getenv("APP_TITLE", "Your Coding Tutor")
 
+# Total time allowed per call, by model (the draft is long, the watchdog verdict short)
+OPENROUTER_TIMEOUT_SEC = float(os.getenv("OPENROUTER_TIMEOUT_SEC", "60"))
+OPENROUTER_CONNECT_TIMEOUT_SEC = float(os.getenv("OPENROUTER_CONNECT_TIMEOUT_SEC", "5"))
+MODEL_TIMEOUTS_SEC: Dict[str, float] = {
+    MAIN_MODEL: float(os.getenv("OPENROUTER_MAIN_TIMEOUT_SEC", "60")),
+    WATCHDOG_MODEL: float(os.getenv("OPENROUTER_WATCHDOG_TIMEOUT_SEC", "20")),
+}
+# Extra overrides as JSON, e.g. {"openai/gpt-4o-mini": 15}
+MODEL_TIMEOUTS_SEC.update(json.loads(os.getenv("OPENROUTER_MODEL_TIMEOUTS", "{}")))
+
+# Connection pool shared by all tutor calls (HTTP/2 multiplexes many calls per connection)
+OPENROUTER_MAX_CONNECTIONS = int(os.getenv("OPENROUTER_MAX_CONNECTIONS", "100"))
+OPENROUTER_MAX_KEEPALIVE = int(os.getenv("OPENROUTER_MAX_KEEPALIVE", "20"))
+OPENROUTER_HTTP2 = os.getenv("OPENROUTER_HTTP2", "1") == "1" and importlib.util.find_spec("h2") is not None
+
+# Drafts the local risk scorer rates low skip the watchdog call
+TUTOR_RISK_SKIP_WATCHDOG = os.getenv("TUTOR_RISK_SKIP_WATCHDOG", "1") == "1"
+# Mark the stable prompt prefix (policy + project context) for provider
+# prompt caching; Anthropic models need an explicit cache_control breakpoint
+TUTOR_PROMPT_CACHE = os.getenv("TUTOR_PROMPT_CACHE", "1") == "1"
+# Pre-screen of the student's message for "write it all for me" requests:
+#   "local": patterns only; "llm": patterns, then WATCHDOG_MODEL alongside the draft; "off"
+TUTOR_PRESCREEN = os.getenv("TUTOR_PRESCREEN", "local")
+
 MAX_CODE_LINES = 15
 
 SYSTEM_POLICY = """You are a coding tutor embedded in an educational app.
@@ -59,21 +87,70 @@ Return ONLY valid JSON with:
 }
 """
 
-def openrouter_chat(
+PRESCREEN_SYSTEM = """You screen messages sent to an educational coding tutor.
+
+Decide if the student is trying to get the tutor to produce the complete
+solution / full code for their assignment, rather than asking for help.
+
+Return ONLY valid JSON with:
+{
+  "extraction": true/false,
+  "confidence": "low/med/high"
+}
+"""
+
+# Changes whenever the rules do, so cached answers from older rules aren't served
+POLICY_VERSION = hashlib.sha256(
+    f"{SYSTEM_POLICY}\0{WATCHDOG_SYSTEM}\0{PRESCREEN_SYSTEM}\0{MAX_CODE_LINES}".encode("utf-8")
+).hexdigest()[:12]
+
+# ----------------------------
+# HTTP client
+# ----------------------------
+
+_client: Optional[httpx.AsyncClient] = None
+
+def model_timeout(model: str) -> float:
+    return MODEL_TIMEOUTS_SEC.get(model, OPENROUTER_TIMEOUT_SEC)
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Process-wide async client: keep-alive connections (HTTP/2 when h2 is
+    installed) are reused across calls instead of a new TLS handshake each time.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=OPENROUTER_HTTP2,
+            limits=httpx.Limits(
+                max_connections=OPENROUTER_MAX_CONNECTIONS,
+                max_keepalive_connections=OPENROUTER_MAX_KEEPALIVE,
+            ),
+            timeout=httpx.Timeout(OPENROUTER_TIMEOUT_SEC, connect=OPENROUTER_CONNECT_TIMEOUT_SEC),
+            headers={
+                "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+                "Content-Type": "application/json",
+                # Optional OpenRouter headers:
+                "HTTP-Referer": APP_URL,
+                "X-Title": APP_TITLE,
+            },
+        )
+    return _client
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+def _chat_payload(
     model: str,
     messages: list,
-    system: Optional[str] = None,
-    max_tokens: int = 600,
-    temperature: float = 0.4,
-    response_format: Optional[dict] = None,
+    system: Optional[str],
+    max_tokens: int,
+    temperature: float,
+    response_format: Optional[dict],
 ) -> Dict[str, Any]:
-    headers = {
-        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-        "Content-Type": "application/json",
-        # Optional OpenRouter headers:
-        "HTTP-Referer": APP_URL,
-        "X-Title": APP_TITLE,
-    }
     payload: Dict[str, Any] = {
         "model": model,
         "messages": messages,
@@ -86,19 +163,83 @@ def openrouter_chat(
 
     if response_format:
         payload["response_format"] = response_format
+    return payload
 
-    r = requests.post(OPENROUTER_URL, headers=headers, data=json.dumps(payload), timeout=60)
+async def openrouter_chat(
+    model: str,
+    messages: list,
+    system: Optional[str] = None,
+    max_tokens: int = 600,
+    temperature: float = 0.4,
+    response_format: Optional[dict] = None,
+) -> Dict[str, Any]:
+    payload = _chat_payload(model, messages, system, max_tokens, temperature, response_format)
+    # The client's timeouts are per read; this bounds the whole call
+    r = await asyncio.wait_for(
+        get_http_client().post(OPENROUTER_URL, content=json.dumps(payload)),
+        timeout=model_timeout(model),
+    )
     r.raise_for_status()
     return r.json()
 
+async def openrouter_chat_stream(
+    model: str,
+    messages: list,
+    system: Optional[str] = None,
+    max_tokens: int = 600,
+    temperature: float = 0.4,
+) -> AsyncIterator[str]:
+    """
+    Like openrouter_chat, but yields the reply's text as it is generated.
+    Closing the generator early closes the connection, which stops generation.
+    """
+    payload = _chat_payload(model, messages, system, max_tokens, temperature, None)
+    payload["stream"] = True
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + model_timeout(model)
+
+    client = get_http_client()
+    # No read may stall longer than the whole call is allowed to take, and the
+    # total is checked per line (wait_for around a stream read would leave the
+    # response unclosable if the caller is cancelled mid-read)
+    request = client.build_request(
+        "POST",
+        OPENROUTER_URL,
+        content=json.dumps(payload),
+        timeout=httpx.Timeout(model_timeout(model), connect=OPENROUTER_CONNECT_TIMEOUT_SEC),
+    )
+    r = await client.send(request, stream=True)
+    try:
+        r.raise_for_status()
+        async for line in r.aiter_lines():
+            if loop.time() > deadline:
+                raise asyncio.TimeoutError()
+            # Server-sent events: "data: {...}" chunks, ": comments" as keep-alives
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                return
+            chunk = json.loads(data)
+            if chunk.get("error"):
+                raise RuntimeError(chunk["error"].get("message", "OpenRouter stream error"))
+            delta = (chunk.get("choices") or [{}])[0].get("delta", {}).get("content")
+            if delta:
+                yield delta
+    finally:
+        await r.aclose()
+
 def extract_text(resp: Dict[str, Any]) -> str:
     return resp["choices"][0]["message"]["content"]
 
+_CODE_BLOCK_RE = re.compile(r"```(?:\w+)?\n(.*?)```", flags=re.DOTALL)
+_SOLUTION_PHRASES = ("here is the full solution", "complete solution")
+
+def _block_lines(block: str) -> int:
+    return len(block.strip().splitlines()) if block.strip() else 0
+
 def count_code_lines(text: str) -> int:
-    blocks = re.findall(r"```(?:\w+)?\n(.*?)```", text, flags=re.DOTALL)
-    if not blocks:
-        return 0
-    return sum(len(b.strip().splitlines()) for b in blocks if b.strip())
+    return sum(_block_lines(b) for b in _CODE_BLOCK_RE.findall(text))
 
 def simple_post_filter(text: str) -> Tuple[bool, str]:
     """
@@ -106,11 +247,55 @@ def simple_post_filter(text: str) -> Tuple[bool, str]:
     """
     if count_code_lines(text) > MAX_CODE_LINES:
         return False, "Too much code in response."
-    if "here is the full solution" in text.lower() or "complete solution" in text.lower():
+    if any(p in text.lower() for p in _SOLUTION_PHRASES):
         return False, "Looks like a full solution."
     return True, ""
 
-def watchdog_check(
+class StreamingPostFilter:
+    """
+    simple_post_filter applied as the draft streams in, so a code dump is
+    cut off at the line that goes over MAX_CODE_LINES instead of after the
+    whole draft has been generated.
+
+    Closed code blocks are counted once and skipped on later feeds; only the
+    still-open block (treated as if it were closed now) is rescanned.
+    """
+
+    def __init__(self, max_code_lines: int = MAX_CODE_LINES):
+        self.max_code_lines = max_code_lines
+        self.text = ""
+        self.ok = True
+        self.reason = ""
+        self._pos = 0  # end of the last closed code block
+        self._closed_lines = 0
+        self._tail = ""  # end of the lowercased text, for phrases split across deltas
+        self._phrase_overlap = max(len(p) for p in _SOLUTION_PHRASES) - 1
+
+    def feed(self, delta: str) -> bool:
+        """
+        Add the next piece of the draft. Returns False once it breaks the policy.
+        """
+        if not self.ok:
+            return False
+        self.text += delta
+
+        window = self._tail + delta.lower()
+        if any(p in window for p in _SOLUTION_PHRASES):
+            self.ok, self.reason = False, "Looks like a full solution."
+            return False
+        self._tail = window[-self._phrase_overlap:]
+
+        for m in _CODE_BLOCK_RE.finditer(self.text, self._pos):
+            self._closed_lines += _block_lines(m.group(1))
+            self._pos = m.end()
+        open_block = _CODE_BLOCK_RE.search(self.text + "```", self._pos)
+        open_lines = _block_lines(open_block.group(1)) if open_block else 0
+        if self._closed_lines + open_lines > self.max_code_lines:
+            self.ok, self.reason = False, "Too much code in response."
+            return False
+        return True
+
+async def watchdog_check(
     user_prompt: str,
     assistant_draft: str,
     project_description: str,
@@ -119,22 +304,21 @@ def watchdog_check(
     """
     Ask watchdog to judge draft, with project context.
     """
-    wd_messages = [
+    # Same layout as the tutor: the stable policy + project prefix first
+    wd_messages = _context_messages(WATCHDOG_MODEL, WATCHDOG_SYSTEM, project_description) + [
         {"role": "user", "content": json.dumps({
-            "user_prompt": user_prompt,
-            "user_code": user_code,
-            "project_description": project_description,
-            "assistant_draft": assistant_draft,
             "policy_summary": (
                 "No complete solutions; hints OK; snippets <= 15 lines only if user provides attempt; "
                 "must follow project description."
-            )
+            ),
+            "user_prompt": user_prompt,
+            "user_code": user_code,
+            "assistant_draft": assistant_draft,
         })}
     ]
 
-    resp = openrouter_chat(
+    resp = await openrouter_chat(
         model=WATCHDOG_MODEL,
-        system=WATCHDOG_SYSTEM,
         messages=wd_messages,
         max_tokens=250,
         temperature=0.0,
@@ -146,6 +330,128 @@ def watchdog_check(
     except json.JSONDecodeError:
         return {"ok": False, "reason": "Watchdog returned invalid JSON", "risk": "high", "fix": "Refuse and provide hints."}
 
+# ----------------------------
+# Local risk tiering
+# ----------------------------
+
+# Markers of a complete program rather than a snippet
+_PROGRAM_RE = re.compile(
+    r"^\s*(?:def\s+\w+\s*\(|class\s+\w+|int\s+main\s*\(|fn\s+main\s*\(|"
+    r"public\s+static\s+void\s+main|#include\s*<|if\s+__name__\s*==|function\s+\w+\s*\()",
+    flags=re.MULTILINE,
+)
+_IDENT_RE = re.compile(r"[A-Za-z_]\w*")
+# A walkthrough in prose can give the solution away as surely as code
+_STEP_LINE_RE = re.compile(r"^\s*(?:step\s*\d+\b|\d+[.):]\s|[-*\u2022]\s)", flags=re.IGNORECASE | re.MULTILINE)
+_STEP_WORD_RE = re.compile(r"\bstep\s*\d+\b", flags=re.IGNORECASE)
+_SEQUENCE_RE = re.compile(
+    r"(?:^|[.!?:]\s+)(?:first(?:ly)?|second(?:ly)?|third(?:ly)?|next|then|after that|finally|lastly)\b",
+    flags=re.IGNORECASE | re.MULTILINE,
+)
+_COMPLETE_RE = re.compile(
+    r"\b(?:that'?s|that\s+is|this\s+is)\s+(?:all|everything)\s+(?:you\s+need|there\s+is)\b|"
+    r"\band\s+you(?:'re|\s+are)\s+done\b|\b(?:full|complete|whole)\s+solution\b",
+    flags=re.IGNORECASE,
+)
+# Longer than a hint usually is
+_LONG_DRAFT_CHARS = 1500
+
+_risk_counts = {"low": 0, "med": 0, "high": 0, "watchdog_skipped": 0}
+
+def assess_risk(draft: str, user_code: str) -> Dict[str, Any]:
+    """
+    Cheap local estimate of how likely the watchdog is to object to a draft
+    that already passed simple_post_filter.
+
+    Short prose hints are "low". Code raises the score with its size, its
+    share of the draft, how much of it is new (identifiers not in the
+    user's own code) and whether it looks like a complete program; prose
+    raises it with the number of steps it walks through, wording that
+    presents it as the whole answer, and length.
+    """
+    blocks = _CODE_BLOCK_RE.findall(draft)
+    code_lines = sum(_block_lines(b) for b in blocks)
+    code = "\n".join(blocks)
+    code_ratio = len(code) / len(draft) if draft else 0.0
+    idents = set(_IDENT_RE.findall(code))
+    new_ratio = len(idents - set(_IDENT_RE.findall(user_code))) / len(idents) if idents else 0.0
+    # Unfenced programs count too: the model doesn't always fence its code
+    complete_program = bool(_PROGRAM_RE.search(draft))
+    prose = _CODE_BLOCK_RE.sub("", draft)
+    steps = max(
+        len(_STEP_LINE_RE.findall(prose)),
+        len(set(m.lower().replace(" ", "") for m in _STEP_WORD_RE.findall(prose))),
+        len(_SEQUENCE_RE.findall(prose)),
+    )
+    presented_complete = bool(_COMPLETE_RE.search(prose))
+
+    score = 0
+    if complete_program:
+        score += 3
+    if code_lines > 10:
+        score += 3
+    elif code_lines > 3:
+        score += 2
+    elif code_lines > 0 and new_ratio > 0.3:
+        # A few lines are fine if they mostly quote the student's own code
+        score += 1
+    if code_ratio > 0.5:
+        score += 1
+    if code_lines > 0 and new_ratio > 0.5:
+        score += 1
+    # Multi-step walkthroughs always go to the watchdog
+    if steps >= 5:
+        score += 3
+    elif steps >= 3:
+        score += 2
+    if presented_complete:
+        score += 2
+    if len(draft) > _LONG_DRAFT_CHARS:
+        score += 1
+
+    tier = "low" if score == 0 else "med" if score < 3 else "high"
+    return {
+        "tier": tier,
+        "score": score,
+        "code_lines": code_lines,
+        "code_ratio": round(code_ratio, 3),
+        "new_code_ratio": round(new_ratio, 3),
+        "complete_program": complete_program,
+        "steps": steps,
+        "presented_complete": presented_complete,
+    }
+
+def risk_stats() -> Dict[str, Any]:
+    assessed = _risk_counts["low"] + _risk_counts["med"] + _risk_counts["high"]
+    return {
+        **_risk_counts,
+        "assessed": assessed,
+        "watchdog_skip_rate": round(_risk_counts["watchdog_skipped"] / assessed, 4) if assessed else 0.0,
+    }
+
+async def review_draft(
+    user_prompt: str,
+    assistant_draft: str,
+    project_description: str,
+    user_code: str
+) -> Dict[str, Any]:
+    """
+    Watchdog verdict for a draft, or a local approval without the watchdog
+    call when assess_risk rates it low (marked "watchdog": False; those
+    are never cached).
+    """
+    risk = assess_risk(assistant_draft, user_code)
+    _risk_counts[risk["tier"]] += 1
+    if risk["tier"] == "low" and TUTOR_RISK_SKIP_WATCHDOG:
+        _risk_counts["watchdog_skipped"] += 1
+        return {"ok": True, "reason": "Low risk (local check)", "risk": "low", "fix": "", "watchdog": False}
+    return await watchdog_check(
+        user_prompt=user_prompt,
+        assistant_draft=assistant_draft,
+        project_description=project_description,
+        user_code=user_code
+    )
+
 def _fallback_refusal(verdict: Dict[str, Any]) -> str:
     fix = verdict.get("fix") or "Break the problem into smaller parts; start with inputs/outputs and a minimal passing case."
     reason = verdict.get("reason") or "Policy risk detected."
@@ -157,64 +463,274 @@ def _fallback_refusal(verdict: Dict[str, Any]) -> str:
         "Question: What does your current attempt look like, and what specifically is failing?\n"
     )
 
-def call_llm(text_from_user: str, code: Optional[str], project_description: str) -> str:
+# ----------------------------
+# Prompt pre-screen
+# ----------------------------
+
+# Unmistakable requests for the whole solution, phrased as a request to the tutor
+_EXTRACTION_RES = [
+    re.compile(
+        r"(?:^|[.!?]\s+)(?:please\s+)?(?:(?:can|could|would|will)\s+you\s+(?:please\s+)?|just\s+)?"
+        r"(?:write|give|send|show|generate|provide|code)\s+(?:me\s+|us\s+)?(?:the|an?|my|this|your)?\s*"
+        r"(?:entire|whole|full|complete|finished|final)\s+"
+        r"(?:code|program|solution|app|application|project|assignment|answer|implementation|thing)\b"
+        # "the whole program structure", "the full solution outline": a request for a plan, not the code
+        r"(?!\s+(?:structure|outline|layout|design|overview|flow|architecture|plan|idea|logic)\b)",
+        flags=re.IGNORECASE,
+    ),
+    re.compile(
+        r"\b(?:write|give|send|show|generate|provide)\s+(?:me\s+|us\s+)?(?:the\s+)?(?:code|solution|answer|program)\s+"
+        r"for\s+(?:the|this|my)\s+(?:entire|whole|full|complete)\s+(?:project|assignment|program|app|application|thing)\b",
+        flags=re.IGNORECASE,
+    ),
+    re.compile(
+        r"\b(?:do|solve|finish|complete)\s+(?:(?:my|this|the)\s+(?:homework|assignment|project|problem|exercise|task)|this|it)"
+        r"\s+for\s+me\b",
+        flags=re.IGNORECASE,
+    ),
+    re.compile(r"\bjust\s+(?:give|send|write|show)\s+(?:me\s+)?(?:the\s+)?(?:code|answer|solution)\b", flags=re.IGNORECASE),
+]
+# Asking for a plan rather than the code: never blocked locally, left to the LLM screen
+_PLAN_RE = re.compile(r"\b(?:pseudo-?code|outline|skeleton|overview|diagram|flowchart)\b", flags=re.IGNORECASE)
+
+_prescreen_counts = {"screened": 0, "blocked_local": 0, "blocked_llm": 0, "drafts_cancelled": 0}
+
+def prescreen_local(text_from_user: str) -> bool:
     """
-    Main entry point for your app.
+    True if the message is clearly asking for the complete solution.
+    Borderline messages (a request that also asks for pseudocode or an
+    outline) are not blocked here; in "llm" mode the LLM screen decides.
+    """
+    text = text_from_user.strip()
+    if _PLAN_RE.search(text):
+        return False
+    return any(r.search(text) for r in _EXTRACTION_RES)
 
-    - Uses Claude Sonnet for tutoring answers.
-    - Uses a watchdog model to detect policy violations.
-    - Includes project_description in the context so the tutor stays on-task.
+async def prescreen_llm(text_from_user: str, project_description: str) -> bool:
     """
-    user_code = code or ""
+    Ask WATCHDOG_MODEL whether the message is a solution-extraction attempt.
+    Only a confident yes blocks; errors never do.
+    """
+    try:
+        resp = await openrouter_chat(
+            model=WATCHDOG_MODEL,
+            system=PRESCREEN_SYSTEM,
+            messages=[{"role": "user", "content": json.dumps({
+                "student_message": text_from_user,
+                "project_description": project_description,
+            })}],
+            max_tokens=40,
+            temperature=0.0,
+            response_format={"type": "json_object"}
+        )
+        verdict = json.loads(extract_text(resp))
+    except Exception:
+        return False
+    return verdict.get("extraction") is True and verdict.get("confidence") == "high"
 
-    # Build messages (keep context minimal; do not include hidden tests)
+def _prescreen_task(text_from_user: str, project_description: str) -> Optional["asyncio.Task[bool]"]:
+    """
+    Started alongside the draft in "llm" mode, else None.
+    """
+    if TUTOR_PRESCREEN != "llm":
+        return None
+    return asyncio.create_task(prescreen_llm(text_from_user, project_description))
+
+def _blocked_before_draft(text_from_user: str) -> bool:
+    if TUTOR_PRESCREEN == "off":
+        return False
+    _prescreen_counts["screened"] += 1
+    if prescreen_local(text_from_user):
+        _prescreen_counts["blocked_local"] += 1
+        return True
+    return False
+
+def prescreen_stats() -> Dict[str, Any]:
+    return {"mode": TUTOR_PRESCREEN, **_prescreen_counts}
+
+LOCAL_REFUSAL = (
+    "I can’t provide a full solution or large code dump for that.\n\n"
+    "Tell me what you’ve tried so far (or paste your current code), and I’ll help with:\n"
+    "- the next hint,\n"
+    "- what to fix,\n"
+    "- and how to test it.\n"
+)
+
+def _context_messages(model: str, system: str, project_description: str) -> List[Dict[str, Any]]:
+    """
+    System message with the policy followed by the project context: the part
+    of the prompt that is the same for every question about a project, so
+    the provider can cache it. Per-request content goes after it.
+    """
+    context = f"Project description (ground truth for this conversation):\n{project_description}"
+    if TUTOR_PROMPT_CACHE and model.startswith("anthropic/"):
+        return [{"role": "system", "content": [
+            {"type": "text", "text": system},
+            {"type": "text", "text": context, "cache_control": {"type": "ephemeral"}},
+        ]}]
+    # Other providers cache matching prefixes automatically
+    return [{"role": "system", "content": f"{system}\n\n{context}"}]
+
+def _tutor_messages(text_from_user: str, user_code: str, project_description: str) -> List[Dict[str, Any]]:
+    # Keep context minimal; do not include hidden tests
     content = {
         "text_from_user": text_from_user,
         "user_code": user_code,
-        "project_description": project_description,
         # You can pass UI state here too, e.g. "help_level_requested": 2
     }
-    messages = [{"role": "user", "content": json.dumps(content)}]
+    return _context_messages(MAIN_MODEL, SYSTEM_POLICY, project_description) + [
+        {"role": "user", "content": json.dumps(content)}
+    ]
 
-    # 1) Draft answer from Claude
-    draft_resp = openrouter_chat(
+async def call_llm(text_from_user: str, code: Optional[str], project_description: str) -> str:
+    """
+    Main entry point for your app.
+
+    - Uses Claude Sonnet for tutoring answers.
+    - Uses a watchdog model to detect policy violations.
+    - Includes project_description in the context so the tutor stays on-task.
+    """
+    user_code = code or ""
+    cache = get_tutor_cache()
+    if cache is not None:
+        cached = cache.get(text_from_user, user_code, project_description, MAIN_MODEL, POLICY_VERSION)
+        if cached is not None:
+            return cached
+    if _blocked_before_draft(text_from_user):
+        return LOCAL_REFUSAL
+    messages = _tutor_messages(text_from_user, user_code, project_description)
+
+    # 1) Draft answer from Claude, with the prompt pre-screen running alongside
+    draft_task = asyncio.create_task(openrouter_chat(
         model=MAIN_MODEL,
         messages=messages,
-        system=SYSTEM_POLICY,
         max_tokens=800,
         temperature=0.5,
-    )
+    ))
+    screen = _prescreen_task(text_from_user, project_description)
+    try:
+        if screen is not None and await screen:
+            _prescreen_counts["blocked_llm"] += 1
+            _prescreen_counts["drafts_cancelled"] += 1
+            return LOCAL_REFUSAL
+        draft_resp = await draft_task
+    finally:
+        draft_task.cancel()
+        if screen is not None:
+            screen.cancel()
     draft = extract_text(draft_resp)
 
     # 2) Local filter (cheap)
     ok_local, _why = simple_post_filter(draft)
     if not ok_local:
-        return (
-            "I can’t provide a full solution or large code dump for that.\n\n"
-            "Tell me what you’ve tried so far (or paste your current code), and I’ll help with:\n"
-            "- the next hint,\n"
-            "- what to fix,\n"
-            "- and how to test it.\n"
-        )
+        return LOCAL_REFUSAL
 
-    # 3) Watchdog review (LLM-based)
-    verdict = watchdog_check(
+    # 3) Watchdog review (LLM-based), unless the draft is low risk
+    verdict = await review_draft(
         user_prompt=text_from_user,
         assistant_draft=draft,
         project_description=project_description,
         user_code=user_code
     )
     if verdict.get("ok") is True:
+        # Only answers the watchdog approved are reused
+        if cache is not None and verdict.get("watchdog", True):
+            cache.set(text_from_user, user_code, project_description, MAIN_MODEL, POLICY_VERSION, draft)
         return draft
 
     # 4) If not ok: safe fallback
     return _fallback_refusal(verdict)
 
+async def _pump(stream: AsyncIterator[str], queue: "asyncio.Queue[Any]") -> None:
+    # Deltas, then None at the end, or the exception that ended the stream
+    try:
+        async for delta in stream:
+            queue.put_nowait(delta)
+        queue.put_nowait(None)
+    except Exception as e:
+        queue.put_nowait(e)
+    finally:
+        await stream.aclose()
+
+async def stream_llm(
+    text_from_user: str, code: Optional[str], project_description: str
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    call_llm as a stream of (event, data):
+      ("token", {"text"})         draft text as it is generated
+      ("blocked", {"reason", "response"})
+                                  the local filter cut the draft off; the
+                                  tokens already sent must be replaced by response
+      ("final", {"ok", "response"})
+                                  watchdog verdict on the complete draft; when
+                                  ok is false, response replaces the draft
+    Exactly one of "blocked" / "final" ends the stream. A cached answer
+    comes as a single "token" followed by "final" with "cached": true.
+    """
+    user_code = code or ""
+    cache = get_tutor_cache()
+    if cache is not None:
+        cached = cache.get(text_from_user, user_code, project_description, MAIN_MODEL, POLICY_VERSION)
+        if cached is not None:
+            yield "token", {"text": cached}
+            yield "final", {"ok": True, "response": cached, "cached": True}
+            return
+    if _blocked_before_draft(text_from_user):
+        yield "blocked", {"reason": "Asked for the complete solution.", "response": LOCAL_REFUSAL}
+        return
+    messages = _tutor_messages(text_from_user, user_code, project_description)
+    post_filter = StreamingPostFilter()
+
+    # The draft streams into a queue from its own task, so it keeps arriving
+    # while the pre-screen runs and can be cancelled the moment it blocks
+    deltas: "asyncio.Queue[Any]" = asyncio.Queue()
+    pump = asyncio.create_task(_pump(openrouter_chat_stream(
+        model=MAIN_MODEL,
+        messages=messages,
+        max_tokens=800,
+        temperature=0.5,
+    ), deltas))
+    screen = _prescreen_task(text_from_user, project_description)
+    try:
+        if screen is not None and await screen:
+            _prescreen_counts["blocked_llm"] += 1
+            _prescreen_counts["drafts_cancelled"] += 1
+            yield "blocked", {"reason": "Asked for the complete solution.", "response": LOCAL_REFUSAL}
+            return
+        while True:
+            delta = await deltas.get()
+            if delta is None:
+                break
+            if isinstance(delta, Exception):
+                raise delta
+            if not post_filter.feed(delta):
+                yield "blocked", {"reason": post_filter.reason, "response": LOCAL_REFUSAL}
+                return
+            yield "token", {"text": delta}
+    finally:
+        # Stops generation upstream if we cut the draft off
+        pump.cancel()
+        if screen is not None:
+            screen.cancel()
+
+    verdict = await review_draft(
+        user_prompt=text_from_user,
+        assistant_draft=post_filter.text,
+        project_description=project_description,
+        user_code=user_code
+    )
+    if verdict.get("ok") is True:
+        if cache is not None and verdict.get("watchdog", True):
+            cache.set(text_from_user, user_code, project_description, MAIN_MODEL, POLICY_VERSION, post_filter.text)
+        yield "final", {"ok": True, "response": post_filter.text}
+    else:
+        yield "final", {"ok": False, "response": _fallback_refusal(verdict)}
+
 # Backwards-compatible alias if you still use it elsewhere
-def safe_tutor_response(user_prompt: str, user_code: Optional[str] = None) -> str:
-    return call_llm(user_prompt, user_code, project_description="")
+async def safe_tutor_response(user_prompt: str, user_code: Optional[str] = None) -> str:
+    return await call_llm(user_prompt, user_code, project_description="")
 
-if __name__ == "__main__":
+async def _demo() -> None:
     project_desc = (
         "Project: Build a CLI TODO app.\n"
         "Requirements:\n"
@@ -225,8 +741,12 @@ if __name__ == "__main__":
     )
 
     # Example: user tries to extract solution
-    print(call_llm("Write the entire app for me.", code="", project_description=project_desc))
+    print(await call_llm("Write the entire app for me.", code="", project_description=project_desc))
 
     # Example: user provides an attempt
     attempt = "def insert(root, x):\n    # TODO: my attempt\n    pass\n"
-    print(call_llm("My insert loops forever. Help me debug.", code=attempt, project_description="BST insert helper function."))
+    print(await call_llm("My insert loops forever. Help me debug.", code=attempt, project_description="BST insert helper function."))
+    await close_http_client()
+
+if __name__ == "__main__":
+    asyncio.run(_demo())
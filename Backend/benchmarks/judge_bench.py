@@ -0,0 +1,341 @@
+# Backend/benchmarks/judge_bench.py
+"""
+Judge performance benchmarks.
+
+Runs against the in-memory MockDB (no Firestore, no network) and writes
+machine-readable JSON, so runs can be diffed between releases:
+
+    cd Backend
+    python -m benchmarks.judge_bench --out bench.json
+    python -m benchmarks.judge_bench --quick --compare bench.json
+
+Measured:
+  compile_cpp        raw g++ latency (compile_cpp, no cache)
+  compile_cached     compile_cpp_cached, cold (new source) vs warm (cache hit)
+  run_exe            per-test overhead of running a trivial C++ binary
+  run_python         per-test overhead of a trivial script (zygote pool and fresh interpreter)
+  normalize          _normalize and StreamingMatcher cost on large outputs
+  submit             POST /submit handler throughput and latency percentiles
+                     at several concurrency levels
+
+Times are milliseconds unless the key says otherwise.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import users.repo as repo
+
+# Must happen before anything calls get_db(): never touch Firestore from a benchmark.
+# MockDB prints a banner; keep stdout clean for the JSON report.
+with contextlib.redirect_stdout(sys.stderr):
+    repo._db = repo.MockDB()
+
+from judge.compare import StreamingMatcher  # noqa: E402
+from judge.compile_cache import compiler_version, get_compile_cache  # noqa: E402
+from judge.drivers import get_driver, run_python  # noqa: E402
+from judge.pool import JUDGE_WORKERS  # noqa: E402
+from judge.sandbox import run_limited  # noqa: E402
+from routers.cpp_file_compile import CPP_COMPILER, _normalize, compile_cpp, compile_cpp_cached  # noqa: E402
+
+BENCH_PART_ID = "bench_double"
+
+CPP_SOURCE = """#include <iostream>
+int main() {
+    long long x;
+    if (!(std::cin >> x)) return 0;
+    std::cout << 2 * x << "\\n";
+}
+"""
+PY_SOURCE = "print(2 * int(input()))\n"
+
+
+def _seed_part(cases: int) -> None:
+    repo.get_db().collection("parts").document(BENCH_PART_ID).set({
+        "name": "Benchmark: double the input",
+        "inputs": [f"{i}\n" for i in range(cases)],
+        "outputs": [f"{2 * i}\n" for i in range(cases)],
+        "time_limit_sec": 2.0,
+    })
+
+
+# ----------------------------
+# Helpers: timing / stats
+# ----------------------------
+
+def _ms(t0: float) -> float:
+    return (time.perf_counter() - t0) * 1000
+
+
+def _percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, int(round(p / 100 * (len(sorted_values) - 1)))))
+    return sorted_values[k]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    s = sorted(samples)
+    return {
+        "n": len(s),
+        "mean": round(sum(s) / len(s), 3) if s else 0.0,
+        "min": round(s[0], 3) if s else 0.0,
+        "p50": round(_percentile(s, 50), 3),
+        "p90": round(_percentile(s, 90), 3),
+        "p99": round(_percentile(s, 99), 3),
+        "max": round(s[-1], 3) if s else 0.0,
+    }
+
+
+def _timed(fn: Callable[[], Any], reps: int, warmup: int = 1) -> Dict[str, float]:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(_ms(t0))
+    return summarize(samples)
+
+
+# ----------------------------
+# Benchmarks
+# ----------------------------
+
+def bench_compile(work: Path, reps: int) -> Dict[str, Any]:
+    src = work / "main.cpp"
+    exe = work / "prog"
+
+    def unique_source() -> str:
+        # A fresh comment makes the source (and its cache key) new every time
+        return CPP_SOURCE + f"// {uuid.uuid4().hex}\n"
+
+    def raw() -> None:
+        src.write_text(CPP_SOURCE, encoding="utf-8")
+        rc, _, err = compile_cpp(str(src), str(exe))
+        if rc != 0:
+            raise RuntimeError(err)
+
+    def cached(code: str) -> None:
+        src.write_text(code, encoding="utf-8")
+        exe.unlink(missing_ok=True)
+        rc, _, err = compile_cpp_cached(code, str(src), str(exe))
+        if rc != 0:
+            raise RuntimeError(err)
+
+    return {
+        "compile_cpp": _timed(raw, reps),
+        "compile_cached": {
+            "cold": _timed(lambda: cached(unique_source()), reps, warmup=0),
+            "warm": _timed(lambda: cached(CPP_SOURCE), reps),
+        },
+    }
+
+
+def bench_run(work: Path, reps: int) -> Dict[str, Any]:
+    src = work / "main.cpp"
+    exe = work / "prog"
+    src.write_text(CPP_SOURCE, encoding="utf-8")
+    rc, _, err = compile_cpp_cached(CPP_SOURCE, str(src), str(exe))
+    if rc != 0:
+        raise RuntimeError(err)
+    py = work / "main.py"
+    py.write_text(PY_SOURCE, encoding="utf-8")
+
+    def check(run: Dict[str, Any]) -> None:
+        if run["exit_code"] != 0 or not run["output_matched"]:
+            raise RuntimeError(f"benchmark program failed: {run['stderr']}")
+
+    def exe_once() -> None:
+        check(get_driver("cpp").run(str(exe), "21\n", 2.0, matcher=StreamingMatcher("42")))
+
+    def py_pool_once() -> None:
+        check(run_python(str(py), "21\n", 5.0, matcher=StreamingMatcher("42")))
+
+    def py_fresh_once() -> None:
+        check(run_limited([sys.executable, str(py)], "21\n", 5.0, matcher=StreamingMatcher("42")))
+
+    return {
+        "run_exe": _timed(exe_once, reps),
+        "run_python": {
+            "default": _timed(py_pool_once, reps),
+            "fresh_interpreter": _timed(py_fresh_once, reps),
+        },
+    }
+
+
+def bench_normalize(sizes_mb: List[int], reps: int) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for mb in sizes_mb:
+        line = "12345 67890 some words here   \r\n"
+        text = line * (mb * 1024 * 1024 // len(line))
+        expected = _normalize(text)
+        data = text.encode("utf-8")
+
+        def streamed() -> None:
+            m = StreamingMatcher(expected)
+            for i in range(0, len(data), 64 * 1024):
+                m.feed(data[i:i + 64 * 1024])
+            if not m.finish():
+                raise RuntimeError("streaming matcher disagrees with _normalize")
+
+        out[f"{mb}mb"] = {
+            "normalize": _timed(lambda: _normalize(text), reps),
+            "streaming_matcher": _timed(streamed, reps),
+        }
+    return out
+
+
+def bench_submit(concurrency: List[int], requests_per_level: int, cases: int) -> Dict[str, Any]:
+    """
+    Drives the /submit route handler directly (request model + judge + response),
+    so the numbers cover the whole endpoint minus HTTP parsing. Requests are
+    forced past the verdict cache; "cached" times a repeat answered from it.
+    """
+    from routers.submit import SubmitRequest, submit
+
+    _seed_part(cases)
+    reqs = {
+        "cpp": SubmitRequest(project_id=BENCH_PART_ID, language="cpp", code=CPP_SOURCE, force=True),
+        "python": SubmitRequest(project_id=BENCH_PART_ID, language="python", code=PY_SOURCE, force=True),
+    }
+    for req in reqs.values():  # warm the part and compile caches
+        if submit(req)["status"] != "accepted":
+            raise RuntimeError(f"benchmark submission for {req.language} was not accepted")
+
+    out: Dict[str, Any] = {}
+    for language, req in reqs.items():
+        levels: Dict[str, Any] = {}
+        for c in concurrency:
+            def one(_: int) -> float:
+                t0 = time.perf_counter()
+                if submit(req)["status"] != "accepted":
+                    raise RuntimeError(f"benchmark submission for {language} was not accepted")
+                return _ms(t0)
+
+            t0 = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=c) as ex:
+                latencies = list(ex.map(one, range(requests_per_level)))
+            wall_s = time.perf_counter() - t0
+            levels[str(c)] = {
+                "requests": requests_per_level,
+                "throughput_rps": round(requests_per_level / wall_s, 2),
+                "latency": summarize(latencies),
+            }
+        repeat = SubmitRequest(project_id=BENCH_PART_ID, language=req.language, code=req.code)
+        levels["cached"] = _timed(lambda: submit(repeat), 20)
+        out[language] = levels
+    return out
+
+
+# ----------------------------
+# Report
+# ----------------------------
+
+def _git_commit() -> str:
+    try:
+        p = subprocess.run(["git", "rev-parse", "HEAD"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        return p.stdout.strip()
+    except FileNotFoundError:
+        return ""
+
+
+def run_all(args: argparse.Namespace) -> Dict[str, Any]:
+    reps = 3 if args.quick else args.reps
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(prefix="judge_bench_") as td:
+        work = Path(td)
+        results.update(bench_compile(work, max(1, reps // 2)))
+        results.update(bench_run(work, reps * 4))
+    results["normalize"] = bench_normalize([1] if args.quick else [1, 16], reps)
+    results["submit"] = bench_submit(
+        [1, 2] if args.quick else args.concurrency,
+        requests_per_level=8 if args.quick else args.requests,
+        cases=args.cases,
+    )
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "judge_workers": JUDGE_WORKERS,
+            "compiler": compiler_version(CPP_COMPILER),
+            "quick": bool(args.quick),
+            "reps": reps,
+        },
+        "results": results,
+        "compile_cache": get_compile_cache().stats(),
+    }
+
+
+def _flatten(d: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    flat: Dict[str, float] = {}
+    for k, v in d.items():
+        key = f"{prefix}.{k}" if prefix else k
+        if isinstance(v, dict):
+            flat.update(_flatten(v, key))
+        elif isinstance(v, (int, float)):
+            flat[key] = float(v)
+    return flat
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Names of the p50 latencies (and throughputs) that got worse than
+    baseline by more than `threshold` (a ratio, e.g. 1.25 = 25% slower).
+    """
+    cur, base = _flatten(current["results"]), _flatten(baseline["results"])
+    regressions = []
+    for key, old in sorted(base.items()):
+        new = cur.get(key)
+        if new is None or old <= 0:
+            continue
+        if key.endswith(".p50") and new / old > threshold:
+            regressions.append(f"{key}: {old:.3f} -> {new:.3f} ms ({new / old:.2f}x)")
+        elif key.endswith(".throughput_rps") and old / max(new, 1e-9) > threshold:
+            regressions.append(f"{key}: {old:.2f} -> {new:.2f} req/s ({new / old:.2f}x)")
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    ap = argparse.ArgumentParser(description="Judge performance benchmarks (MockDB, no network).")
+    ap.add_argument("--out", help="write results JSON here (default: stdout)")
+    ap.add_argument("--quick", action="store_true", help="few repetitions, for a smoke run")
+    ap.add_argument("--reps", type=int, default=10, help="repetitions per micro-benchmark")
+    ap.add_argument("--concurrency", type=lambda s: [int(x) for x in s.split(",")], default=[1, 2, 4, 8])
+    ap.add_argument("--requests", type=int, default=32, help="/submit requests per concurrency level")
+    ap.add_argument("--cases", type=int, default=5, help="test cases in the benchmark part")
+    ap.add_argument("--compare", help="baseline results JSON; exit 1 on regressions")
+    ap.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio counted as a regression")
+    args = ap.parse_args(argv)
+
+    report = run_all(args)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe in-process cache with a per-entry TTL and LRU eviction
+    once max_entries is reached. Keeps hit/miss counters for metrics.
+
+    With max_bytes and sizeof (value -> approximate size in bytes), the
+    total size is bounded too; a value larger than max_bytes is not stored.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_sec: float,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self.max_bytes = max_bytes if sizeof is not None else None
+        self._sizeof = sizeof
+        self._lock = threading.Lock()
+        # key -> (expires, value, size)
+        self._data: "OrderedDict[Hashable, Tuple[float, Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _pop_locked(self, key: Hashable) -> Any:
+        item = self._data.pop(key, _MISSING)
+        if item is not _MISSING:
+            self._bytes -= item[2]
+        return item
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING or item[0] <= now:
+                if item is not _MISSING:
+                    self._pop_locked(key)
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key: Hashable, value: Any, ttl_sec: Optional[float] = None) -> None:
+        expires = time.monotonic() + (self.ttl_sec if ttl_sec is None else ttl_sec)
+        size = self._sizeof(value) if self._sizeof is not None else 0
+        with self._lock:
+            self._pop_locked(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._data[key] = (expires, value, size)
+            self._bytes += size
+            while len(self._data) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                self._pop_locked(next(iter(self._data)))
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._pop_locked(key) is not _MISSING
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def items(self):
+        """
+        Snapshot of live (key, value) pairs, most recently used last.
+        """
+        now = time.monotonic()
+        with self._lock:
+            return [(k, v) for k, (exp, v, _) in self._data.items() if exp > now]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            stats = {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "ttl_sec": self.ttl_sec,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+            if self.max_bytes is not None:
+                stats["bytes"] = self._bytes
+                stats["max_bytes"] = self.max_bytes
+            return stats
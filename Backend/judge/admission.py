@@ -0,0 +1,221 @@
+# Backend/judge/admission.py
+"""
+Admission control for the judge.
+
+At most JUDGE_MAX_CONCURRENT submissions compile and run at once; the rest
+wait in FIFO order. A ticket only holds up the line while someone is
+waiting on it: a free slot goes to the oldest ticket whose caller is in
+wait(), so a ticket taken early never blocks the tickets behind it.
+Interactive submissions are bounded: at most
+JUDGE_MAX_QUEUED may wait and each user may have JUDGE_PER_USER_INFLIGHT
+submissions queued or running, beyond which they are turned away with
+Overloaded (HTTP 429 + Retry-After in routers.submit) instead of piling
+up and pushing everyone past their time limits.
+
+Background work (batch regrades) is unbounded but only admitted when no
+interactive submission is waiting, so a class-wide regrade can't starve
+students. Background tickets are waited on by the batch executor, never by
+the job-queue workers that interactive async submissions need (see
+judge.jobs), so the two can't wait on each other.
+"""
+import contextlib
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, Optional
+
+from judge.pool import JUDGE_WORKERS
+
+JUDGE_MAX_CONCURRENT = int(os.getenv("JUDGE_MAX_CONCURRENT", "0")) or JUDGE_WORKERS
+JUDGE_MAX_QUEUED = int(os.getenv("JUDGE_MAX_QUEUED", "64"))
+JUDGE_PER_USER_INFLIGHT = int(os.getenv("JUDGE_PER_USER_INFLIGHT", "2"))
+JUDGE_ADMISSION_WAIT_SEC = float(os.getenv("JUDGE_ADMISSION_WAIT_SEC", "30"))
+
+_WAIT_SAMPLES = 1024
+
+
+class Overloaded(Exception):
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """
+    A submission's place in line. Obtained from AdmissionController.enter(),
+    then wait() for a slot and release() when done (or use it as a context
+    manager, which does both).
+    """
+
+    def __init__(self, ctl: "AdmissionController", user: Optional[str], background: bool):
+        self._ctl = ctl
+        self.user = user
+        self.background = background
+        self.enqueued_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        self.waiting = False
+        self.done = False
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        self._ctl._wait(self, timeout)
+
+    def release(self) -> None:
+        self._ctl._release(self)
+
+    def __enter__(self) -> "Ticket":
+        self.wait()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.release()
+
+
+class AdmissionController:
+    def __init__(self, max_concurrent: int, max_queued: int, per_user: int):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.per_user = per_user
+        self._cond = threading.Condition()
+        self._interactive: Deque[Ticket] = deque()
+        self._background: Deque[Ticket] = deque()
+        self._running = 0
+        self._inflight: Dict[str, int] = {}
+        self._waits_ms: Deque[float] = deque(maxlen=_WAIT_SAMPLES)
+        self._service_s = 1.0  # moving average of slot hold time, for Retry-After
+        self.admitted = 0
+        self.rejected: Dict[str, int] = {"queue_full": 0, "user_limit": 0, "timeout": 0}
+
+    def _retry_after_locked(self) -> int:
+        queued = len(self._interactive) + 1
+        return max(1, math.ceil(queued * self._service_s / self.max_concurrent))
+
+    def _check_locked(self, user: Optional[str]) -> None:
+        if self.per_user and user and self._inflight.get(user, 0) >= self.per_user:
+            self.rejected["user_limit"] += 1
+            raise Overloaded(
+                f"too many submissions in flight for this user (max {self.per_user})",
+                self._retry_after_locked(),
+            )
+        if len(self._interactive) >= self.max_queued:
+            self.rejected["queue_full"] += 1
+            raise Overloaded("judge queue is full", self._retry_after_locked())
+
+    def enter(self, user: Optional[str] = None, background: bool = False) -> Ticket:
+        """
+        Take a place in line. Raises Overloaded if the interactive queue is
+        full or the user already has the maximum number of submissions in flight.
+        """
+        with self._cond:
+            if not background:
+                self._check_locked(user)
+            ticket = Ticket(self, user, background)
+            (self._background if background else self._interactive).append(ticket)
+            if user:
+                self._inflight[user] = self._inflight.get(user, 0) + 1
+            return ticket
+
+    @contextlib.contextmanager
+    def admit(self, user: Optional[str] = None, background: bool = False) -> Iterator[Ticket]:
+        """
+        enter() + wait() + release(). Interactive tickets give up after
+        JUDGE_ADMISSION_WAIT_SEC with Overloaded.
+        """
+        ticket = self.enter(user, background)
+        try:
+            ticket.wait(None if background else JUDGE_ADMISSION_WAIT_SEC)
+            yield ticket
+        finally:
+            ticket.release()
+
+    def _next_locked(self) -> Optional[Ticket]:
+        # Oldest ticket someone is waiting on; background only when no interactive one is
+        for queue in (self._interactive, self._background):
+            for ticket in queue:
+                if ticket.waiting:
+                    return ticket
+        return None
+
+    def _wait(self, ticket: Ticket, timeout: Optional[float]) -> None:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            ticket.waiting = True
+            try:
+                while not (self._running < self.max_concurrent and self._next_locked() is ticket):
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        self.rejected["timeout"] += 1
+                        self._drop_locked(ticket)
+                        raise Overloaded("timed out waiting for a judge slot", self._retry_after_locked())
+                    self._cond.wait(remaining)
+            finally:
+                ticket.waiting = False
+            (self._background if ticket.background else self._interactive).remove(ticket)
+            self._running += 1
+            self.admitted += 1
+            ticket.started_at = time.monotonic()
+            self._waits_ms.append((ticket.started_at - ticket.enqueued_at) * 1000)
+            # The next in line may fit in a free slot too
+            self._cond.notify_all()
+
+    def _drop_locked(self, ticket: Ticket) -> None:
+        if ticket.done:
+            return
+        ticket.done = True
+        queue = self._background if ticket.background else self._interactive
+        if ticket.started_at is not None:
+            self._running -= 1
+            held = time.monotonic() - ticket.started_at
+            self._service_s = 0.8 * self._service_s + 0.2 * held
+        elif ticket in queue:
+            queue.remove(ticket)
+        if ticket.user:
+            left = self._inflight.get(ticket.user, 0) - 1
+            if left > 0:
+                self._inflight[ticket.user] = left
+            else:
+                self._inflight.pop(ticket.user, None)
+        self._cond.notify_all()
+
+    def _release(self, ticket: Ticket) -> None:
+        with self._cond:
+            self._drop_locked(ticket)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            waits = sorted(self._waits_ms)
+            now = time.monotonic()
+            oldest = min((t.enqueued_at for t in self._interactive), default=None)
+
+            def pct(p: float) -> float:
+                return round(waits[min(len(waits) - 1, int(p / 100 * len(waits)))], 1) if waits else 0.0
+
+            return {
+                "max_concurrent": self.max_concurrent,
+                "max_queued": self.max_queued,
+                "per_user_inflight": self.per_user,
+                "running": self._running,
+                "queued": len(self._interactive),
+                "queued_background": len(self._background),
+                "oldest_wait_ms": round((now - oldest) * 1000, 1) if oldest is not None else 0.0,
+                "admitted": self.admitted,
+                "rejected": dict(self.rejected),
+                "wait_ms": {"p50": pct(50), "p95": pct(95), "max": round(waits[-1], 1) if waits else 0.0},
+                "avg_service_sec": round(self._service_s, 3),
+            }
+
+
+_controller: Optional[AdmissionController] = None
+_controller_lock = threading.Lock()
+
+
+def get_admission() -> AdmissionController:
+    global _controller
+    if _controller is not None:
+        return _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = AdmissionController(JUDGE_MAX_CONCURRENT, JUDGE_MAX_QUEUED, JUDGE_PER_USER_INFLIGHT)
+    return _controller
@@ -0,0 +1,122 @@
+# Backend/judge/batch.py
+"""
+Batch judging: many (user, language, code) entries against one part.
+
+The part is fetched once, identical sources are judged once and their
+verdict is shared, and the unique sources are spread over a dedicated
+batch pool. Test cases inside each source still go through the shared
+judge pool (judge.pool), so a class-wide regrade can't oversubscribe the
+machine any more than regular submissions can.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from judge.admission import get_admission
+from judge.drivers import get_driver
+from judge.engine import _part_summary, judge_code
+from judge.parts import get_part
+from judge.pool import JUDGE_WORKERS
+from judge.submissions import record_submission, source_hash
+
+# Sources compiled/judged at once in a batch. Kept apart from the shared judge
+# pool: batch tasks fan out into that pool, and nesting them there could deadlock.
+JUDGE_BATCH_WORKERS = int(os.getenv("JUDGE_BATCH_WORKERS", "0")) or JUDGE_WORKERS
+
+# on_row(row) callback, called as each user's verdict is known
+RowCallback = Callable[[Dict[str, Any]], None]
+
+_batch_executor: Optional[ThreadPoolExecutor] = None
+_batch_executor_lock = threading.Lock()
+
+
+def get_batch_executor() -> ThreadPoolExecutor:
+    global _batch_executor
+    if _batch_executor is not None:
+        return _batch_executor
+    with _batch_executor_lock:
+        if _batch_executor is None:
+            _batch_executor = ThreadPoolExecutor(max_workers=JUDGE_BATCH_WORKERS, thread_name_prefix="judge-batch")
+    return _batch_executor
+
+
+def verdict_row(user_id: str, language: str, digest: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compact per-user summary of a judge result.
+    """
+    tests = result.get("tests", []) or []
+    return {
+        "user_id": user_id,
+        "language": language,
+        "source_hash": digest,
+        "status": result.get("status", ""),
+        "passed": sum(1 for t in tests if t.get("passed")),
+        "total": len(tests),
+        "time_ms": round(sum(t.get("time_ms", 0.0) for t in tests), 1),
+    }
+
+
+def judge_batch(
+    project_id: str,
+    entries: List[Dict[str, str]],
+    stdin_args: str = "",
+    judge_mode: str = "full",
+    on_row: Optional[RowCallback] = None,
+) -> Dict[str, Any]:
+    """
+    Judge every entry ({"user_id", "language", "code"}) against one part.
+
+    Returns {"status": "done", "part": {...}, "unique_sources": n, "rows": [...]}
+    with one verdict_row per entry, in input order. on_row is called with each
+    row as soon as its source has been judged (so in completion order).
+    Each judged entry is stored as the user's latest submission (judge.submissions).
+    """
+    emit_row = on_row or (lambda row: None)
+
+    part = get_part(project_id)
+    if part is None:
+        return {"status": "unknown_project"}
+
+    rows: List[Optional[Dict[str, Any]]] = [None] * len(entries)
+
+    # (driver name, source hash) -> indexes of the entries sharing that source
+    groups: Dict[Tuple[str, str], List[int]] = {}
+    code_by_key: Dict[Tuple[str, str], str] = {}
+    for i, entry in enumerate(entries):
+        digest = source_hash(entry.get("code", ""))
+        driver = get_driver(entry.get("language", ""))
+        if driver is None:
+            rows[i] = verdict_row(entry.get("user_id", ""), entry.get("language", ""), digest, {"status": "unsupported_language"})
+            emit_row(rows[i])
+            continue
+        key = (driver.name, digest)
+        groups.setdefault(key, []).append(i)
+        code_by_key[key] = entry.get("code", "")
+
+    def judge_one(key: Tuple[str, str]) -> Dict[str, Any]:
+        # Background priority: interactive submissions go first
+        with get_admission().admit(background=True):
+            return judge_code(get_driver(key[0]), part, code_by_key[key], stdin_args=stdin_args, judge_mode=judge_mode)
+
+    executor = get_batch_executor()
+    futures = {executor.submit(judge_one, key): key for key in groups}
+    for fut in as_completed(futures):
+        key = futures[fut]
+        try:
+            result = fut.result()
+        except Exception as e:
+            result = {"status": "error", "detail": str(e)}
+        for i in groups[key]:
+            user_id = entries[i].get("user_id", "")
+            if result["status"] != "error":
+                record_submission(user_id, project_id, key[0], code_by_key[key], stdin_args, result, part=part)
+            rows[i] = verdict_row(user_id, key[0], key[1], result)
+            emit_row(rows[i])
+
+    return {
+        "status": "done",
+        "part": _part_summary(part),
+        "unique_sources": len(groups),
+        "rows": rows,
+    }
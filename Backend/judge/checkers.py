@@ -0,0 +1,186 @@
+# Backend/judge/checkers.py
+"""
+Output checkers: how a test case's output is compared with the expected one.
+
+A part picks its checker with an optional "checker" field, either a type
+name or a dict:
+
+    "checker": "tokens"
+    "checker": {"type": "float", "abs_tol": 1e-6, "rel_tol": 1e-6}
+    "checker": {"type": "custom", "language": "cpp", "source": "<code or sha256:ref>"}
+
+  exact            (default) line by line after trimming trailing whitespace
+  tokens           whitespace-separated tokens must be equal
+  float            tokens, with numbers equal within abs_tol / rel_tol
+  unordered_lines  the non-blank lines in any order
+  custom           a checker program, run testlib-style as
+                   `checker <input> <output> <answer>`; exit code 0 accepts,
+                   and whatever it prints to stderr is shown as the message
+
+Built-in checkers stream the output through a matcher (judge.compare)
+while the program runs. Custom checkers are compiled once per
+(language, source) into JUDGE_CHECKER_DIR and reused across submissions.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+from judge.compare import (
+    StreamingMatcher,
+    TokenMatcher,
+    UnorderedLinesMatcher,
+    expected_file_lines,
+    file_raw_lines,
+    file_tokens,
+    float_equal,
+    text_tokens,
+)
+from judge.drivers import LanguageDriver, get_driver
+from judge.sandbox import run_limited
+from judge.testdata import TestFile, get_testdata_store, is_ref
+
+JUDGE_CHECKER_DIR = os.getenv("JUDGE_CHECKER_DIR", os.path.join(tempfile.gettempdir(), "judge_checkers"))
+JUDGE_CHECKER_TIME_SEC = float(os.getenv("JUDGE_CHECKER_TIME_SEC", "10"))
+JUDGE_CHECKER_MEMORY_MB = int(os.getenv("JUDGE_CHECKER_MEMORY_MB", "512"))
+
+CHECKER_TYPES = {"exact", "tokens", "float", "unordered_lines", "custom"}
+
+_DEFAULT_ABS_TOL = 1e-6
+_DEFAULT_REL_TOL = 1e-6
+_MESSAGE_MAX_CHARS = 500
+
+
+class CheckerError(Exception):
+    pass
+
+
+def parse_checker(config: Any) -> Dict[str, Any]:
+    """
+    The part's "checker" field as a dict with every option filled in.
+    Raises ValueError if it names an unknown type or is missing options.
+    """
+    if config is None or config == "":
+        return {"type": "exact"}
+    spec = {"type": config} if isinstance(config, str) else dict(config)
+    kind = spec.get("type", "exact")
+    if kind not in CHECKER_TYPES:
+        raise ValueError(f"unknown checker type {kind!r} (expected one of {', '.join(sorted(CHECKER_TYPES))})")
+    if kind == "float":
+        spec["abs_tol"] = float(spec.get("abs_tol", _DEFAULT_ABS_TOL))
+        spec["rel_tol"] = float(spec.get("rel_tol", _DEFAULT_REL_TOL))
+    if kind == "custom":
+        if not spec.get("source"):
+            raise ValueError("custom checker needs a source")
+        if get_driver(spec.get("language", "")) is None:
+            raise ValueError(f"unsupported checker language {spec.get('language')!r}")
+    return spec
+
+
+def make_matcher(spec: Dict[str, Any], expected: Any) -> Any:
+    """
+    Matcher for a built-in checker. `expected` is the prepared expected
+    lines for "exact" and the raw expected output for the others; either
+    may be a TestFile.
+    """
+    kind = spec["type"]
+    is_file = isinstance(expected, TestFile)
+    if kind == "exact":
+        return StreamingMatcher(lines=expected_file_lines(expected.path) if is_file else expected)
+    if kind == "unordered_lines":
+        return UnorderedLinesMatcher(file_raw_lines(expected.path) if is_file else expected.splitlines())
+    tokens = file_tokens(expected.path) if is_file else text_tokens(expected)
+    if kind == "float":
+        return TokenMatcher(tokens, float_equal(spec["abs_tol"], spec["rel_tol"]))
+    return TokenMatcher(tokens)
+
+
+# ----------------------------
+# Custom checker programs
+# ----------------------------
+
+class CustomChecker:
+    def __init__(self, driver: LanguageDriver, artifact: str):
+        self.driver = driver
+        self.artifact = artifact
+
+    def check(self, scratch: Path, tc_in: Any, output_path: str, expected: Any) -> Tuple[bool, str]:
+        """
+        Run the checker on one test case. scratch is a directory for the
+        input and answer files when they aren't file-backed already.
+        Returns (accepted, message).
+        """
+        def as_file(data: Any, name: str) -> str:
+            if isinstance(data, TestFile):
+                return data.path
+            path = scratch / name
+            path.write_text(data, encoding="utf-8")
+            return str(path)
+
+        argv = self.driver.command(self.artifact, JUDGE_CHECKER_MEMORY_MB) + [
+            as_file(tc_in, "input"),
+            output_path,
+            as_file(expected, "answer"),
+        ]
+        try:
+            run = run_limited(
+                argv,
+                "",
+                JUDGE_CHECKER_TIME_SEC,
+                JUDGE_CHECKER_MEMORY_MB,
+                limit_address_space=self.driver.limit_address_space,
+            )
+        except FileNotFoundError as e:
+            return False, f"checker failed: {e}"
+        message = (run["stderr"] or run["stdout"]).strip()[:_MESSAGE_MAX_CHARS]
+        if run["timed_out"]:
+            return False, "checker failed: timed out"
+        if run["exit_code"] not in (0, 1, 2):
+            return False, f"checker failed (exit code {run['exit_code']}): {message}"
+        return run["exit_code"] == 0, message
+
+
+_checkers: Dict[str, CustomChecker] = {}
+_checkers_lock = threading.Lock()
+
+
+def _checker_source(spec: Dict[str, Any]) -> str:
+    source = spec["source"]
+    if not is_ref(source):
+        return source
+    try:
+        return Path(get_testdata_store().resolve(source).path).read_text(encoding="utf-8")
+    except (ValueError, FileNotFoundError) as e:
+        raise CheckerError(str(e)) from None
+
+
+def get_custom_checker(spec: Dict[str, Any]) -> CustomChecker:
+    """
+    The compiled checker for a "custom" spec, built on first use.
+    Raises CheckerError if it doesn't compile.
+    """
+    source = _checker_source(spec)
+    driver = get_driver(spec["language"])
+    key = hashlib.sha256(f"{driver.name}\0{source}".encode("utf-8")).hexdigest()
+    checker = _checkers.get(key)
+    if checker is not None:
+        return checker
+
+    # Checkers are few and compile rarely: one lock for all of them is enough
+    with _checkers_lock:
+        checker = _checkers.get(key)
+        if checker is None:
+            work = Path(JUDGE_CHECKER_DIR) / key[:32]
+            work.mkdir(parents=True, exist_ok=True)
+            built = driver.compile(source, work)
+            if not built["ok"]:
+                raise CheckerError(f"checker does not compile: {built['stderr'][:_MESSAGE_MAX_CHARS]}")
+            checker = CustomChecker(driver, built["artifact"])
+            _checkers[key] = checker
+    return checker
+
+
+def checker_stats() -> Dict[str, Any]:
+    return {"compiled": len(_checkers)}
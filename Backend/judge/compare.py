@@ -0,0 +1,296 @@
+# Backend/judge/compare.py
+import codecs
+import math
+import mmap
+import os
+import re
+from collections import Counter
+from typing import Callable, Iterable, Iterator, List, Optional
+
+# How far a partial output token may run past the expected one before the
+# token matchers give up on it (tolerance checks accept longer spellings)
+_TOKEN_SLACK = 1024
+
+
+def normalize(s: str) -> str:
+    """
+    Hackathon-friendly normalization:
+      - normalize newlines
+      - strip trailing whitespace per line
+      - ignore extra trailing newlines
+    """
+    s = s.replace("\r\n", "\n").replace("\r", "\n")
+    s = "\n".join(line.rstrip() for line in s.split("\n"))
+    return s.strip()
+
+
+def expected_lines(expected: str) -> List[str]:
+    norm = normalize(expected)
+    return norm.split("\n") if norm else []
+
+
+def normalized_lines(raw_lines: Iterable[str]) -> Iterator[str]:
+    """
+    Lazy normalize(text).split("\n"), given text as its raw lines (already
+    split on newlines, without the line terminators).
+    """
+    started = False
+    pending_blank = 0
+    for line in raw_lines:
+        line = line.rstrip()
+        if not started:
+            if line:
+                started = True
+                yield line.lstrip()
+            continue
+        if not line:
+            pending_blank += 1
+            continue
+        for _ in range(pending_blank):
+            yield ""
+        pending_blank = 0
+        yield line
+
+
+def file_raw_lines(path: str) -> Iterator[str]:
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for raw in iter(mm.readline, b""):
+                if raw.endswith(b"\r\n"):
+                    raw = raw[:-2]
+                elif raw.endswith(b"\n"):
+                    raw = raw[:-1]
+                yield from raw.decode("utf-8", errors="replace").replace("\r", "\n").split("\n")
+
+
+def expected_file_lines(path: str) -> Iterator[str]:
+    """
+    expected_lines() of a file's contents, read lazily from a memory map so a
+    multi-megabyte expected output is never held as one Python string.
+    """
+    return normalized_lines(file_raw_lines(path))
+
+
+class StreamingMatcher:
+    """
+    Incremental equivalent of normalize(actual) == normalize(expected).
+
+    Output is fed in chunks as the program produces it and compared line by
+    line, so a mismatch is known as soon as the offending line is complete
+    and the output never has to be held in full.
+
+    normalize() keeps the rstripped lines between the first and last
+    non-blank line, with the first one also lstripped. So leading blank
+    lines are dropped, and blank lines in the middle are only compared once
+    a later non-blank line proves they aren't trailing.
+    """
+
+    def __init__(self, expected: str = "", lines: Optional[Iterable[str]] = None):
+        # Expected lines are consumed in order, so any iterable works
+        # (e.g. expected_file_lines for file-backed test data)
+        self._expected = iter(lines if lines is not None else expected_lines(expected))
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._partial = ""
+        self._started = False
+        self._pending_blank = 0
+        self.mismatch = False
+
+    def _compare(self, line: str) -> None:
+        if next(self._expected, None) != line:
+            self.mismatch = True
+
+    def _line(self, line: str) -> None:
+        line = line.rstrip()
+        if not self._started:
+            if line:
+                self._started = True
+                self._compare(line.lstrip())
+            return
+        if not line:
+            self._pending_blank += 1
+            return
+        for _ in range(self._pending_blank):
+            self._compare("")
+            if self.mismatch:
+                return
+        self._pending_blank = 0
+        self._compare(line)
+
+    def feed_text(self, text: str) -> bool:
+        """
+        Feed decoded output. Returns False once the output can no longer match.
+        """
+        if self.mismatch:
+            return False
+        text = self._partial + text
+        # Hold back a trailing \r in case the next chunk starts with \n
+        self._partial = ""
+        if text.endswith("\r"):
+            text, self._partial = text[:-1], "\r"
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+        *complete, rest = text.split("\n")
+        self._partial = rest + self._partial
+        for line in complete:
+            self._line(line)
+            if self.mismatch:
+                return False
+        return True
+
+    def feed(self, data: bytes) -> bool:
+        return self.feed_text(self._decoder.decode(data))
+
+    def finish(self) -> bool:
+        """
+        End of output. Returns whether the whole output matched.
+        """
+        self.feed_text(self._decoder.decode(b"", final=True))
+        if self._partial and not self.mismatch:
+            self._line(self._partial.replace("\r", "\n").split("\n")[0])
+            self._partial = ""
+        return not self.mismatch and self._exhausted()
+
+    def _exhausted(self) -> bool:
+        return next(self._expected, None) is None
+
+
+# ----------------------------
+# Checker matchers (see judge.checkers)
+# ----------------------------
+
+def text_tokens(text: str) -> Iterator[str]:
+    return (m.group() for m in re.finditer(r"\S+", text))
+
+
+def file_tokens(path: str) -> Iterator[str]:
+    for line in file_raw_lines(path):
+        yield from line.split()
+
+
+def float_equal(abs_tol: float, rel_tol: float) -> Callable[[str, str], bool]:
+    """
+    Token comparison for real-valued answers: numbers match within
+    abs_tol or rel_tol of the expected value, anything else must match exactly.
+    """
+    def equal(actual: str, expected: str) -> bool:
+        if actual == expected:
+            return True
+        try:
+            a, e = float(actual), float(expected)
+        except ValueError:
+            return False
+        if math.isnan(a) or math.isnan(e):
+            return False
+        return a == e or abs(a - e) <= max(abs_tol, rel_tol * abs(e))
+
+    return equal
+
+
+class TokenMatcher:
+    """
+    Whitespace-insensitive comparison: output and expected are compared as
+    sequences of whitespace-separated tokens, one token at a time, so
+    neither side is ever normalized into a second copy.
+    """
+
+    def __init__(self, tokens: Iterable[str], equal: Optional[Callable[[str, str], bool]] = None):
+        self._expected = iter(tokens)
+        self._equal = equal
+        self._next: Optional[str] = None
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._partial = ""
+        self.mismatch = False
+
+    def _peek(self) -> Optional[str]:
+        if self._next is None:
+            self._next = next(self._expected, None)
+        return self._next
+
+    def _token(self, token: str) -> None:
+        expected = self._peek()
+        self._next = None
+        if expected is None:
+            self.mismatch = True
+        elif self._equal is None:
+            self.mismatch = token != expected
+        else:
+            self.mismatch = not self._equal(token, expected)
+
+    def feed_text(self, text: str) -> bool:
+        if self.mismatch:
+            return False
+        text = self._partial + text
+        tokens = text.split()
+        # The last token may continue in the next chunk
+        self._partial = tokens.pop() if tokens and not text[-1].isspace() else ""
+        for token in tokens:
+            self._token(token)
+            if self.mismatch:
+                return False
+        if self._partial:
+            expected = self._peek()
+            if expected is None or len(self._partial) > len(expected) + _TOKEN_SLACK:
+                self.mismatch = True
+                return False
+        return True
+
+    def feed(self, data: bytes) -> bool:
+        return self.feed_text(self._decoder.decode(data))
+
+    def finish(self) -> bool:
+        self.feed_text(self._decoder.decode(b"", final=True))
+        if self._partial and not self.mismatch:
+            self._token(self._partial)
+            self._partial = ""
+        return not self.mismatch and self._peek() is None
+
+
+class UnorderedLinesMatcher(StreamingMatcher):
+    """
+    The output's non-blank lines must be a permutation of the expected ones
+    (each compared with surrounding whitespace stripped). A line that isn't
+    among the expected lines still left over is a mismatch right away.
+    """
+
+    def __init__(self, lines: Iterable[str]):
+        super().__init__(lines=())
+        self._remaining = Counter(line.strip() for line in lines if line.strip())
+
+    def _line(self, line: str) -> None:
+        line = line.strip()
+        if not line:
+            return
+        left = self._remaining.get(line, 0)
+        if left == 0:
+            self.mismatch = True
+        elif left == 1:
+            del self._remaining[line]
+        else:
+            self._remaining[line] = left - 1
+
+    def _exhausted(self) -> bool:
+        return not self._remaining
+
+
+class OutputSpool:
+    """
+    "Matcher" that only writes the output to a file, for checkers that need
+    all of it at once (custom checker programs).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._f = open(path, "wb")
+
+    def feed(self, data: bytes) -> bool:
+        self._f.write(data)
+        return True
+
+    def finish(self) -> bool:
+        self.close()
+        return True
+
+    def close(self) -> None:
+        if not self._f.closed:
+            self._f.close()
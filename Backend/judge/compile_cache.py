@@ -0,0 +1,175 @@
+# Backend/judge/compile_cache.py
+import contextlib
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+COMPILE_CACHE_DIR = os.getenv(
+    "JUDGE_COMPILE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "judge_compile_cache")
+)
+COMPILE_CACHE_MAX_BYTES = int(os.getenv("JUDGE_COMPILE_CACHE_MAX_MB", "512")) * 1024 * 1024
+
+
+@lru_cache(maxsize=None)
+def compiler_version(compiler: str) -> str:
+    """
+    First line of `<compiler> --version`, so a toolchain upgrade never serves
+    binaries built by the old compiler.
+    """
+    try:
+        p = subprocess.run([compiler, "--version"], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        return (p.stdout.splitlines() or [""])[0].strip()
+    except FileNotFoundError:
+        return ""
+
+
+def cache_key(source: str, compiler: str, flags: List[str]) -> str:
+    h = hashlib.sha256()
+    h.update(compiler_version(compiler).encode("utf-8"))
+    h.update(b"\0")
+    h.update("\0".join(flags).encode("utf-8"))
+    h.update(b"\0")
+    h.update(source.encode("utf-8"))
+    return h.hexdigest()
+
+
+class CompileCache:
+    """
+    Content-addressed store of compiled executables on disk.
+
+    Entries are named by their cache key. The total size is capped and the
+    least recently used entries are evicted first; recency survives restarts
+    because hits touch the file's mtime.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key -> (lock, number of threads holding or waiting for it)
+        self._key_locks: Dict[str, Tuple[threading.Lock, int]] = {}
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total = 0
+        self.hits = 0
+        self.misses = 0
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        existing = []
+        for p in self.root.iterdir():
+            if p.is_file() and not p.name.startswith("."):
+                st = p.stat()
+                existing.append((st.st_mtime, p.name, st.st_size))
+        for _mtime, name, size in sorted(existing):
+            self._entries[name] = size
+            self._total += size
+        with self._lock:
+            self._evict_locked()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key
+
+    @contextlib.contextmanager
+    def key_lock(self, key: str) -> Iterator[None]:
+        """
+        Per-key lock so identical sources submitted at the same time compile
+        once. The lock only exists while someone holds or waits for it, so
+        keys that never make it into the cache (failed compiles) don't pile up.
+        """
+        with self._lock:
+            lock, refs = self._key_locks.get(key) or (threading.Lock(), 0)
+            self._key_locks[key] = (lock, refs + 1)
+        try:
+            with lock:
+                yield
+        finally:
+            with self._lock:
+                lock, refs = self._key_locks[key]
+                if refs == 1:
+                    del self._key_locks[key]
+                else:
+                    self._key_locks[key] = (lock, refs - 1)
+
+    def get(self, key: str, dest: str) -> bool:
+        """
+        Place the cached executable for `key` at `dest`. Returns False on a miss.
+        """
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return False
+            self._entries.move_to_end(key)
+            self.hits += 1
+        src = self._path(key)
+        try:
+            os.utime(src)
+            # Replace, never write through: dest may already be a link to this entry
+            try:
+                os.unlink(dest)
+            except FileNotFoundError:
+                pass
+            try:
+                os.link(src, dest)
+            except OSError:
+                shutil.copy2(src, dest)
+        except FileNotFoundError:
+            # Removed behind our back (e.g. tmp cleaner); treat as a miss.
+            with self._lock:
+                self._total -= self._entries.pop(key, 0)
+                self.hits -= 1
+                self.misses += 1
+            return False
+        return True
+
+    def put(self, key: str, exe_path: str) -> None:
+        size = os.path.getsize(exe_path)
+        if size > self.max_bytes:
+            return
+        fd, tmp = tempfile.mkstemp(prefix=".tmp_", dir=self.root)
+        os.close(fd)
+        shutil.copy2(exe_path, tmp)
+        os.replace(tmp, self._path(key))
+        with self._lock:
+            self._total -= self._entries.pop(key, 0)
+            self._entries[key] = size
+            self._total += size
+            self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        while self._total > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total -= size
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_cache: Optional[CompileCache] = None
+_cache_init_lock = threading.Lock()
+
+
+def get_compile_cache() -> CompileCache:
+    global _cache
+    if _cache is not None:
+        return _cache
+    with _cache_init_lock:
+        if _cache is None:
+            _cache = CompileCache(COMPILE_CACHE_DIR, COMPILE_CACHE_MAX_BYTES)
+    return _cache
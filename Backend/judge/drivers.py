@@ -0,0 +1,278 @@
+# Backend/judge/drivers.py
+"""
+Language drivers for the judge engine.
+
+A driver says how to turn source code into something runnable (an optional
+compile step) and how to run it on one test case. Everything else -- part
+lookup, caching, limits, parallelism, judge modes -- lives in judge.engine
+and applies to every registered language.
+
+To add a language, subclass LanguageDriver (or CompiledDriver) and call
+register_driver() at the bottom of this module.
+"""
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from judge.compare import StreamingMatcher
+from judge.compile_cache import cache_key, get_compile_cache
+from judge.pch import pch_include_flags
+from judge.py_runner import ZygoteUnavailable, get_zygote_pool
+from judge.sandbox import failed_run, run_limited
+
+
+class LanguageDriver:
+    name = ""
+    aliases: Tuple[str, ...] = ()
+    source_file = "main.txt"
+    default_time_limit_sec = 1.0
+    compile_error_status = "compile_error"
+    # Runtimes that reserve huge virtual ranges up front (V8, JVM) can't start
+    # under RLIMIT_AS; they cap their heap with a runtime flag instead.
+    limit_address_space = True
+
+    def compile(self, code: str, work: Path, profile: str = "release") -> Dict[str, Any]:
+        """
+        Build the runnable artifact from code inside the workspace `work`.
+        profile: "release" for judging, "quick" for POST /run (fast to build,
+          not to run).
+        Returns {"ok": bool, "artifact": str, "stdout": str, "stderr": str}.
+        The default has no compile step: the written source file is the artifact.
+        """
+        src = work / self.source_file
+        src.write_text(code, encoding="utf-8")
+        return {"ok": True, "artifact": str(src), "stdout": "", "stderr": ""}
+
+    def command(self, artifact: str, memory_limit_mb: Optional[int]) -> List[str]:
+        return [artifact]
+
+    def run(
+        self,
+        artifact: str,
+        stdin_data: str,
+        timeout_s: float,
+        memory_limit_mb: Optional[int] = None,
+        matcher: Optional[StreamingMatcher] = None,
+        stdin_file: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run the artifact on one test case (see judge.sandbox.run_limited for the result).
+        """
+        try:
+            return run_limited(
+                self.command(artifact, memory_limit_mb),
+                stdin_data,
+                timeout_s,
+                memory_limit_mb,
+                matcher,
+                limit_address_space=self.limit_address_space,
+                stdin_file=stdin_file,
+            )
+        except FileNotFoundError as e:
+            return failed_run(f"{self.name} runtime not available: {e}")
+
+
+class CompiledDriver(LanguageDriver):
+    """
+    Native toolchains: `compiler [flags] src -o exe`, with successful builds
+    shared through the content-addressed compile cache.
+    """
+
+    compiler = ""
+    flags: List[str] = []
+    quick_flags: List[str] = []  # "quick" profile; empty means same as flags
+    libs: List[str] = []  # linker inputs, placed after the source file
+
+    def profile_flags(self, profile: str) -> List[str]:
+        if profile == "quick" and self.quick_flags:
+            return list(self.quick_flags)
+        return list(self.flags)
+
+    def build(self, src: str, exe: str, flags: Optional[List[str]] = None) -> Tuple[int, str, str]:
+        flags = self.flags if flags is None else flags
+        p = subprocess.run(
+            [self.compiler, *flags, src, "-o", exe, *self.libs],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        return p.returncode, p.stdout, p.stderr
+
+    def build_cached(
+        self, code: str, src: str, exe: str, flags: Optional[List[str]] = None
+    ) -> Tuple[int, str, str]:
+        """
+        build(), but reuse a previously built executable for identical
+        source + compiler version + flags. Only successful builds are cached.
+        """
+        flags = self.flags if flags is None else flags
+        cache = get_compile_cache()
+        key = cache_key(code, self.compiler, flags + self.libs)
+
+        # Single-flight: a class submitting the same starter file compiles it once
+        with cache.key_lock(key):
+            if cache.get(key, exe):
+                return 0, "", ""
+            try:
+                rc, out, err = self.build(src, exe, flags)
+            except FileNotFoundError as e:
+                return 127, "", f"{self.compiler} not available: {e}"
+            if rc == 0:
+                cache.put(key, exe)
+        return rc, out, err
+
+    def compile(self, code: str, work: Path, profile: str = "release") -> Dict[str, Any]:
+        src = work / self.source_file
+        exe = work / "prog"
+        src.write_text(code, encoding="utf-8")
+        rc, out, err = self.build_cached(code, str(src), str(exe), self.profile_flags(profile))
+        return {"ok": rc == 0, "artifact": str(exe), "stdout": out, "stderr": err}
+
+
+class CppDriver(CompiledDriver):
+    name = "cpp"
+    aliases = ("cpp", "c++")
+    source_file = "main.cpp"
+    compiler = "g++"
+    flags = ["-std=c++17", "-O2", "-pipe"]
+    quick_flags = ["-std=c++17", "-O0", "-pipe"]
+
+    def profile_flags(self, profile: str) -> List[str]:
+        flags = super().profile_flags(profile)
+        if profile == "quick":
+            # Precompiled bits/stdc++.h / iostream, once they're built (see judge.pch)
+            flags += pch_include_flags(self.compiler, self.quick_flags)
+        return flags
+
+
+class CDriver(CompiledDriver):
+    name = "c"
+    aliases = ("c",)
+    source_file = "main.c"
+    compiler = "gcc"
+    flags = ["-std=c11", "-O2", "-pipe"]
+    quick_flags = ["-std=c11", "-O0", "-pipe"]
+    libs = ["-lm"]
+
+
+class RustDriver(CompiledDriver):
+    name = "rust"
+    aliases = ("rust", "rs")
+    source_file = "main.rs"
+    compiler = "rustc"
+    flags = ["--edition", "2021", "-O"]
+    quick_flags = ["--edition", "2021", "-C", "opt-level=0"]
+
+
+def validate_python_syntax(code: str) -> Tuple[bool, str]:
+    """
+    Validate Python syntax without executing the code.
+    Returns: (is_valid, error_message)
+    """
+    try:
+        compile(code, '<string>', 'exec')
+        return True, ""
+    except SyntaxError as e:
+        return False, f"Syntax Error: {e.msg} at line {e.lineno}"
+    except Exception as e:
+        return False, f"Code validation error: {str(e)}"
+
+
+def run_python(
+    py_path: str,
+    stdin_data: str,
+    timeout_s: float,
+    memory_limit_mb: Optional[int] = None,
+    matcher: Optional[StreamingMatcher] = None,
+    stdin_file: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Run a Python file with given stdin data and timeout, under rlimits (see judge.sandbox).
+    stdin_file: optional file whose contents follow stdin_data on stdin.
+
+    Uses the warm zygote pool when enabled (JUDGE_PY_ZYGOTE=1) and a zygote
+    is free; otherwise starts a fresh interpreter.
+    """
+    pool = get_zygote_pool()
+    if pool is not None:
+        try:
+            return pool.run(py_path, stdin_data, timeout_s, memory_limit_mb, matcher, stdin_file=stdin_file)
+        except ZygoteUnavailable:
+            pass
+
+    try:
+        return run_limited(["python3", py_path], stdin_data, timeout_s, memory_limit_mb, matcher, stdin_file=stdin_file)
+    except FileNotFoundError:
+        # Fallback to 'python' if 'python3' not found
+        try:
+            return run_limited(["python", py_path], stdin_data, timeout_s, memory_limit_mb, matcher, stdin_file=stdin_file)
+        except Exception as e:
+            return failed_run(f"Python execution error: {str(e)}")
+
+
+class PythonDriver(LanguageDriver):
+    name = "python"
+    aliases = ("python", "py", "python3")
+    source_file = "main.py"
+    default_time_limit_sec = 5.0  # Python typically needs more time than C++
+    compile_error_status = "syntax_error"
+
+    def compile(self, code: str, work: Path, profile: str = "release") -> Dict[str, Any]:
+        # Validate Python syntax first
+        is_valid, syntax_error = validate_python_syntax(code)
+        if not is_valid:
+            return {"ok": False, "artifact": "", "stdout": "", "stderr": syntax_error}
+        return super().compile(code, work, profile)
+
+    def command(self, artifact: str, memory_limit_mb: Optional[int]) -> List[str]:
+        # Only for running a file directly (e.g. a custom checker); submissions go through run()
+        return ["python3", artifact]
+
+    def run(
+        self,
+        artifact: str,
+        stdin_data: str,
+        timeout_s: float,
+        memory_limit_mb: Optional[int] = None,
+        matcher: Optional[StreamingMatcher] = None,
+        stdin_file: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        return run_python(artifact, stdin_data, timeout_s, memory_limit_mb, matcher, stdin_file=stdin_file)
+
+
+class JavaScriptDriver(LanguageDriver):
+    name = "javascript"
+    aliases = ("javascript", "js", "node")
+    source_file = "main.js"
+    default_time_limit_sec = 3.0
+    limit_address_space = False
+
+    def command(self, artifact: str, memory_limit_mb: Optional[int]) -> List[str]:
+        cmd = ["node"]
+        if memory_limit_mb:
+            cmd.append(f"--max-old-space-size={int(memory_limit_mb)}")
+        return cmd + [artifact]
+
+
+# ----------------------------
+# Registry
+# ----------------------------
+
+_drivers: Dict[str, LanguageDriver] = {}
+
+
+def register_driver(driver: LanguageDriver) -> None:
+    for alias in (driver.name, *driver.aliases):
+        _drivers[alias.lower()] = driver
+
+
+def get_driver(language: str) -> Optional[LanguageDriver]:
+    return _drivers.get((language or "").lower())
+
+
+def supported_languages() -> List[str]:
+    return sorted({d.name for d in _drivers.values()})
+
+
+for _driver in (CppDriver(), CDriver(), RustDriver(), PythonDriver(), JavaScriptDriver()):
+    register_driver(_driver)
@@ -0,0 +1,391 @@
+# Backend/judge/engine.py
+import hashlib
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.cache import TTLCache
+from judge.checkers import CheckerError, get_custom_checker, make_matcher
+from judge.compare import OutputSpool
+from judge.drivers import LanguageDriver, get_driver
+from judge.jobs import EventCallback
+from judge.modes import run_cases, submission_status
+from judge.parts import get_part, part_cases
+from judge.sandbox import JUDGE_DEFAULT_MEMORY_MB
+from judge.testdata import TestFile
+from judge.workspace import get_workspace_pool
+
+# Cap on the time limit a POST /run caller may ask for
+JUDGE_RUN_MAX_TIME_SEC = float(os.getenv("JUDGE_RUN_MAX_TIME_SEC", "5"))
+JUDGE_VERDICT_CACHE_TTL_SEC = float(os.getenv("JUDGE_VERDICT_CACHE_TTL_SEC", "600"))
+JUDGE_VERDICT_CACHE_MAX = int(os.getenv("JUDGE_VERDICT_CACHE_MAX", "2048"))
+# Verdicts carry each test's stdout/stderr prefixes: bound the total too
+JUDGE_VERDICT_CACHE_MAX_MB = float(os.getenv("JUDGE_VERDICT_CACHE_MAX_MB", "64"))
+
+
+def _verdict_size(result: Dict[str, Any]) -> int:
+    # Approximate: the captured output dominates, plus a flat cost per test
+    size = 512 + len(result.get("compile_stdout", "")) + len(result.get("compile_stderr", ""))
+    for t in result.get("tests", []) or []:
+        size += 256 + len(t.get("stdout", "")) + len(t.get("stderr", ""))
+    return size
+
+
+_verdict_cache = TTLCache(
+    max_entries=JUDGE_VERDICT_CACHE_MAX,
+    ttl_sec=JUDGE_VERDICT_CACHE_TTL_SEC,
+    max_bytes=int(JUDGE_VERDICT_CACHE_MAX_MB * 1024 * 1024),
+    sizeof=_verdict_size,
+)
+
+
+def _part_summary(part: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": part.get("id", ""),
+        "name": part.get("name", ""),
+        "description": part.get("description", ""),
+        "next": str(part.get("next", "")) if part.get("next") is not None else "",
+    }
+
+
+def run_test_cases(
+    driver: LanguageDriver,
+    artifact: str,
+    part: Dict[str, Any],
+    stdin_args: str,
+    parallel: Optional[bool] = None,
+    on_event: Optional[EventCallback] = None,
+    mode: str = "full",
+    reuse: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """
+    part schema (strings-only):
+      inputs:  [<stdin string>, ...]
+      outputs: [<expected stdout string>, ...]  ('output' is accepted too)
+      time_limit_sec: optional (default: the driver's)
+      memory_limit_mb: optional (default JUDGE_DEFAULT_MEMORY_MB)
+      sample_count: optional, number of leading test cases that are public samples (default 1)
+      checker: optional, how output is compared (see judge.checkers; default exact)
+
+    mode: "full" | "fail_fast" | "sample_first" (see judge.modes)
+    parallel: run test cases on the shared judge pool (default: JUDGE_PARALLEL_TESTS).
+    on_event: optional callback, receives "test_started" / "test_finished" per test case.
+    reuse: earlier per-test results keyed by case hash (see judge.parts.case_hash);
+      test cases found there are not run again.
+    """
+    emit = on_event or (lambda event, data: None)
+    memory_limit = int(part.get("memory_limit_mb", JUDGE_DEFAULT_MEMORY_MB))
+    time_limit = float(part.get("time_limit_sec", driver.default_time_limit_sec))
+
+    # Decoded inputs and normalized expected lines, cached with the part
+    prepared = part_cases(part)
+    checker = prepared["checker"]
+    inputs: List[Any] = prepared["inputs"]  # str, or TestFile for file-backed cases
+    # The exact checker compares against the prepared lines, the others the raw output
+    outputs: List[Any] = prepared["expected_lines"] if checker["type"] == "exact" else prepared["outputs"]
+    hashes: List[str] = prepared["hashes"]
+
+    if prepared.get("error"):
+        return {
+            "status": "bad_testcase",
+            "detail": prepared["error"],
+        }
+
+    if len(inputs) != len(outputs):
+        return {
+            "status": "bad_testcase",
+            "detail": f"inputs length ({len(inputs)}) != outputs length ({len(outputs)})",
+        }
+
+    if len(inputs) == 0:
+        return {
+            "status": "bad_testcase",
+            "detail": "No test cases found",
+        }
+
+    custom = None
+    if checker["type"] == "custom":
+        try:
+            custom = get_custom_checker(checker)
+        except CheckerError as e:
+            return {
+                "status": "bad_testcase",
+                "detail": f"checker: {e}",
+            }
+
+    def run_one(case: Tuple[int, Any, Any]) -> Dict[str, Any]:
+        i, tc_in, expected = case
+        tc_id = f"tc{i}"
+
+        # Prepend stdin_args if the program reads an "argv line" from stdin
+        prefix = stdin_args.strip() + "\n" if stdin_args.strip() else ""
+        if isinstance(tc_in, TestFile):
+            # Straight from the store to the child's stdin
+            stdin_data, stdin_file = prefix, tc_in.path
+        else:
+            stdin_data, stdin_file = prefix + tc_in, None
+
+        def run_with(matcher: Any) -> Dict[str, Any]:
+            return driver.run(
+                artifact,
+                stdin_data,
+                timeout_s=time_limit,
+                memory_limit_mb=memory_limit,
+                matcher=matcher,
+                stdin_file=stdin_file,
+            )
+
+        def completed(run: Dict[str, Any]) -> bool:
+            return not run["timed_out"] and run["exit_code"] == 0 and not run["output_limit_exceeded"]
+
+        emit("test_started", {"id": tc_id})
+        checker_message = None
+        if custom is None:
+            run = run_with(make_matcher(checker, expected))
+            passed = completed(run) and bool(run["output_matched"])
+        else:
+            # The checker program needs the whole output: spool it to the workspace
+            with get_workspace_pool().checkout(prefix="checker_") as scratch:
+                spool = OutputSpool(str(scratch / "output"))
+                try:
+                    run = run_with(spool)
+                finally:
+                    spool.close()
+                passed = completed(run)
+                if passed:
+                    passed, checker_message = custom.check(scratch, tc_in, spool.path, expected)
+        rcode, timed_out = run["exit_code"], run["timed_out"]
+
+        result = {
+            "id": tc_id,
+            "passed": passed,
+            "skipped": False,
+            "timed_out": timed_out,
+            "exit_code": rcode,
+            "stdout": run["stdout"],
+            "stderr": run["stderr"],
+            "stdout_truncated": run["stdout_truncated"],
+            "stderr_truncated": run["stderr_truncated"],
+            "stopped_early": run["stopped_early"],
+            "memory_limit_exceeded": run["memory_limit_exceeded"],
+            "output_limit_exceeded": run["output_limit_exceeded"],
+            "time_ms": run["wall_ms"],
+            "cpu_ms": run["cpu_ms"],
+            "peak_rss_kb": run["peak_rss_kb"],
+        }
+        if checker_message is not None:
+            result["checker_message"] = checker_message
+        emit("test_finished", result)
+        return result
+
+    cases = [(i, tc_in, expected) for i, (tc_in, expected) in enumerate(zip(inputs, outputs), start=1)]
+    sample_count = int(part.get("sample_count", 1) or 0)
+
+    reused: Dict[int, Dict[str, Any]] = {}
+    for i, h in enumerate(hashes, start=1):
+        prev = (reuse or {}).get(h)
+        if prev is not None:
+            # Stored results carry no output (see judge.submissions)
+            reused[i] = {"stdout": "", "stderr": "", **prev, "id": f"tc{i}"}
+    if reused:
+        cases = [c for c in cases if c[0] not in reused]
+        sample_count = sum(1 for c in cases if c[0] <= sample_count)
+
+    ran = run_cases(run_one, cases, mode=mode, sample_count=sample_count, parallel=parallel) if cases else []
+    by_index = {**reused, **{c[0]: r for c, r in zip(cases, ran)}}
+    results = [by_index[i] for i in range(1, len(inputs) + 1)]
+
+    return {
+        "status": submission_status(results),
+        "tests": results,
+        "part": _part_summary(part),
+        "part_version": prepared["version"],
+    }
+
+
+# ----------------------------
+# Verdict memoization
+# ----------------------------
+
+def normalized_source_hash(code: str) -> str:
+    """
+    Hash of the source with line endings unified and trailing whitespace at
+    the end of the file dropped, so a resubmission from another editor still hits.
+    """
+    norm = code.replace("\r\n", "\n").rstrip()
+    return hashlib.sha256(norm.encode("utf-8")).hexdigest()
+
+
+def verdict_key(driver: LanguageDriver, part: Dict[str, Any], code: str, stdin_args: str, judge_mode: str) -> Tuple:
+    return (normalized_source_hash(code), driver.name, stdin_args or "", part_cases(part)["version"], judge_mode)
+
+
+def _cacheable(result: Dict[str, Any]) -> bool:
+    # A time limit verdict can flip on a retry under less load: don't pin it
+    return not any(t.get("timed_out") for t in result.get("tests", []) or [])
+
+
+def clear_verdict_cache() -> None:
+    _verdict_cache.clear()
+
+
+def verdict_cache_stats() -> Dict[str, Any]:
+    return _verdict_cache.stats()
+
+
+def cached_verdict(
+    project_id: str,
+    language: str,
+    code: str,
+    stdin_args: str = "",
+    judge_mode: str = "full",
+) -> Optional[Dict[str, Any]]:
+    """
+    The cached verdict judge_submission() would answer with, or None.
+    Cheap enough to call before taking a judge slot.
+    """
+    driver = get_driver(language)
+    if driver is None:
+        return None
+    part = get_part(project_id)
+    if part is None:
+        return None
+    cached = _verdict_cache.get(verdict_key(driver, part, code, stdin_args, judge_mode))
+    return None if cached is None else {**cached, "cached": True}
+
+
+def judge_submission(
+    project_id: str,
+    language: str,
+    code: str,
+    stdin_args: str = "",
+    on_event: Optional[EventCallback] = None,
+    judge_mode: str = "full",
+    force: bool = False,
+) -> Dict[str, Any]:
+    """
+    Compile (if the language needs it) and judge code against a part.
+
+    project_id == Firestore doc id in collection 'parts'
+    language: any alias of a registered driver (see judge.drivers)
+    judge_mode: "full" | "fail_fast" | "sample_first"
+    on_event: optional progress callback, called as on_event(event, data) with
+      "status" ({"status": "compiling" | "running"}), "compile_finished",
+      then "test_started" / "test_finished" for each test case
+    force: skip the verdict cache and judge again
+
+    An identical earlier submission (same normalized source, language,
+    stdin_args, judge_mode and part test data) is answered from the verdict
+    cache, with "cached": True and no progress events.
+    """
+    driver = get_driver(language)
+    if driver is None:
+        return {"status": "unsupported_language"}
+
+    part = get_part(project_id)
+    if part is None:
+        return {"status": "unknown_project"}
+
+    key = verdict_key(driver, part, code, stdin_args, judge_mode)
+    if not force:
+        cached = _verdict_cache.get(key)
+        if cached is not None:
+            return {**cached, "cached": True}
+
+    result = judge_code(driver, part, code, stdin_args=stdin_args, on_event=on_event, judge_mode=judge_mode)
+    if _cacheable(result):
+        _verdict_cache.set(key, result)
+    return {**result, "cached": False}
+
+
+def judge_code(
+    driver: LanguageDriver,
+    part: Dict[str, Any],
+    code: str,
+    stdin_args: str = "",
+    on_event: Optional[EventCallback] = None,
+    judge_mode: str = "full",
+    reuse: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """
+    judge_submission() for an already resolved driver and part document.
+    reuse: see run_test_cases.
+    """
+    emit = on_event or (lambda event, data: None)
+
+    with get_workspace_pool().checkout(prefix=f"judge_{driver.name}_") as work:
+        emit("status", {"status": "compiling"})
+        t0 = time.monotonic()
+        built = driver.compile(code, work)
+        emit("compile_finished", {"ok": built["ok"], "time_ms": round((time.monotonic() - t0) * 1000, 1)})
+        if not built["ok"]:
+            return {
+                "status": driver.compile_error_status,
+                "compile_stdout": built["stdout"],
+                "compile_stderr": built["stderr"],
+                "tests": [],
+            }
+
+        emit("status", {"status": "running"})
+        return run_test_cases(
+            driver, built["artifact"], part, stdin_args=stdin_args, on_event=on_event, mode=judge_mode, reuse=reuse
+        )
+
+
+def run_once(
+    language: str,
+    code: str,
+    stdin: str = "",
+    time_limit_sec: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Compile with the quick profile and run once on user-supplied stdin
+    (POST /run). No part, no expected output: the program's output is
+    returned as is (bounded prefix, see judge.sandbox).
+
+    status: "ok" | "runtime_error" | "timed_out" | "memory_limit_exceeded" |
+            "output_limit_exceeded" | compile_error / syntax_error | "unsupported_language"
+    """
+    driver = get_driver(language)
+    if driver is None:
+        return {"status": "unsupported_language"}
+
+    time_limit = min(float(time_limit_sec or driver.default_time_limit_sec), JUDGE_RUN_MAX_TIME_SEC)
+
+    with get_workspace_pool().checkout(prefix=f"run_{driver.name}_") as work:
+        t0 = time.monotonic()
+        built = driver.compile(code, work, profile="quick")
+        compile_ms = round((time.monotonic() - t0) * 1000, 1)
+        if not built["ok"]:
+            return {
+                "status": driver.compile_error_status,
+                "compile_stdout": built["stdout"],
+                "compile_stderr": built["stderr"],
+                "compile_ms": compile_ms,
+            }
+        run = driver.run(built["artifact"], stdin, timeout_s=time_limit, memory_limit_mb=JUDGE_DEFAULT_MEMORY_MB)
+
+    if run["timed_out"]:
+        status = "timed_out"
+    elif run["memory_limit_exceeded"]:
+        status = "memory_limit_exceeded"
+    elif run["output_limit_exceeded"]:
+        status = "output_limit_exceeded"
+    elif run["exit_code"] != 0:
+        status = "runtime_error"
+    else:
+        status = "ok"
+
+    return {
+        "status": status,
+        "exit_code": run["exit_code"],
+        "stdout": run["stdout"],
+        "stderr": run["stderr"],
+        "stdout_truncated": run["stdout_truncated"],
+        "stderr_truncated": run["stderr_truncated"],
+        "time_limit_sec": time_limit,
+        "compile_ms": compile_ms,
+        "time_ms": run["wall_ms"],
+        "cpu_ms": run["cpu_ms"],
+        "peak_rss_kb": run["peak_rss_kb"],
+    }
@@ -0,0 +1,124 @@
+# Backend/judge/jobs.py
+import os
+import queue
+import threading
+import time
+import traceback
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+# on_event(event, data) callback threaded through the judge functions
+EventCallback = Callable[[str, Dict[str, Any]], None]
+
+JUDGE_QUEUE_WORKERS = int(os.getenv("JUDGE_QUEUE_WORKERS", "2"))
+# Batch and regrade jobs get their own workers: they wait on background
+# admission, which must never hold up the workers async submissions need
+JUDGE_BACKGROUND_QUEUE_WORKERS = int(os.getenv("JUDGE_BACKGROUND_QUEUE_WORKERS", "1"))
+JUDGE_JOB_TTL_SEC = float(os.getenv("JUDGE_JOB_TTL_SEC", "3600"))
+# Jobs waiting for a worker, per queue; submit_job raises QueueFull beyond that
+JUDGE_QUEUE_MAX = int(os.getenv("JUDGE_QUEUE_MAX", "256"))
+
+_jobs: Dict[str, Dict[str, Any]] = {}
+_jobs_lock = threading.Lock()
+_queue: "queue.Queue[tuple[str, Callable[[EventCallback], Dict[str, Any]]]]" = queue.Queue(JUDGE_QUEUE_MAX)
+_background_queue: "queue.Queue[tuple[str, Callable[[EventCallback], Dict[str, Any]]]]" = queue.Queue(JUDGE_QUEUE_MAX)
+_workers: List[threading.Thread] = []
+_background_workers: List[threading.Thread] = []
+
+
+class QueueFull(Exception):
+    pass
+
+
+def _set(job_id: str, **fields: Any) -> None:
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is not None:
+            job.update(fields)
+
+
+def _worker(jobs: "queue.Queue[tuple[str, Callable[[EventCallback], Dict[str, Any]]]]") -> None:
+    while True:
+        job_id, fn = jobs.get()
+        try:
+            # Still "queued": fn may wait for admission first. The judge
+            # reports "compiling" / "running" itself through on_event
+            _set(job_id, started_at=time.time())
+
+            def on_event(event: str, data: Dict[str, Any]) -> None:
+                if event == "status":
+                    _set(job_id, status=data["status"])
+
+            result = fn(on_event)
+            _set(job_id, status="done", result=result, finished_at=time.time())
+        except Exception as e:
+            traceback.print_exc()
+            _set(job_id, status="error", error=str(e), finished_at=time.time())
+        finally:
+            jobs.task_done()
+
+
+def _ensure_workers(background: bool) -> None:
+    jobs, workers, count, name = (
+        (_background_queue, _background_workers, JUDGE_BACKGROUND_QUEUE_WORKERS, "judge-background")
+        if background
+        else (_queue, _workers, JUDGE_QUEUE_WORKERS, "judge-queue")
+    )
+    with _jobs_lock:
+        while len(workers) < max(1, count):
+            t = threading.Thread(target=_worker, args=(jobs,), name=f"{name}-{len(workers)}", daemon=True)
+            t.start()
+            workers.append(t)
+
+
+def _prune_locked(now: float) -> None:
+    expired = [
+        jid for jid, job in _jobs.items()
+        if job.get("finished_at") and now - job["finished_at"] > JUDGE_JOB_TTL_SEC
+    ]
+    for jid in expired:
+        del _jobs[jid]
+
+
+def submit_job(
+    fn: Callable[[EventCallback], Dict[str, Any]],
+    meta: Optional[Dict[str, Any]] = None,
+    background: bool = False,
+) -> str:
+    """
+    Enqueue fn(on_event) for the judge workers and return its submission id.
+    background: batch-style work that waits on background admission; it
+    runs on separate workers.
+    Raises QueueFull if JUDGE_QUEUE_MAX jobs are already waiting.
+    """
+    _ensure_workers(background)
+    job_id = uuid.uuid4().hex
+    now = time.time()
+    with _jobs_lock:
+        _prune_locked(now)
+        _jobs[job_id] = {
+            "id": job_id,
+            "status": "queued",
+            "created_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            **(meta or {}),
+        }
+    try:
+        (_background_queue if background else _queue).put_nowait((job_id, fn))
+    except queue.Full:
+        with _jobs_lock:
+            del _jobs[job_id]
+        raise QueueFull("judge job queue is full") from None
+    return job_id
+
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        return dict(job) if job is not None else None
+
+
+def queue_depth() -> int:
+    return _queue.qsize() + _background_queue.qsize()
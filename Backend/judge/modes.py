@@ -0,0 +1,91 @@
+# Backend/judge/modes.py
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from judge.pool import JUDGE_PARALLEL_TESTS, JUDGE_WORKERS, map_ordered
+
+# full:         run every test case (default)
+# fail_fast:    stop at the first failing test case, the rest are skipped
+# sample_first: run the public samples first, hidden tests only if they all pass
+JUDGE_MODES = {"full", "fail_fast", "sample_first"}
+
+# (index, stdin, expected) as built by run_test_cases: expected is the
+# normalized lines for the exact checker, the raw output for the others
+# (judge.checkers); for file-backed test data stdin and expected are TestFiles
+Case = Tuple[int, Any, Any]
+
+
+def skipped_result(case: Case) -> Dict[str, Any]:
+    return {
+        "id": f"tc{case[0]}",
+        "passed": False,
+        "skipped": True,
+        "timed_out": False,
+        "exit_code": None,
+        "stdout": "",
+        "stderr": "",
+        "stdout_truncated": False,
+        "stderr_truncated": False,
+        "stopped_early": False,
+        "memory_limit_exceeded": False,
+        "output_limit_exceeded": False,
+        "time_ms": 0.0,
+        "cpu_ms": 0.0,
+        "peak_rss_kb": 0,
+    }
+
+
+def submission_status(results: Sequence[Dict[str, Any]]) -> str:
+    """
+    Overall verdict: accepted, or the most specific failure across test cases.
+    """
+    if all(r["passed"] for r in results):
+        return "accepted"
+    if any(r.get("memory_limit_exceeded") for r in results):
+        return "memory_limit_exceeded"
+    return "wrong_answer"
+
+
+def _run_fail_fast(
+    run_one: Callable[[Case], Dict[str, Any]], cases: Sequence[Case], parallel: Optional[bool]
+) -> List[Dict[str, Any]]:
+    # Run in waves of one pool's width so parallel mode still stops early.
+    # Everything after the first failure is reported as skipped, even if it
+    # already ran in the same wave, so the verdict doesn't depend on pool size.
+    if parallel is None:
+        parallel = JUDGE_PARALLEL_TESTS
+    wave = JUDGE_WORKERS if parallel else 1
+    results: List[Dict[str, Any]] = []
+    for start in range(0, len(cases), wave):
+        chunk = cases[start:start + wave]
+        for case, result in zip(chunk, map_ordered(run_one, chunk, parallel=parallel)):
+            if results and not results[-1]["passed"]:
+                results.append(skipped_result(case))
+            else:
+                results.append(result)
+        if not results[-1]["passed"]:
+            break
+    results.extend(skipped_result(case) for case in cases[len(results):])
+    return results
+
+
+def run_cases(
+    run_one: Callable[[Case], Dict[str, Any]],
+    cases: Sequence[Case],
+    mode: str = "full",
+    sample_count: int = 1,
+    parallel: Optional[bool] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Run test cases according to the judge mode. Results stay in tc1..tcN order.
+    """
+    if mode == "fail_fast":
+        return _run_fail_fast(run_one, cases, parallel)
+
+    if mode == "sample_first":
+        samples, hidden = cases[:sample_count], cases[sample_count:]
+        results = map_ordered(run_one, samples, parallel=parallel)
+        if all(r["passed"] for r in results):
+            return results + map_ordered(run_one, hidden, parallel=parallel)
+        return results + [skipped_result(case) for case in hidden]
+
+    return map_ordered(run_one, cases, parallel=parallel)
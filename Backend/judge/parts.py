@@ -0,0 +1,166 @@
+# Backend/judge/parts.py
+import hashlib
+import json
+import os
+from typing import Any, Dict, List
+
+from core.cache import TTLCache
+from judge.checkers import parse_checker
+from judge.compare import expected_lines
+from judge.testdata import TestFile, get_testdata_store, manifest_part
+from users.repo import get_db
+
+JUDGE_PART_CACHE_TTL_SEC = float(os.getenv("JUDGE_PART_CACHE_TTL_SEC", "300"))
+JUDGE_PART_CACHE_MAX = int(os.getenv("JUDGE_PART_CACHE_MAX", "512"))
+
+_part_cache = TTLCache(max_entries=JUDGE_PART_CACHE_MAX, ttl_sec=JUDGE_PART_CACHE_TTL_SEC)
+
+
+# ----------------------------
+# Helpers: part lookup
+# ----------------------------
+
+def _fetch_part(part_id: str) -> Dict[str, Any]:
+    """
+    Fetch a part/project document from Firestore.
+    Collection: parts
+    Doc ID: part_id
+    """
+    doc = get_db().collection("parts").document(str(part_id)).get()
+    if not doc.exists:
+        # Projects from the local manifest (projects.json) with file-backed tests
+        local = manifest_part(part_id)
+        if local is not None:
+            return local
+        # Fallback for Demo/Hackathon if using MockDB or ID mismatch
+        # Return a default "Hello World" setup so execution always works
+        return {
+            "id": str(part_id),
+            "name": "Demo Project",
+            "description": "Auto-generated demo project for testing.",
+            "inputs": [""],
+            "outputs": ["Hello World\n"],
+            "time_limit_sec": 1.0,
+            "next": None
+        }
+    data = doc.to_dict() or {}
+    data["id"] = str(part_id)
+    return data
+
+
+def decode_escapes_if_needed(s: str) -> str:
+    """
+    If Firestore stored literal backslash-n sequences (\\n), convert to real newlines.
+    We only do a minimal, safe conversion to avoid surprising transformations.
+    """
+    if "\\n" in s and "\n" not in s:
+        s = s.replace("\\n", "\n")
+    if "\\t" in s and "\t" not in s:
+        s = s.replace("\\t", "\t")
+    return s
+
+
+def case_hash(tc_in: Any, expected: Any, part: Dict[str, Any]) -> str:
+    """
+    Identity of one test case: its stdin, normalized expected output (or
+    their test data references), the part's limits and its checker. A
+    stored result for the same hash is still valid.
+    """
+    def ident(x: Any) -> Any:
+        return x.ref if isinstance(x, TestFile) else x
+
+    payload = json.dumps(
+        [ident(tc_in), ident(expected), part.get("time_limit_sec"), part.get("memory_limit_mb"), part.get("checker")],
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def build_cases(part: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Decode the part's test data once:
+      inputs:         decoded stdin strings
+      outputs:        decoded expected stdout strings
+      expected_lines: normalized expected lines for judge.compare.StreamingMatcher
+      hashes:         case_hash per test case
+      version:        hash of the whole test data; changes whenever any case does
+      checker:        the part's checker spec (see judge.checkers)
+      error:          why the test data is unusable, or None
+
+    File-backed cases from "testcases" (see judge.testdata) come after the
+    inline ones; for those, inputs/outputs/expected_lines hold the TestFile.
+    """
+    inputs = [decode_escapes_if_needed(s) for s in (part.get("inputs", []) or [])]
+    outputs = list(part.get("outputs", []) or [])
+    if not outputs:
+        # Try singular 'output' key if 'outputs' is empty
+        outputs = list(part.get("output", []) or [])
+    outputs = [decode_escapes_if_needed(s) for s in outputs]
+    lines: List[Any] = [expected_lines(s) for s in outputs]
+
+    error = None
+    try:
+        checker = parse_checker(part.get("checker"))
+    except (TypeError, ValueError) as e:
+        checker, error = {"type": "exact"}, f"checker: {e}"
+
+    store = get_testdata_store()
+    for tc in part.get("testcases", []) or []:
+        try:
+            tc_in, tc_out = store.resolve(tc.get("input", "")), store.resolve(tc.get("output", ""))
+        except (ValueError, FileNotFoundError) as e:
+            error = f"test case {tc.get('id', '?')}: {e}"
+            break
+        inputs.append(tc_in)
+        outputs.append(tc_out)
+        lines.append(tc_out)
+
+    hashes = [case_hash(tc_in, expected, part) for tc_in, expected in zip(inputs, lines)]
+    version = hashlib.sha256(
+        json.dumps([hashes, len(inputs), len(outputs)]).encode("utf-8")
+    ).hexdigest()[:16]
+    return {
+        "inputs": inputs,
+        "outputs": outputs,
+        "expected_lines": lines,
+        "hashes": hashes,
+        "version": version,
+        "checker": checker,
+        "error": error,
+    }
+
+
+def part_cases(part: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Prepared test data for a part: the cached copy if the part came from
+    get_part, otherwise built on the spot.
+    """
+    cases = part.get("_cases")
+    return cases if cases is not None else build_cases(part)
+
+
+def get_part(part_id: str) -> Dict[str, Any]:
+    """
+    Part document with its prepared test data under "_cases", served from
+    the in-process TTL cache. Treat the returned dict as read-only: it is
+    shared between concurrent submissions.
+    """
+    key = str(part_id)
+    part = _part_cache.get(key)
+    if part is None:
+        part = _fetch_part(key)
+        part["_cases"] = build_cases(part)
+        _part_cache.set(key, part)
+    return part
+
+
+def invalidate_part(part_id: str) -> bool:
+    return _part_cache.invalidate(str(part_id))
+
+
+def clear_part_cache() -> None:
+    _part_cache.clear()
+
+
+def part_cache_stats() -> Dict[str, Any]:
+    return _part_cache.stats()
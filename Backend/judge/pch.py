@@ -0,0 +1,85 @@
+# Backend/judge/pch.py
+"""
+Precompiled headers for the quick compile profile (POST /run).
+
+GCC looks for `<dir>/<header>.gch` in each include directory before the
+header itself, so building `bits/stdc++.h.gch` into a directory and passing
+`-I <dir>` makes `#include <bits/stdc++.h>` nearly free -- as long as it's
+the first include and the flags match the ones the PCH was built with.
+A PCH that can't be used is silently ignored, so this is always safe.
+
+PCHs are built once per (compiler version, flags) in a background thread
+on first use; until they are ready, compiles just run without them.
+"""
+import hashlib
+import os
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from judge.compile_cache import compiler_version
+
+JUDGE_PCH = os.getenv("JUDGE_PCH", "1") == "1"
+JUDGE_PCH_DIR = os.getenv("JUDGE_PCH_DIR", os.path.join(tempfile.gettempdir(), "judge_pch"))
+JUDGE_PCH_HEADERS = [h.strip() for h in os.getenv("JUDGE_PCH_HEADERS", "bits/stdc++.h,iostream").split(",") if h.strip()]
+
+# (compiler, flags) -> PCH directory, or None while building / after a failure
+_dirs: Dict[Tuple[str, Tuple[str, ...]], Optional[str]] = {}
+_lock = threading.Lock()
+
+
+def _build(compiler: str, flags: List[str], out_dir: Path) -> bool:
+    src_dir = out_dir / "_src"
+    src_dir.mkdir(parents=True, exist_ok=True)
+    built = False
+    for header in JUDGE_PCH_HEADERS:
+        gch = out_dir / f"{header}.gch"
+        if gch.exists():
+            built = True
+            continue
+        gch.parent.mkdir(parents=True, exist_ok=True)
+        src = src_dir / Path(header).name
+        src.write_text(f"#include <{header}>\n", encoding="utf-8")
+        tmp = gch.with_name(gch.name + f".tmp{os.getpid()}")
+        try:
+            p = subprocess.run(
+                [compiler, *flags, "-x", "c++-header", str(src), "-o", str(tmp)],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        except FileNotFoundError:
+            return False
+        if p.returncode == 0:
+            os.replace(tmp, gch)
+            built = True
+        else:
+            tmp.unlink(missing_ok=True)
+    return built
+
+
+def pch_include_flags(compiler: str, flags: List[str]) -> List[str]:
+    """
+    Extra flags that make compiler + flags pick up the precompiled headers,
+    or [] if they aren't ready yet (the first call starts building them).
+    """
+    if not JUDGE_PCH:
+        return []
+    key = (compiler, tuple(flags))
+    with _lock:
+        if key in _dirs:
+            d = _dirs[key]
+            return ["-I", d] if d else []
+        _dirs[key] = None
+
+    tag = hashlib.sha256("\0".join([compiler_version(compiler), *flags]).encode("utf-8")).hexdigest()[:16]
+    out_dir = Path(JUDGE_PCH_DIR) / tag
+
+    def build() -> None:
+        if _build(compiler, flags, out_dir):
+            with _lock:
+                _dirs[key] = str(out_dir)
+
+    threading.Thread(target=build, name="judge-pch", daemon=True).start()
+    return []
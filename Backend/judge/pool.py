@@ -0,0 +1,38 @@
+# Backend/judge/pool.py
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# One shared pool for every submission: its size is the global cap on test
+# processes running at once, so concurrent submissions can't oversubscribe cores.
+JUDGE_WORKERS = int(os.getenv("JUDGE_WORKERS", "0")) or os.cpu_count() or 1
+JUDGE_PARALLEL_TESTS = os.getenv("JUDGE_PARALLEL_TESTS", "1") == "1"
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is not None:
+        return _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=JUDGE_WORKERS, thread_name_prefix="judge")
+    return _executor
+
+
+def map_ordered(fn: Callable[[T], R], items: Sequence[T], parallel: Optional[bool] = None) -> List[R]:
+    """
+    Apply fn to every item, on the shared judge pool when parallel.
+    Results always come back in input order.
+    """
+    if parallel is None:
+        parallel = JUDGE_PARALLEL_TESTS
+    if not parallel or len(items) <= 1:
+        return [fn(x) for x in items]
+    return list(get_executor().map(fn, items))
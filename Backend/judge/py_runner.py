@@ -0,0 +1,377 @@
+# Backend/judge/py_runner.py
+"""
+Warm Python runner pool.
+
+Each zygote is a long-lived `python3` process that has already paid for
+interpreter startup. For every test case it forks a child, points fd 0 at
+the input file and fds 1/2 at FIFOs the judge reads while the child runs,
+and executes the student script as __main__ in the child. Output goes
+through the same streaming capture and matcher as sandbox.run_limited, so
+the output limit and stop-on-mismatch apply; the judge enforces the time
+limit by killing the child.
+
+The child behaves like `python3 script.py`: it keeps the interpreter's own
+sys.stdin/stdout/stderr (so -u, PYTHONUNBUFFERED and PYTHONIOENCODING work
+the same), the zygote loads no modules beyond interpreter startup, and the
+exit follows CPython's (SystemExit codes, 1 after a traceback, SIGINT after
+KeyboardInterrupt, 120 when flushing stdout fails). Known differences: the
+child's parent is the zygote, sys.orig_argv is the zygote's, and the
+interpreter was started before the test case. Set JUDGE_PY_ZYGOTE=0 to run
+every test case in a fresh interpreter instead.
+"""
+import os
+import selectors
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from judge.pool import JUDGE_WORKERS
+from judge.sandbox import JUDGE_OUTPUT_LIMIT_BYTES, JUDGE_STOP_ON_MISMATCH, OutputCapture, rlimits, usage_result
+
+JUDGE_PY_ZYGOTE = os.getenv("JUDGE_PY_ZYGOTE", "1") == "1"
+JUDGE_PY_ZYGOTES = int(os.getenv("JUDGE_PY_ZYGOTES", "0")) or JUDGE_WORKERS
+
+_PIPE_CHUNK = 64 * 1024
+
+# Runs inside the zygote. Protocol, one line each way on stdin/stdout:
+#   request  script NUL stdin NUL stdout-fifo NUL stderr-fifo NUL which=value,...
+#   replies  "pid <pid>" right after the fork,
+#            "done <returncode> <utime> <stime> <maxrss> <rss floor kb>" when the child exits
+# Only modules loaded by interpreter startup are used, except resource, which
+# the child drops again so the script sees a plain interpreter.
+ZYGOTE_SRC = r'''
+import _signal, os, sys
+import resource
+
+def _exit_code(e):
+    if e.code is None:
+        return 0
+    if isinstance(e.code, int):
+        return e.code
+    print(e.code, file=sys.stderr)
+    return 1
+
+def _child(script, stdin_path, out_fd, err_fd, limits):
+    for which, value in limits:
+        resource.setrlimit(which, (value, value + 1 if which == resource.RLIMIT_CPU else value))
+    del sys.modules["resource"]
+    f = os.open(stdin_path, os.O_RDONLY)
+    os.dup2(f, 0)
+    os.close(f)
+    os.dup2(out_fd, 1)
+    os.dup2(err_fd, 2)
+    os.close(out_fd)
+    os.close(err_fd)
+
+    # sys.stdin/stdout/stderr stay the interpreter's own objects for fds 0-2
+    # (never used by the zygote), so encoding and buffering match `python3 script`
+    main = type(sys)("__main__")
+    main.__file__ = script
+    main.__cached__ = None
+    main.__builtins__ = __builtins__
+    main.__loader__ = sys.modules["_frozen_importlib_external"].SourceFileLoader("__main__", script)
+    sys.modules["__main__"] = main
+    sys.argv = [script]
+    sys.path[0] = os.path.dirname(script)
+
+    code = 0
+    interrupted = False
+    try:
+        with open(script, "rb") as f:
+            source = f.read()
+        exec(compile(source, script, "exec"), main.__dict__)
+    except SystemExit as e:
+        code = _exit_code(e)
+    except BaseException as e:
+        # Drop the zygote's frames so the traceback matches `python3 script`
+        tb = e.__traceback__
+        while tb is not None and tb.tb_frame.f_code.co_filename != script:
+            tb = tb.tb_next
+        sys.excepthook(type(e), e.with_traceback(tb), tb)
+        interrupted = isinstance(e, KeyboardInterrupt)
+        code = 1
+    try:
+        if "threading" in sys.modules:
+            sys.modules["threading"]._shutdown()
+        sys.modules["atexit"]._run_exitfuncs()
+    except SystemExit as e:
+        code = _exit_code(e)
+    except BaseException:
+        pass
+    try:
+        sys.stdout.flush()
+    except BaseException:
+        code = 120
+    try:
+        sys.stderr.flush()
+    except BaseException:
+        pass
+    if interrupted:
+        _signal.signal(_signal.SIGINT, _signal.SIG_DFL)
+        os.kill(os.getpid(), _signal.SIGINT)
+    os._exit(code & 0xFF)
+
+def _statm_rss_kb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+
+buf = b""
+while True:
+    while b"\n" not in buf:
+        chunk = os.read(0, 65536)
+        if not chunk:
+            os._exit(0)
+        buf += chunk
+    line, buf = buf.split(b"\n", 1)
+    script, stdin_path, stdout_path, stderr_path, limits = os.fsdecode(line).split("\0")
+    limits = [tuple(map(int, item.split("="))) for item in limits.split(",") if item]
+    rss_floor_kb = _statm_rss_kb()
+    # The judge holds the read ends open already, so these don't block
+    out_fd = os.open(stdout_path, os.O_WRONLY)
+    err_fd = os.open(stderr_path, os.O_WRONLY)
+    pid = os.fork()
+    if pid == 0:
+        _child(script, stdin_path, out_fd, err_fd, limits)
+    os.close(out_fd)
+    os.close(err_fd)
+    os.write(1, b"pid %d\n" % pid)
+    _, status, ru = os.wait4(pid, 0)
+    os.write(1, ("done %d %r %r %d %d\n" % (
+        os.waitstatus_to_exitcode(status), ru.ru_utime, ru.ru_stime, ru.ru_maxrss, rss_floor_kb,
+    )).encode())
+'''
+
+
+class ZygoteUnavailable(Exception):
+    pass
+
+
+def _python_bin() -> str:
+    return shutil.which("python3") or shutil.which("python") or "python3"
+
+
+class Zygote:
+    def __init__(self):
+        self.proc = subprocess.Popen(
+            [_python_bin(), "-c", ZYGOTE_SRC],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        self._buf = b""
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def _read_line(self, deadline: float) -> Optional[List[str]]:
+        """
+        Next protocol line split into fields, or None if the deadline passes first.
+        """
+        fd = self.proc.stdout.fileno()
+        while b"\n" not in self._buf:
+            remaining = max(0.0, deadline - time.monotonic())
+            with selectors.DefaultSelector() as sel:
+                sel.register(fd, selectors.EVENT_READ)
+                if not sel.select(remaining):
+                    return None
+            chunk = os.read(fd, 4096)
+            if not chunk:
+                raise ZygoteUnavailable("zygote exited")
+            self._buf += chunk
+        line, self._buf = self._buf.split(b"\n", 1)
+        return line.decode().split()
+
+    def start(self, script: str, stdin_path: str, stdout_fifo: str, stderr_fifo: str, limits: Dict[int, int]) -> int:
+        """
+        Fork a child for one test case; returns its pid. The caller must
+        hold the FIFOs' read ends open.
+        """
+        fields = [script, stdin_path, stdout_fifo, stderr_fifo, ",".join(f"{w}={v}" for w, v in limits.items())]
+        try:
+            self.proc.stdin.write(os.fsencode("\0".join(fields)) + b"\n")
+            self.proc.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise ZygoteUnavailable(str(e))
+        started = self._read_line(time.monotonic() + 5.0)
+        if started is None:
+            raise ZygoteUnavailable("zygote did not fork in time")
+        return int(started[1])
+
+    def wait(self, deadline: float) -> Optional[Dict[str, Any]]:
+        """
+        Exit report (returncode, rusage, rss_floor_kb) of the running
+        child, or None if it is still running at the deadline.
+        """
+        done = self._read_line(deadline)
+        if done is None:
+            return None
+        return {
+            "returncode": int(done[1]),
+            "rusage": {"ru_utime": float(done[2]), "ru_stime": float(done[3]), "ru_maxrss": int(done[4])},
+            "rss_floor_kb": int(done[5]),
+        }
+
+    @staticmethod
+    def kill(pid: int) -> None:
+        # The zygote only reaps the child after this, so the pid is still ours
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    def close(self) -> None:
+        try:
+            self.proc.kill()
+            self.proc.wait(timeout=1)
+        except Exception:
+            pass
+
+
+class ZygotePool:
+    def __init__(self, size: int):
+        self.size = size
+        self._lock = threading.Lock()
+        self._idle: List[Zygote] = []
+        self._count = 0
+
+    def _acquire(self) -> Zygote:
+        with self._lock:
+            while self._idle:
+                z = self._idle.pop()
+                if z.alive():
+                    return z
+                z.close()
+                self._count -= 1
+            if self._count >= self.size:
+                raise ZygoteUnavailable("all zygotes busy")
+            self._count += 1
+        try:
+            return Zygote()
+        except Exception as e:
+            with self._lock:
+                self._count -= 1
+            raise ZygoteUnavailable(str(e))
+
+    def _release(self, z: Zygote, healthy: bool) -> None:
+        with self._lock:
+            if healthy and z.alive():
+                self._idle.append(z)
+                return
+            self._count -= 1
+        z.close()
+
+    def run(
+        self,
+        py_path: str,
+        stdin_data: str,
+        timeout_s: float,
+        memory_limit_mb: Optional[int] = None,
+        matcher: Optional[Any] = None,
+        stdin_file: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Same contract as run_python / sandbox.run_limited.
+        Raises ZygoteUnavailable when the caller should use the subprocess path.
+        """
+        z = self._acquire()
+        healthy = False
+        io_dir = tempfile.mkdtemp(prefix="pyrun_", dir=os.path.dirname(py_path))
+        fds: List[int] = []
+        try:
+            stdin_path = os.path.join(io_dir, "stdin")
+            stdout_fifo = os.path.join(io_dir, "stdout")
+            stderr_fifo = os.path.join(io_dir, "stderr")
+            if stdin_file and not stdin_data:
+                # The child opens the stored test file itself, read-only
+                stdin_path = stdin_file
+            else:
+                with open(stdin_path, "wb") as f:
+                    f.write(stdin_data.encode("utf-8"))
+                    if stdin_file:
+                        with open(stdin_file, "rb") as src:
+                            shutil.copyfileobj(src, f)
+            for fifo in (stdout_fifo, stderr_fifo):
+                os.mkfifo(fifo, 0o600)
+                fds.append(os.open(fifo, os.O_RDONLY | os.O_NONBLOCK))
+
+            out, err = OutputCapture(matcher), OutputCapture()
+            captures = {fds[0]: out, fds[1]: err}
+            timed_out = output_exceeded = stopped_early = False
+
+            t0 = time.monotonic()
+            deadline = t0 + timeout_s
+            pid = z.start(py_path, stdin_path, stdout_fifo, stderr_fifo, rlimits(timeout_s, memory_limit_mb))
+            with selectors.DefaultSelector() as sel:
+                for fd in fds:
+                    sel.register(fd, selectors.EVENT_READ)
+                while sel.get_map() and not (output_exceeded or stopped_early):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        timed_out = True
+                        break
+                    for key, _ in sel.select(remaining):
+                        chunk = os.read(key.fd, _PIPE_CHUNK)
+                        if not chunk:
+                            sel.unregister(key.fd)
+                            continue
+                        still_matching = captures[key.fd].feed(chunk)
+                        if out.total + err.total > JUDGE_OUTPUT_LIMIT_BYTES:
+                            output_exceeded = True
+                            break
+                        if not still_matching and JUDGE_STOP_ON_MISMATCH:
+                            stopped_early = True
+                            break
+            if timed_out or output_exceeded or stopped_early:
+                z.kill(pid)
+            # The pipes may hit EOF before the child exits, so keep the deadline
+            done = z.wait(deadline)
+            if done is None:
+                timed_out = True
+                z.kill(pid)
+                done = z.wait(time.monotonic() + 5.0)
+                if done is None:
+                    raise ZygoteUnavailable("zygote did not reap child")
+            wall_ms = (time.monotonic() - t0) * 1000
+            healthy = True
+
+            result = usage_result(
+                done["returncode"], out, err, timed_out, done["rusage"], wall_ms, memory_limit_mb,
+                output_exceeded, done["rss_floor_kb"],
+            )
+            result["stopped_early"] = stopped_early
+            return result
+        finally:
+            for fd in fds:
+                os.close(fd)
+            self._release(z, healthy)
+            shutil.rmtree(io_dir, ignore_errors=True)
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._count -= len(idle)
+        for z in idle:
+            z.close()
+
+
+_pool: Optional[ZygotePool] = None
+_pool_lock = threading.Lock()
+
+
+def get_zygote_pool() -> Optional[ZygotePool]:
+    """
+    The shared pool, or None when JUDGE_PY_ZYGOTE=0.
+    """
+    global _pool
+    if not JUDGE_PY_ZYGOTE:
+        return None
+    if _pool is not None:
+        return _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ZygotePool(JUDGE_PY_ZYGOTES)
+    return _pool
@@ -0,0 +1,83 @@
+# Backend/judge/regrade.py
+"""
+Incremental regrade after a part's test cases were edited.
+
+Only stored submissions judged against an older version of the part's test
+data are touched, and of those only the test cases that were added or
+changed are run: results for unchanged cases are carried over by case hash.
+Compiled languages rebuild through the compile cache, so unchanged sources
+don't hit the compiler again.
+"""
+from typing import Any, Dict, List, Optional
+
+from judge.admission import get_admission
+from judge.batch import RowCallback, get_batch_executor, verdict_row
+from judge.drivers import get_driver
+from judge.engine import _part_summary, judge_code
+from judge.parts import get_part, invalidate_part, part_cases
+from judge.submissions import is_source_verdict, part_submissions, record_submission
+
+
+def _regrade_one(part: Dict[str, Any], sub: Dict[str, Any]) -> Dict[str, Any]:
+    prepared = part_cases(part)
+    previous = sub.get("tests") or {}
+    driver = get_driver(sub.get("language", ""))
+
+    if driver is None or is_source_verdict(sub.get("status", "")):
+        # Nothing to rerun: the verdict doesn't depend on the test data
+        result: Dict[str, Any] = {"status": sub.get("status", ""), "tests": []}
+        rerun = 0
+    else:
+        with get_admission().admit(background=True):
+            result = judge_code(driver, part, sub.get("code", ""), stdin_args=sub.get("stdin_args", ""), reuse=previous)
+        rerun = sum(1 for h in prepared["hashes"] if h not in previous) if result.get("tests") else 0
+
+    if driver is not None:
+        record_submission(
+            sub["user_id"], part["id"], driver.name, sub.get("code", ""), sub.get("stdin_args", ""), result, part=part
+        )
+
+    row = verdict_row(sub.get("user_id", ""), sub.get("language", ""), sub.get("source_hash", ""), result)
+    row["previous_status"] = sub.get("status", "")
+    row["tests_rerun"] = rerun
+    row["tests_reused"] = len(result.get("tests", []) or []) - rerun
+    return row
+
+
+def regrade_part(part_id: str, on_row: Optional[RowCallback] = None) -> Dict[str, Any]:
+    """
+    Re-judge the stale submissions for a part against its current test data.
+
+    Returns {"status": "done", "part", "part_version", "submissions", "stale",
+    "tests_rerun", "tests_reused", "rows"} with one verdict_row (plus
+    previous_status / tests_rerun / tests_reused) per stale submission.
+    """
+    emit_row = on_row or (lambda row: None)
+
+    # The edit is the reason we're here: don't judge against a cached copy
+    invalidate_part(part_id)
+    part = get_part(part_id)
+    if part is None:
+        return {"status": "unknown_project"}
+    version = part_cases(part)["version"]
+
+    subs = part_submissions(part_id)
+    stale = [s for s in subs if s.get("part_version") != version]
+
+    rows: List[Dict[str, Any]] = []
+    executor = get_batch_executor()
+    for fut in [executor.submit(_regrade_one, part, sub) for sub in stale]:
+        row = fut.result()
+        rows.append(row)
+        emit_row(row)
+
+    return {
+        "status": "done",
+        "part": _part_summary(part),
+        "part_version": version,
+        "submissions": len(subs),
+        "stale": len(stale),
+        "tests_rerun": sum(r["tests_rerun"] for r in rows),
+        "tests_reused": sum(r["tests_reused"] for r in rows),
+        "rows": rows,
+    }
@@ -0,0 +1,375 @@
+# Backend/judge/sandbox.py
+"""
+Run one untrusted program under resource limits and report its usage.
+
+Limits, set by the child on itself right before it execs the program
+(see limited_argv):
+  RLIMIT_AS     memory_limit_mb (address space)
+  RLIMIT_CPU    time limit rounded up, + 1s grace (the wall clock still decides)
+  RLIMIT_FSIZE  JUDGE_OUTPUT_LIMIT_MB for files the program writes
+Pipe output is capped by the reader at the same size, and only a bounded
+prefix of it is ever held in memory.
+
+peak_rss_kb is the child's ru_maxrss. Linux carries the RSS the process had
+right after fork (i.e. the forking parent's) across exec, so the value is
+never below that floor; the memory verdict only trusts it above the floor.
+"""
+import errno
+import math
+import os
+import resource
+import select
+import selectors
+import shutil
+import signal
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+JUDGE_DEFAULT_MEMORY_MB = int(os.getenv("JUDGE_DEFAULT_MEMORY_MB", "256"))
+JUDGE_OUTPUT_LIMIT_BYTES = int(os.getenv("JUDGE_OUTPUT_LIMIT_MB", "16")) * 1024 * 1024
+JUDGE_CAPTURE_PREFIX_BYTES = int(os.getenv("JUDGE_CAPTURE_PREFIX_KB", "64")) * 1024
+JUDGE_STOP_ON_MISMATCH = os.getenv("JUDGE_STOP_ON_MISMATCH", "1") == "1"
+
+_PIPE_CHUNK = 64 * 1024
+_MEMORY_ERROR_MARKERS = ("std::bad_alloc", "MemoryError", "Cannot allocate memory")
+
+
+def rlimits(timeout_s: float, memory_limit_mb: Optional[int], limit_address_space: bool = True) -> Dict[int, int]:
+    limits = {
+        resource.RLIMIT_CPU: int(math.ceil(timeout_s)) + 1,
+        resource.RLIMIT_FSIZE: JUDGE_OUTPUT_LIMIT_BYTES,
+        resource.RLIMIT_CORE: 0,
+    }
+    if memory_limit_mb and limit_address_space:
+        limits[resource.RLIMIT_AS] = int(memory_limit_mb) * 1024 * 1024
+    return limits
+
+
+def _soft_hard(which: int, value: int) -> Tuple[int, int]:
+    # CPU: soft limit sends SIGXCPU, hard limit one second later SIGKILL
+    return value, value + 1 if which == resource.RLIMIT_CPU else value
+
+
+_PRLIMIT = shutil.which("prlimit")
+_PRLIMIT_OPTIONS = {
+    resource.RLIMIT_AS: "--as",
+    resource.RLIMIT_CPU: "--cpu",
+    resource.RLIMIT_FSIZE: "--fsize",
+    resource.RLIMIT_CORE: "--core",
+}
+# Fallback without util-linux: setrlimit, then exec the program
+_SHIM = (
+    "import os, resource, sys\n"
+    "i = sys.argv.index('--')\n"
+    "for spec in sys.argv[1:i]:\n"
+    "    which, soft, hard = map(int, spec.split(':'))\n"
+    "    resource.setrlimit(which, (soft, hard))\n"
+    "os.execv(sys.argv[i + 1], sys.argv[i + 1:])\n"
+)
+
+
+def limited_argv(argv: List[str], limits: Dict[int, int]) -> List[str]:
+    """
+    argv wrapped in a command that sets the limits on itself and then execs
+    the program (prlimit, or a small Python shim without it). The limits
+    are applied after exec, so the server never runs Python code between
+    fork and exec (preexec_fn isn't safe with threads).
+    Raises FileNotFoundError if argv[0] does not exist.
+    """
+    exe = argv[0] if os.sep in argv[0] else shutil.which(argv[0])
+    if exe is None or not os.path.exists(exe):
+        raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), argv[0])
+    if _PRLIMIT is not None:
+        options = [
+            "{}={}:{}".format(_PRLIMIT_OPTIONS[which], *_soft_hard(which, value)) for which, value in limits.items()
+        ]
+        return [_PRLIMIT, *options, "--", exe, *argv[1:]]
+    specs = ["{}:{}:{}".format(which, *_soft_hard(which, value)) for which, value in limits.items()]
+    return [sys.executable, "-S", "-c", _SHIM, *specs, "--", exe, *argv[1:]]
+
+
+def current_rss_kb() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize() // 1024
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def classify(
+    exit_code: int,
+    stderr: str,
+    timed_out: bool,
+    peak_rss_kb: int,
+    memory_limit_mb: Optional[int],
+    rss_floor_kb: int = 0,
+) -> Dict[str, bool]:
+    """
+    Derive limit verdict flags from how the process ended.
+    """
+    timed_out = timed_out or exit_code == -signal.SIGXCPU
+    output_exceeded = exit_code == -signal.SIGXFSZ
+    memory_exceeded = False
+    if memory_limit_mb and not timed_out and exit_code != 0:
+        near_limit = peak_rss_kb > rss_floor_kb and peak_rss_kb >= 0.95 * memory_limit_mb * 1024
+        memory_exceeded = near_limit or any(m in stderr for m in _MEMORY_ERROR_MARKERS)
+    return {
+        "timed_out": timed_out,
+        "memory_limit_exceeded": memory_exceeded,
+        "output_limit_exceeded": output_exceeded,
+    }
+
+
+class OutputCapture:
+    """
+    Bounded capture of one output stream: keeps only a prefix for the
+    response, counts the total, and streams stdout into an optional matcher.
+    """
+
+    def __init__(self, matcher: Optional[Any] = None):
+        self.prefix = bytearray()
+        self.total = 0
+        self.matcher = matcher
+
+    def feed(self, chunk: bytes) -> bool:
+        """
+        Returns False once the matcher knows the output is wrong.
+        """
+        room = JUDGE_CAPTURE_PREFIX_BYTES - len(self.prefix)
+        if room > 0:
+            self.prefix += chunk[:room]
+        self.total += len(chunk)
+        if self.matcher is not None:
+            return self.matcher.feed(chunk)
+        return True
+
+    def feed_file(self, path: str) -> None:
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(_PIPE_CHUNK)
+                if not chunk or not self.feed(chunk):
+                    return
+
+    @property
+    def truncated(self) -> bool:
+        return self.total > len(self.prefix)
+
+    def text(self) -> str:
+        return self.prefix.decode("utf-8", errors="replace")
+
+    def matched(self) -> Optional[bool]:
+        if self.matcher is None:
+            return None
+        return self.matcher.finish()
+
+
+def _kill(pid: int) -> None:
+    # Not Popen.kill(): it polls first and could reap the child before our wait4.
+    # The pid can't be reused until we reap it, so signalling it is safe.
+    try:
+        os.kill(pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def run_limited(
+    argv: List[str],
+    stdin_data: str,
+    timeout_s: float,
+    memory_limit_mb: Optional[int] = None,
+    matcher: Optional[Any] = None,
+    limit_address_space: bool = True,
+    stdin_file: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Run argv with stdin_data under rlimits and a wall-clock timeout.
+
+    With stdin_file, stdin is stdin_data followed by that file's contents.
+    When stdin_data is empty the file itself becomes the child's stdin, so
+    large inputs never pass through this process.
+
+    Output is read incrementally: only the first JUDGE_CAPTURE_PREFIX_KB of
+    stdout/stderr is kept, the program is killed once the combined output
+    passes JUDGE_OUTPUT_LIMIT_MB, and if a matcher (see judge.compare) is
+    given stdout is compared as it arrives and the program is stopped at the
+    first mismatch when JUDGE_STOP_ON_MISMATCH=1.
+
+    Returns a dict with exit_code, stdout, stderr, stdout_truncated,
+    stderr_truncated, output_matched (None without a matcher), stopped_early,
+    timed_out, memory_limit_exceeded, output_limit_exceeded, cpu_ms, wall_ms,
+    peak_rss_kb.
+    Raises FileNotFoundError if argv[0] does not exist.
+    """
+    command = limited_argv(argv, rlimits(timeout_s, memory_limit_mb, limit_address_space))
+    rss_floor_kb = current_rss_kb()
+    data = stdin_data.encode("utf-8")
+    # Input still to be piped in after `data`: the rest of stdin_file
+    feed = open(stdin_file, "rb") if stdin_file else None
+    direct = feed is not None and not data
+    t0 = time.monotonic()
+    try:
+        p = subprocess.Popen(
+            command,
+            stdin=feed if direct else subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+    except BaseException:
+        if feed is not None:
+            feed.close()
+        raise
+    if direct:
+        feed.close()
+        feed = None
+
+    offset = 0
+    out, err = OutputCapture(matcher), OutputCapture()
+    captures = {p.stdout.fileno(): out, p.stderr.fileno(): err}
+    timed_out = False
+    output_exceeded = False
+    stopped_early = False
+    deadline = t0 + timeout_s
+
+    sel = selectors.DefaultSelector()
+    if data or feed is not None:
+        sel.register(p.stdin, selectors.EVENT_WRITE)
+    elif p.stdin is not None:
+        p.stdin.close()
+    sel.register(p.stdout, selectors.EVENT_READ)
+    sel.register(p.stderr, selectors.EVENT_READ)
+
+    try:
+        while sel.get_map() and not (output_exceeded or stopped_early):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                timed_out = True
+                break
+            for key, _ in sel.select(remaining):
+                if key.fileobj is p.stdin:
+                    if offset >= len(data) and feed is not None:
+                        data, offset = feed.read(_PIPE_CHUNK), 0
+                        if not data:
+                            feed.close()
+                            feed = None
+                    try:
+                        offset += os.write(key.fd, data[offset:offset + select.PIPE_BUF])
+                    except BrokenPipeError:
+                        offset = len(data)
+                        if feed is not None:
+                            feed.close()
+                            feed = None
+                    if offset >= len(data) and feed is None:
+                        sel.unregister(p.stdin)
+                        p.stdin.close()
+                    continue
+                chunk = os.read(key.fd, _PIPE_CHUNK)
+                if not chunk:
+                    sel.unregister(key.fileobj)
+                    continue
+                still_matching = captures[key.fd].feed(chunk)
+                if out.total + err.total > JUDGE_OUTPUT_LIMIT_BYTES:
+                    output_exceeded = True
+                    break
+                if not still_matching and JUDGE_STOP_ON_MISMATCH:
+                    stopped_early = True
+                    break
+    finally:
+        sel.close()
+        if timed_out or output_exceeded or stopped_early:
+            _kill(p.pid)
+        for f in (p.stdin, p.stdout, p.stderr, feed):
+            if f is not None:
+                f.close()
+
+    # Reap with wait4 ourselves (instead of Popen.wait) to get the rusage.
+    # The pipes may hit EOF before the process exits (it closed them), so
+    # keep enforcing the deadline while waiting.
+    while True:
+        pid, status, usage = os.wait4(p.pid, os.WNOHANG)
+        if pid:
+            break
+        if time.monotonic() >= deadline:
+            timed_out = True
+            _kill(p.pid)
+            _, status, usage = os.wait4(p.pid, 0)
+            break
+        time.sleep(0.001)
+    p.returncode = os.waitstatus_to_exitcode(status)
+    wall_ms = (time.monotonic() - t0) * 1000
+
+    result = usage_result(
+        p.returncode, out, err, timed_out, usage, wall_ms, memory_limit_mb, output_exceeded, rss_floor_kb
+    )
+    result["stopped_early"] = stopped_early
+    return result
+
+
+def failed_run(stderr: str) -> Dict[str, Any]:
+    """
+    run_limited-shaped result for a program that could not be started.
+    """
+    return {
+        "exit_code": -1,
+        "stdout": "",
+        "stderr": stderr,
+        "stdout_truncated": False,
+        "stderr_truncated": False,
+        "output_matched": False,
+        "stopped_early": False,
+        "timed_out": False,
+        "memory_limit_exceeded": False,
+        "output_limit_exceeded": False,
+        "cpu_ms": 0.0,
+        "wall_ms": 0.0,
+        "peak_rss_kb": 0,
+    }
+
+
+def legacy_tuple(run: Dict[str, Any]) -> Tuple[int, str, str, bool]:
+    """
+    (return_code, stdout, stderr, timed_out) as the pre-sandbox run helpers
+    returned it: -1 and "TIMEOUT" on stderr (if empty) for a timeout.
+    """
+    if run["timed_out"]:
+        return -1, run["stdout"], run["stderr"] or "TIMEOUT", True
+    return run["exit_code"], run["stdout"], run["stderr"], False
+
+
+def usage_result(
+    exit_code: int,
+    out: OutputCapture,
+    err: OutputCapture,
+    timed_out: bool,
+    usage: Any,
+    wall_ms: float,
+    memory_limit_mb: Optional[int],
+    output_exceeded: bool = False,
+    rss_floor_kb: int = 0,
+) -> Dict[str, Any]:
+    """
+    Build the run_limited result from an exit status, the output captures and
+    a struct_rusage (or an equivalent dict with ru_utime/ru_stime/ru_maxrss).
+    """
+    stderr = err.text()
+    get = usage.get if isinstance(usage, dict) else (lambda k: getattr(usage, k))
+    peak_rss_kb = int(get("ru_maxrss"))  # kilobytes on Linux
+    flags = classify(exit_code, stderr, timed_out, peak_rss_kb, memory_limit_mb, rss_floor_kb)
+    flags["output_limit_exceeded"] = flags["output_limit_exceeded"] or output_exceeded
+    if flags["timed_out"]:
+        exit_code = -1
+        stderr = stderr or "TIMEOUT"
+    return {
+        "exit_code": exit_code,
+        "stdout": out.text(),
+        "stderr": stderr,
+        "stdout_truncated": out.truncated,
+        "stderr_truncated": err.truncated,
+        "output_matched": out.matched(),
+        "stopped_early": False,
+        **flags,
+        "cpu_ms": round((get("ru_utime") + get("ru_stime")) * 1000, 1),
+        "wall_ms": round(wall_ms, 1),
+        "peak_rss_kb": peak_rss_kb,
+    }
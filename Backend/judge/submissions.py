@@ -0,0 +1,93 @@
+# Backend/judge/submissions.py
+"""
+Stored submissions, the input to incremental regrades (judge.regrade).
+
+Firestore collection 'submissions', one doc per user and part
+(doc id "<user_id>_<part_id>", like 'contributions'):
+  user_id, part_id, language, code, stdin_args
+  source_hash:  sha256 of code
+  part_version: judge.parts version of the test data it was judged against
+  status, passed, total
+  tests:        {case_hash: per-test result without stdout/stderr}
+  judged_at:    ISO timestamp
+"""
+import hashlib
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from judge.drivers import get_driver
+from judge.parts import get_part, part_cases
+from users.repo import get_db
+
+SUBMISSIONS_COLLECTION = "submissions"
+
+# Verdicts that don't depend on the test data, so a regrade can't change them
+_SOURCE_VERDICTS = {"compile_error", "syntax_error"}
+
+
+def source_hash(code: str) -> str:
+    return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+
+def submission_doc_id(user_id: str, part_id: str) -> str:
+    return f"{user_id}_{part_id}"
+
+
+def _stored_tests(part: Dict[str, Any], result: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    # Keyed by case hash so a regrade can tell which results still apply.
+    # Output is dropped: only the verdict fields are needed, and docs stay small.
+    tests = result.get("tests", []) or []
+    hashes = part_cases(part)["hashes"]
+    if len(tests) != len(hashes):
+        return {}
+    return {
+        h: {k: v for k, v in t.items() if k not in ("stdout", "stderr")}
+        for h, t in zip(hashes, tests)
+        if not t.get("skipped")
+    }
+
+
+def record_submission(
+    user_id: str,
+    part_id: str,
+    language: str,
+    code: str,
+    stdin_args: str,
+    result: Dict[str, Any],
+    part: Optional[Dict[str, Any]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Store (or replace) the user's latest submission for the part.
+    Results that never reached the judge (unknown language or part) aren't stored.
+    """
+    driver = get_driver(language)
+    part = part if part is not None else get_part(part_id)
+    if not user_id or driver is None or part is None:
+        return None
+
+    tests = result.get("tests", []) or []
+    doc = {
+        "user_id": user_id,
+        "part_id": str(part_id),
+        "language": driver.name,
+        "code": code,
+        "stdin_args": stdin_args or "",
+        "source_hash": source_hash(code),
+        "part_version": result.get("part_version") or part_cases(part)["version"],
+        "status": result.get("status", ""),
+        "passed": sum(1 for t in tests if t.get("passed")),
+        "total": len(tests),
+        "tests": _stored_tests(part, result),
+        "judged_at": datetime.now(timezone.utc).isoformat(),
+    }
+    get_db().collection(SUBMISSIONS_COLLECTION).document(submission_doc_id(user_id, part_id)).set(doc)
+    return doc
+
+
+def part_submissions(part_id: str) -> List[Dict[str, Any]]:
+    snaps = get_db().collection(SUBMISSIONS_COLLECTION).where("part_id", "==", str(part_id)).stream()
+    return [s.to_dict() for s in snaps]
+
+
+def is_source_verdict(status: str) -> bool:
+    return status in _SOURCE_VERDICTS
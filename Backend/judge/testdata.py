@@ -0,0 +1,208 @@
+# Backend/judge/testdata.py
+"""
+Content-addressed, file-backed test data.
+
+Large test cases don't fit in a Firestore document, so parts can point at
+files instead of inlining strings:
+
+    "testcases": [{"id": "tc1", "input": "sha256:<hex>", "output": "sha256:<hex>"}, ...]
+
+Blobs live under JUDGE_TESTDATA_DIR as <root>/<hex[:2]>/<hex> and are
+immutable: the same bytes always have the same reference. The judge hands
+input files to the child's stdin directly and compares output against a
+memory map of the expected file (judge.compare.expected_file_lines), so
+neither is ever loaded into a Python string.
+
+The local project manifest (projects.json) names its test files relative
+to the manifest; manifest_part() imports them into the store.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional
+
+JUDGE_TESTDATA_DIR = os.getenv(
+    "JUDGE_TESTDATA_DIR", os.path.join(tempfile.gettempdir(), "judge_testdata")
+)
+JUDGE_PROJECTS_MANIFEST = os.getenv(
+    "JUDGE_PROJECTS_MANIFEST", str(Path(__file__).resolve().parent.parent / "projects.json")
+)
+
+# Largest single test file accepted over POST /judge/testdata
+JUDGE_TESTDATA_MAX_BYTES = int(float(os.getenv("JUDGE_TESTDATA_MAX_MB", "256")) * 1024 * 1024)
+# Cap on the whole store on disk
+JUDGE_TESTDATA_TOTAL_BYTES = int(float(os.getenv("JUDGE_TESTDATA_TOTAL_MB", "8192")) * 1024 * 1024)
+
+REF_PREFIX = "sha256:"
+_CHUNK = 1024 * 1024
+
+
+class TestFile(NamedTuple):
+    digest: str
+    path: str
+    size: int
+
+    @property
+    def ref(self) -> str:
+        return REF_PREFIX + self.digest
+
+
+def is_ref(value: Any) -> bool:
+    return isinstance(value, str) and value.startswith(REF_PREFIX)
+
+
+class StoreFull(Exception):
+    """
+    Storing the blob would take the store past its total size cap.
+    """
+
+
+class BlobWriter:
+    """
+    Stream bytes into the store: write() chunks, then commit() for the reference.
+    """
+
+    def __init__(self, store: "TestDataStore"):
+        self._store = store
+        self._hash = hashlib.sha256()
+        fd, self._tmp = tempfile.mkstemp(prefix=".tmp_", dir=store.root)
+        self._f = os.fdopen(fd, "wb")
+        self.size = 0
+
+    def write(self, chunk: bytes) -> None:
+        self._hash.update(chunk)
+        self._f.write(chunk)
+        self.size += len(chunk)
+
+    def commit(self) -> str:
+        self._f.close()
+        digest = self._hash.hexdigest()
+        dest = self._store.path(digest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        with self._store._lock:
+            if dest.exists():
+                os.unlink(self._tmp)
+            elif self._store.total_bytes + self.size > self._store.max_total_bytes:
+                os.unlink(self._tmp)
+                raise StoreFull("test data store is full")
+            else:
+                os.chmod(self._tmp, 0o444)
+                os.replace(self._tmp, dest)
+                self._store.total_bytes += self.size
+        return REF_PREFIX + digest
+
+    def abort(self) -> None:
+        self._f.close()
+        try:
+            os.unlink(self._tmp)
+        except FileNotFoundError:
+            pass
+
+
+class TestDataStore:
+    """
+    Blobs under root, at most max_total_bytes of them in all: writers raise
+    StoreFull past that.
+    """
+
+    def __init__(self, root: str, max_total_bytes: int = JUDGE_TESTDATA_TOTAL_BYTES):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_total_bytes = max_total_bytes
+        self._lock = threading.Lock()
+        self.total_bytes = sum(
+            p.stat().st_size for p in self.root.glob("??/*") if not p.name.startswith(".tmp_")
+        )
+
+    def path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def open_writer(self) -> BlobWriter:
+        return BlobWriter(self)
+
+    def put_bytes(self, data: bytes) -> str:
+        w = self.open_writer()
+        w.write(data)
+        return w.commit()
+
+    def put_file(self, path: str) -> str:
+        w = self.open_writer()
+        try:
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(_CHUNK), b""):
+                    w.write(chunk)
+        except BaseException:
+            w.abort()
+            raise
+        return w.commit()
+
+    def resolve(self, ref: str) -> TestFile:
+        """
+        TestFile for a "sha256:<hex>" reference.
+        Raises ValueError for anything else and FileNotFoundError if the blob is missing.
+        """
+        if not is_ref(ref):
+            raise ValueError(f"not a test data reference: {ref!r}")
+        digest = ref[len(REF_PREFIX):]
+        if len(digest) != 64 or any(c not in "0123456789abcdef" for c in digest):
+            raise ValueError(f"malformed test data reference: {ref!r}")
+        p = self.path(digest)
+        try:
+            return TestFile(digest, str(p), p.stat().st_size)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"test data {ref} is not in the store") from None
+
+
+_store: Optional[TestDataStore] = None
+_store_lock = threading.Lock()
+
+
+def get_testdata_store() -> TestDataStore:
+    global _store
+    if _store is not None:
+        return _store
+    with _store_lock:
+        if _store is None:
+            _store = TestDataStore(JUDGE_TESTDATA_DIR)
+    return _store
+
+
+# ----------------------------
+# Local project manifest
+# ----------------------------
+
+def load_manifest() -> Dict[str, Any]:
+    try:
+        with open(JUDGE_PROJECTS_MANIFEST, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"projects": {}}
+
+
+def manifest_part(part_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Part document for a project in the local manifest, with its test files
+    imported into the store. Files that don't exist keep their plain name,
+    which build_cases reports as a bad test case.
+    """
+    project = load_manifest().get("projects", {}).get(str(part_id))
+    if project is None:
+        return None
+
+    base = Path(JUDGE_PROJECTS_MANIFEST).resolve().parent
+    store = get_testdata_store()
+
+    def ref(name: str) -> str:
+        p = base / name
+        return store.put_file(str(p)) if p.is_file() else name
+
+    part = {k: v for k, v in project.items() if k != "testcases"}
+    part["id"] = str(part_id)
+    part["testcases"] = [
+        {"id": tc.get("id", ""), "input": ref(tc["input"]), "output": ref(tc["output"])}
+        for tc in project.get("testcases", [])
+    ]
+    return part
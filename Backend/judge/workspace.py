@@ -0,0 +1,187 @@
+# Backend/judge/workspace.py
+"""
+Pooled judge workspaces on a RAM-backed directory.
+
+Every submission needs a scratch directory for its source, executable and
+(for the Python zygotes) per-test I/O files. Instead of creating and
+deleting a TemporaryDirectory on disk each time, workspaces are created
+once under JUDGE_WORKSPACE_ROOT (tmpfs, /dev/shm when available), checked
+out, wiped on return and reused.
+
+RAM use is capped at JUDGE_WORKSPACE_MAX_MB: each checkout reserves the
+typical workspace size seen so far, and when the reservations would go
+over the cap the submission gets an ordinary on-disk temporary directory
+instead, so the cap never makes a submission wait or fail.
+"""
+import atexit
+import contextlib
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from judge.pool import JUDGE_WORKERS
+
+_SHM = "/dev/shm"
+
+JUDGE_WORKSPACE_ROOT = os.getenv(
+    "JUDGE_WORKSPACE_ROOT",
+    os.path.join(_SHM if os.path.isdir(_SHM) else tempfile.gettempdir(), f"judge_ws_{os.getpid()}"),
+)
+# Idle workspaces kept around for reuse (0 disables pooling)
+JUDGE_WORKSPACE_POOL = int(os.getenv("JUDGE_WORKSPACE_POOL", str(max(4, 2 * JUDGE_WORKERS))))
+JUDGE_WORKSPACE_MAX_BYTES = int(float(os.getenv("JUDGE_WORKSPACE_MAX_MB", "512")) * 1024 * 1024)
+
+# Reservation for a checkout before any workspace has been measured
+_INITIAL_ESTIMATE = 8 * 1024 * 1024
+
+
+def _tree_bytes(path: str) -> int:
+    total = 0
+    for dirpath, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(dirpath, name)).st_size
+            except FileNotFoundError:
+                pass
+    return total
+
+
+def _wipe(path: str) -> None:
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path, ignore_errors=True)
+            else:
+                try:
+                    os.unlink(entry.path)
+                except FileNotFoundError:
+                    pass
+
+
+def _can_exec_in(root: str) -> bool:
+    # tmpfs mounts are often noexec, which would break every compiled language
+    probe = os.path.join(root, ".exec_probe")
+    try:
+        with open(probe, "w") as f:
+            f.write("#!/bin/sh\nexit 0\n")
+        os.chmod(probe, 0o700)
+        return subprocess.run([probe], timeout=5).returncode == 0
+    except (OSError, subprocess.SubprocessError):
+        return False
+    finally:
+        try:
+            os.unlink(probe)
+        except FileNotFoundError:
+            pass
+
+
+class WorkspacePool:
+    def __init__(self, root: str, size: int, max_bytes: int):
+        self.root = root
+        self.size = size
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._idle: List[str] = []
+        self._created = 0
+        self._reserved = 0
+        self._estimate = _INITIAL_ESTIMATE
+        self.pooled_checkouts = 0
+        self.fallback_checkouts = 0
+        self.enabled = size > 0 and self._init_root()
+
+    def _init_root(self) -> bool:
+        try:
+            os.makedirs(self.root, exist_ok=True)
+        except OSError:
+            return False
+        return _can_exec_in(self.root)
+
+    def _take(self) -> Tuple[Optional[str], int]:
+        """
+        (workspace path, bytes reserved for it), or (None, 0) if over the cap.
+        """
+        with self._lock:
+            reserve = self._estimate
+            if self._reserved + reserve > self.max_bytes:
+                return None, 0
+            self._reserved += reserve
+            self.pooled_checkouts += 1
+            if self._idle:
+                return self._idle.pop(), reserve
+            self._created += 1
+            n = self._created
+        path = os.path.join(self.root, f"ws{n}")
+        try:
+            os.makedirs(path, exist_ok=True)
+        except OSError:
+            with self._lock:
+                self._reserved -= reserve
+                self.pooled_checkouts -= 1
+            return None, 0
+        return path, reserve
+
+    def _give_back(self, path: str, reserved: int) -> None:
+        used = _tree_bytes(path)
+        _wipe(path)
+        with self._lock:
+            self._reserved -= reserved
+            # Moving estimate of a workspace's footprint, biased up so a few
+            # big builds (Rust, stress tests) raise the reservation quickly
+            self._estimate = max(used, int(self._estimate * 0.9 + used * 0.1), 64 * 1024)
+            if len(self._idle) < self.size:
+                self._idle.append(path)
+                return
+        shutil.rmtree(path, ignore_errors=True)
+
+    @contextlib.contextmanager
+    def checkout(self, prefix: str = "judge_") -> Iterator[Path]:
+        """
+        A clean, empty workspace directory for the duration of the block.
+        """
+        path, reserved = self._take() if self.enabled else (None, 0)
+        if path is None:
+            with self._lock:
+                self.fallback_checkouts += 1
+            with tempfile.TemporaryDirectory(prefix=prefix) as td:
+                yield Path(td)
+            return
+
+        try:
+            yield Path(path)
+        finally:
+            self._give_back(path, reserved)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "root": self.root,
+                "idle": len(self._idle),
+                "created": self._created,
+                "reserved_bytes": self._reserved,
+                "estimate_bytes": self._estimate,
+                "max_bytes": self.max_bytes,
+                "pooled_checkouts": self.pooled_checkouts,
+                "fallback_checkouts": self.fallback_checkouts,
+            }
+
+
+_pool: Optional[WorkspacePool] = None
+_pool_lock = threading.Lock()
+
+
+def get_workspace_pool() -> WorkspacePool:
+    global _pool
+    if _pool is not None:
+        return _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkspacePool(JUDGE_WORKSPACE_ROOT, JUDGE_WORKSPACE_POOL, JUDGE_WORKSPACE_MAX_BYTES)
+            if _pool.enabled:
+                # tmpfs is RAM: don't leave this process's workspaces behind
+                atexit.register(shutil.rmtree, _pool.root, True)
+    return _pool
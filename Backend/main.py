@@ -1,6 +1,7 @@
 from fastapi import FastAPI
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from ai_utils import close_http_client
 from auth.router import router as auth_router
 from routers.ai_router import router as ai_router
 from routers.submit import router as submit_router
@@ -20,6 +21,10 @@ app.include_router(ai_router)
 #app.include_router(auth_router)
 app.include_router(submit_router)
 
+@app.on_event("shutdown")
+async def shutdown():
+    await close_http_client()
+
 @app.get("/health")
 def health():
     return {"ok": True}
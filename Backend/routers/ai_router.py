@@ -1,23 +1,94 @@
-from fastapi import APIRouter, HTTPException, Body
-from pydantic import BaseModel
-from typing import Optional
-from ai_utils import call_llm
-
-router = APIRouter(prefix="/ai", tags=["ai"])
-
-class TutorRequest(BaseModel):
-    text_from_user: str
-    code: Optional[str] = None
-    project_description: str
-
-@router.post("/tutor")
-def ask_tutor(body: TutorRequest):
-    try:
-        response = call_llm(
-            text_from_user=body.text_from_user,
-            code=body.code,
-            project_description=body.project_description
-        )
-        return {"response": response}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+import asyncio
+import json
+import httpx
+from fastapi import APIRouter, HTTPException, Body
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from typing import AsyncIterator, Optional
+from ai_utils import call_llm, prescreen_stats, risk_stats, stream_llm
+from tutor_cache import get_tutor_cache
+from tutor_context import get_project_context, invalidate_project_context, project_context_stats
+
+router = APIRouter(prefix="/ai", tags=["ai"])
+
+class TutorRequest(BaseModel):
+    text_from_user: str
+    code: Optional[str] = None
+    # The part the student is working on (preferred: the description is
+    # looked up server-side) and/or the description itself, used when the
+    # part isn't known
+    part_id: Optional[str] = None
+    project_description: Optional[str] = None
+
+async def _project_description(body: TutorRequest) -> str:
+    if body.part_id:
+        context = await get_project_context(body.part_id)
+        if context is not None:
+            return context
+        if body.project_description is None:
+            raise HTTPException(status_code=404, detail=f"Unknown part_id: {body.part_id}")
+    if body.project_description is None:
+        raise HTTPException(status_code=400, detail="part_id or project_description is required")
+    return body.project_description
+
+@router.post("/tutor")
+async def ask_tutor(body: TutorRequest):
+    # Async all the way down: a waiting tutor call holds no worker thread
+    project_description = await _project_description(body)
+    try:
+        response = await call_llm(
+            text_from_user=body.text_from_user,
+            code=body.code,
+            project_description=project_description
+        )
+        return {"response": response}
+    except (asyncio.TimeoutError, httpx.TimeoutException):
+        raise HTTPException(status_code=504, detail="Tutor model timed out")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/tutor/stream")
+async def ask_tutor_stream(body: TutorRequest):
+    """
+    Server-sent events: "token" events with the draft as it is generated,
+    then "final" (watchdog verdict; replace the draft if ok is false) or
+    "blocked" (the local filter cut the draft off; replace it). "error" if
+    the model call fails.
+    """
+    project_description = await _project_description(body)
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            async for event, data in stream_llm(
+                text_from_user=body.text_from_user,
+                code=body.code,
+                project_description=project_description
+            ):
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        except (asyncio.TimeoutError, httpx.TimeoutException):
+            yield f"event: error\ndata: {json.dumps({'detail': 'Tutor model timed out'})}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/stats")
+def tutor_stats():
+    cache = get_tutor_cache()
+    return {
+        "response_cache": cache.stats() if cache is not None else None,
+        "risk": risk_stats(),
+        "prescreen": prescreen_stats(),
+        "project_context": project_context_stats(),
+    }
+
+@router.post("/context/{part_id}/invalidate")
+def invalidate_context(part_id: str):
+    """
+    Drop a part's cached project context after its description was edited.
+    """
+    return {"part_id": part_id, "invalidated": invalidate_project_context(part_id)}
@@ -1,8 +1,24 @@
-import json
+"""
+Local project manifest (projects.json) lookups.
 
-with open("../schemas_files/projects.json") as f:
-    manifest = json.load(f)
+The manifest is read by judge.testdata (JUDGE_PROJECTS_MANIFEST, default
+Backend/projects.json); its projects are judgeable like Firestore parts,
+with their test files served from the test data store.
+"""
+from typing import Any, Dict, Optional
 
-def get_project_tests(project_id: str):
-    return manifest["projects"][project_id]
+from judge.testdata import load_manifest, manifest_part
 
+
+def get_project_tests(project_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Raw manifest entry for a project (name, limits, testcases with file names).
+    """
+    return load_manifest().get("projects", {}).get(str(project_id))
+
+
+def get_project_part(project_id: str) -> Optional[Dict[str, Any]]:
+    """
+    The project as a part document, test files imported into the store.
+    """
+    return manifest_part(project_id)
@@ -1,13 +1,21 @@
-import os
-import subprocess
-import tempfile
-from pathlib import Path
-from typing import Any, Dict, Tuple, List
+"""
+Python judge entry points.
 
-from users.repo import get_db
+The judging itself lives in judge.engine with the Python specifics in
+judge.drivers.PythonDriver; these wrappers keep the original function names
+and signatures working.
+"""
+from typing import Any, Dict, Optional, Tuple
 
-def _db():
-    return get_db()
+from judge.compare import normalize
+from judge.drivers import PythonDriver, get_driver, run_python as _run_python
+from judge.drivers import validate_python_syntax  # noqa: F401 (re-exported)
+from judge.engine import judge_submission, run_test_cases as _engine_run_test_cases
+from judge.jobs import EventCallback
+from judge.parts import decode_escapes_if_needed, get_part
+from judge.sandbox import legacy_tuple
+
+_python = PythonDriver()
 
 
 # ----------------------------
@@ -16,26 +24,10 @@ def _db():
 
 def _get_part(part_id: str) -> Dict[str, Any] | None:
     """
-    Fetch a part/project document from Firestore.
-    Collection: parts
-    Doc ID: part_id
+    Part document (Firestore collection 'parts', doc id part_id) with its
+    decoded test data, served from the judge part cache (see judge.parts).
     """
-    doc = _db().collection("parts").document(str(part_id)).get()
-    if not doc.exists:
-        # Fallback for Demo/Hackathon if using MockDB or ID mismatch
-        # Return a default "Hello World" setup so execution always works
-        return {
-            "id": str(part_id),
-            "name": "Demo Project",
-            "description": "Auto-generated demo project for testing.",
-            "inputs": [""],
-            "outputs": ["Hello World\n"],
-            "time_limit_sec": 1.0,
-            "next": None
-        }
-    data = doc.to_dict() or {}
-    data["id"] = doc.id
-    return data
+    return get_part(part_id)
 
 
 # ----------------------------
@@ -44,180 +36,50 @@ def _get_part(part_id: str) -> Dict[str, Any] | None:
 
 def run_python(py_path: str, stdin_data: str, timeout_s: float) -> Tuple[int, str, str, bool]:
     """
-    Run a Python file with given stdin data and timeout.
+    Run a Python file with given stdin data and timeout, under rlimits (see
+    judge.sandbox). For the full result use judge.drivers.run_python.
     Returns: (return_code, stdout, stderr, timed_out)
     """
-    try:
-        p = subprocess.run(
-            ["python3", py_path],
-            input=stdin_data,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            timeout=timeout_s,
-        )
-        return p.returncode, p.stdout, p.stderr, False
-    except subprocess.TimeoutExpired as e:
-        out = e.stdout or ""
-        err = e.stderr or "TIMEOUT"
-        return -1, out, err, True
-    except FileNotFoundError:
-        # Fallback to 'python' if 'python3' not found
-        try:
-            p = subprocess.run(
-                ["python", py_path],
-                input=stdin_data,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                timeout=timeout_s,
-            )
-            return p.returncode, p.stdout, p.stderr, False
-        except subprocess.TimeoutExpired as e:
-            out = e.stdout or ""
-            err = e.stderr or "TIMEOUT"
-            return -1, out, err, True
-        except Exception as e:
-            return -1, "", f"Python execution error: {str(e)}", False
-
-
-def _decode_escapes_if_needed(s: str) -> str:
-    """
-    If Firestore stored literal backslash-n sequences (\\n), convert to real newlines.
-    We only do a minimal, safe conversion to avoid surprising transformations.
-    """
-    if "\\n" in s and "\n" not in s:
-        s = s.replace("\\n", "\n")
-    if "\\t" in s and "\t" not in s:
-        s = s.replace("\\t", "\t")
-    return s
+    return legacy_tuple(_run_python(py_path, stdin_data, timeout_s))
 
 
-def _normalize(s: str) -> str:
-    """
-    Hackathon-friendly normalization:
-      - normalize newlines
-      - strip trailing whitespace per line
-      - ignore extra trailing newlines
-    """
-    s = s.replace("\r\n", "\n").replace("\r", "\n")
-    s = "\n".join(line.rstrip() for line in s.split("\n"))
-    return s.strip()
+_decode_escapes_if_needed = decode_escapes_if_needed
+_normalize = normalize
 
 
-def validate_python_syntax(code: str) -> Tuple[bool, str]:
+def run_test_cases(
+    py_path: str,
+    part: Dict[str, Any],
+    stdin_args: str,
+    parallel: Optional[bool] = None,
+    on_event: Optional[EventCallback] = None,
+    mode: str = "full",
+) -> Dict[str, Any]:
     """
-    Validate Python syntax without executing the code.
-    Returns: (is_valid, error_message)
+    See judge.engine.run_test_cases.
     """
-    try:
-        compile(code, '<string>', 'exec')
-        return True, ""
-    except SyntaxError as e:
-        return False, f"Syntax Error: {e.msg} at line {e.lineno}"
-    except Exception as e:
-        return False, f"Code validation error: {str(e)}"
-
-
-def run_test_cases(py_path: str, part: Dict[str, Any], stdin_args: str) -> Dict[str, Any]:
-    """
-    part schema (strings-only):
-      inputs:  [<stdin string>, ...]
-      outputs: [<expected stdout string>, ...]
-      time_limit_sec: optional
-    """
-    time_limit = float(part.get("time_limit_sec", 5.0))  # Python typically needs more time than C++
-
-    inputs: List[str] = list(part.get("inputs", []) or [])
-    outputs: List[str] = list(part.get("outputs", []) or [])
-    
-    if not outputs:
-         # Try singular 'output' key if 'outputs' is empty
-         outputs = list(part.get("output", []) or [])
-
-    if len(inputs) != len(outputs):
-        return {
-            "status": "bad_testcase",
-            "detail": f"inputs length ({len(inputs)}) != outputs length ({len(outputs)})",
-        }
-
-    if len(inputs) == 0:
-        return {
-            "status": "bad_testcase",
-            "detail": "No test cases found",
-        }
-
-    results = []
-    all_passed = True
-
-    for i, (tc_in, expected) in enumerate(zip(inputs, outputs), start=1):
-        tc_id = f"tc{i}"
-
-        # Fix common console-copy issues (literal \n)
-        tc_in = _decode_escapes_if_needed(tc_in)
-        expected = _decode_escapes_if_needed(expected)
-
-        # Prepend stdin_args if your Python reads "argv line" from stdin
-        stdin_data = tc_in
-        if stdin_args.strip():
-            stdin_data = stdin_args.strip() + "\n" + tc_in
-
-        rcode, stdout, stderr, timed_out = run_python(py_path, stdin_data, timeout_s=time_limit)
-
-        passed = (not timed_out) and (rcode == 0) and (_normalize(stdout) == _normalize(expected))
-        all_passed = all_passed and passed
-
-        passed = (not timed_out) and (rcode == 0) and (_normalize(stdout) == _normalize(expected))
-        all_passed = all_passed and passed
-
-        results.append({
-            "id": tc_id,
-            "passed": passed,
-            "timed_out": timed_out,
-            "exit_code": rcode,
-            "stdout": stdout,
-            "stderr": stderr,
-            # "expected": expected,  # Optional: keep if frontend needs it for diff
-        })
-
-    return {
-        "status": "accepted" if all_passed else "wrong_answer",
-        "tests": results,
-        "part": {
-            "id": part.get("id", ""),
-            "name": part.get("name", ""),
-            "description": part.get("description", ""),
-            "next": str(part.get("next", "")) if part.get("next") is not None else "",
-        },
-    }
-
-
-def run_python_submission(project_id: str, language: str, code: str, stdin_args: str = "") -> Dict[str, Any]:
+    return _engine_run_test_cases(
+        _python, py_path, part, stdin_args, parallel=parallel, on_event=on_event, mode=mode
+    )
+
+
+def run_python_submission(
+    project_id: str,
+    language: str,
+    code: str,
+    stdin_args: str = "",
+    on_event: Optional[EventCallback] = None,
+    judge_mode: str = "full",
+    force: bool = False,
+) -> Dict[str, Any]:
     """
     project_id == Firestore doc id in collection 'parts'
+    force: bypass the verdict cache
+    See judge.engine.judge_submission.
     """
-    if language.lower() not in {"python", "py", "python3"}:
+    if not isinstance(get_driver(language), PythonDriver):
         return {"status": "unsupported_language"}
 
-    part = _get_part(project_id)
-    if part is None:
-        return {"status": "unknown_project"}
-
-    # Validate Python syntax first
-    is_valid, syntax_error = validate_python_syntax(code)
-    if not is_valid:
-        return {
-            "status": "syntax_error",
-            "compile_stdout": "",
-            "compile_stderr": syntax_error,
-            "tests": [],
-        }
-
-    with tempfile.TemporaryDirectory(prefix="python_judge_") as td:
-        work = Path(td)
-        py_file = work / "main.py"
-
-        # Write the Python code to file
-        py_file.write_text(code, encoding="utf-8")
-
-        return run_test_cases(str(py_file), part, stdin_args=stdin_args)
\ No newline at end of file
+    return judge_submission(
+        project_id, language, code, stdin_args, on_event=on_event, judge_mode=judge_mode, force=force
+    )
@@ -52,46 +52,336 @@
 #         **result,
 #     }
 
-from fastapi import APIRouter, HTTPException
+import json
+import os
+import queue
+import threading
+from typing import Any, List, Optional
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from .cpp_file_compile import run_submission
-from .py_file_processing import run_python_submission
+from core.security import decode_access_token
+from judge.admission import JUDGE_ADMISSION_WAIT_SEC, Overloaded, get_admission
+from judge.batch import judge_batch
+from judge.checkers import checker_stats
+from judge.compile_cache import get_compile_cache
+from judge.drivers import get_driver, supported_languages
+from judge.engine import cached_verdict, judge_submission, run_once, verdict_cache_stats
+from judge.jobs import EventCallback, QueueFull, get_job, queue_depth, submit_job
+from judge.modes import JUDGE_MODES
+from judge.parts import invalidate_part, part_cache_stats
+from judge.regrade import regrade_part
+from judge.submissions import record_submission
+from judge.testdata import JUDGE_TESTDATA_MAX_BYTES, StoreFull, get_testdata_store
+from judge.workspace import get_workspace_pool
 
 router = APIRouter()
 
+# Per-user admission limits for anonymous requests, keyed by client address
+JUDGE_LIMIT_BY_IP = os.getenv("JUDGE_LIMIT_BY_IP", "0") == "1"
+# Behind a reverse proxy: take the client address from X-Forwarded-For
+JUDGE_TRUST_PROXY = os.getenv("JUDGE_TRUST_PROXY", "0") == "1"
+# Who may use the instructor endpoints (batch, regrade, test data upload):
+# comma-separated emails or subjects of signed-in users
+JUDGE_INSTRUCTORS = frozenset(
+    x.strip().lower() for x in os.getenv("JUDGE_INSTRUCTORS", "").split(",") if x.strip()
+)
+
 
 class SubmitRequest(BaseModel):
     project_id: str
     language: str
     code: str
     stdin_args: str = ""
+    judge_mode: str = "full"  # full | fail_fast | sample_first
+    user_id: str = ""  # when set, stored as the user's latest submission (for regrades)
+    force: bool = False  # judge again even if an identical submission has a cached verdict
+
+class RunRequest(BaseModel):
+    language: str
+    code: str
+    stdin: str = ""
+    time_limit_sec: Optional[float] = None  # default: the language's, capped at JUDGE_RUN_MAX_TIME_SEC
+
+class BatchEntry(BaseModel):
+    user_id: str
+    language: str
+    code: str
+
+class BatchSubmitRequest(BaseModel):
+    project_id: str
+    entries: List[BatchEntry]
+    stdin_args: str = ""
+    judge_mode: str = "full"
 
 class CompleteRequest(BaseModel):
     project_id: str
     email: str
 
 
+def _check_request(req: SubmitRequest) -> None:
+    if get_driver(req.language) is None:
+        supported = "|".join(supported_languages())
+        raise HTTPException(status_code=400, detail=f"Unsupported language: {req.language} (language={supported}).")
+    if req.judge_mode not in JUDGE_MODES:
+        raise HTTPException(status_code=400, detail=f"Unknown judge_mode: {req.judge_mode} (full|fail_fast|sample_first).")
+
+
+def _record(req: SubmitRequest, result: dict) -> None:
+    if req.user_id and result.get("status") != "unknown_project":
+        record_submission(req.user_id, req.project_id, req.language, req.code, req.stdin_args or "", result)
+
+
+def _from_cache(req: SubmitRequest) -> Optional[dict]:
+    # An identical resubmission is answered before it takes a judge slot
+    if req.force:
+        return None
+    result = cached_verdict(req.project_id, req.language, req.code, req.stdin_args or "", req.judge_mode)
+    if result is not None:
+        _record(req, result)
+    return result
+
+
+def _judge(req: SubmitRequest, on_event: Optional[EventCallback] = None) -> dict:
+    # Callers have already looked in the verdict cache (_from_cache)
+    result = judge_submission(
+        project_id=req.project_id,
+        language=req.language,
+        code=req.code,
+        stdin_args=req.stdin_args or "",
+        on_event=on_event,
+        judge_mode=req.judge_mode,
+        force=True,
+    )
+    _record(req, result)
+    return result
+
+
+def _bearer_token(request: Optional[Request]) -> str:
+    if request is None:
+        return ""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    return token.strip() if scheme.lower() == "bearer" else ""
+
+
+def _user_key(request: Optional[Request]) -> Optional[str]:
+    # Per-user limits go by the signed-in user. Never by the body's user_id:
+    # any client can put any user_id there. Anonymous requests are only
+    # limited by address when asked to, since a NAT or proxy puts a whole
+    # class behind one address.
+    if request is None:
+        return None
+    token = _bearer_token(request)
+    if token:
+        try:
+            return f"user:{decode_access_token(token)['sub']}"
+        except (HTTPException, KeyError):
+            pass
+    if not JUDGE_LIMIT_BY_IP:
+        return None
+    forwarded = request.headers.get("x-forwarded-for", "") if JUDGE_TRUST_PROXY else ""
+    if forwarded:
+        # The address our own proxy saw: the last hop it appended
+        return f"ip:{forwarded.split(',')[-1].strip()}"
+    if request.client is not None:
+        return f"ip:{request.client.host}"
+    return None
+
+
+def _require_instructor(request: Optional[Request]) -> dict:
+    """
+    Claims of the signed-in instructor; 401 without a valid token,
+    403 if the user isn't listed in JUDGE_INSTRUCTORS.
+    """
+    token = _bearer_token(request)
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    claims = decode_access_token(token)
+    ids = {str(claims.get("sub", "")).lower(), str(claims.get("email", "")).lower()} - {""}
+    if not ids & JUDGE_INSTRUCTORS:
+        raise HTTPException(status_code=403, detail="Instructor access required")
+    return claims
+
+
+def _overloaded(e: Overloaded) -> HTTPException:
+    return HTTPException(status_code=429, detail=e.reason, headers={"Retry-After": str(e.retry_after)})
+
+
+def _enter(request: Optional[Request]):
+    try:
+        return get_admission().enter(_user_key(request))
+    except Overloaded as e:
+        raise _overloaded(e)
+
+
+def _submit_job(*args: Any, **kwargs: Any) -> str:
+    try:
+        return submit_job(*args, **kwargs)
+    except QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+
+
 @router.post("/submit")
-def submit(req: SubmitRequest) -> dict:
-    # For hackathon: support only C++ and Python for now
-    if req.language.lower() not in {"cpp", "c++", "python", "py"}:
-        raise HTTPException(status_code=400, detail="Only C++ and Python are supported right now (language=cpp|python).")
-
-    if req.language.lower() in {"cpp", "c++"}:
-        result = run_submission(
-            project_id=req.project_id,
-            language=req.language,
-            code=req.code,
-            stdin_args=req.stdin_args or "",
+def submit(req: SubmitRequest, request: Request = None) -> dict:
+    """
+    Judge a submission and return the verdict. Responds 429 with Retry-After
+    when the judge is saturated (see judge.admission); a cached verdict is
+    returned without waiting for admission.
+    """
+    _check_request(req)
+
+    result = _from_cache(req)
+    if result is None:
+        try:
+            with get_admission().admit(_user_key(request)):
+                result = _judge(req)
+        except Overloaded as e:
+            raise _overloaded(e)
+
+    if result.get("status") == "unknown_project":
+        raise HTTPException(status_code=404, detail=f"Unknown project_id: {req.project_id}")
+
+    return {"project_id": req.project_id, **result}
+
+
+@router.post("/run")
+def run(req: RunRequest, request: Request = None) -> dict:
+    """
+    Run code once against the caller's own stdin, for iterating before a
+    submit: quick compile profile (-O0, precompiled common headers), no
+    test cases. Shares the judge's admission limits with /submit.
+    """
+    if get_driver(req.language) is None:
+        supported = "|".join(supported_languages())
+        raise HTTPException(status_code=400, detail=f"Unsupported language: {req.language} (language={supported}).")
+    if req.time_limit_sec is not None and not req.time_limit_sec > 0:
+        raise HTTPException(status_code=400, detail="time_limit_sec must be positive.")
+
+    try:
+        with get_admission().admit(_user_key(request)):
+            result = run_once(req.language, req.code, req.stdin or "", req.time_limit_sec)
+    except Overloaded as e:
+        raise _overloaded(e)
+
+    return result
+
+
+@router.post("/submit/async")
+def submit_async(req: SubmitRequest, request: Request = None) -> dict:
+    """
+    Enqueue the submission for the judge workers and return immediately.
+    Poll GET /submit/{submission_id} for status and the final verdict.
+    The submission takes its place in the admission queue now, so it counts
+    against the queue and per-user limits (429 beyond them) while it waits
+    for a worker. A ticket doesn't hold up the line until the worker waits
+    on it right before judging. A cached verdict skips admission.
+    """
+    _check_request(req)
+    meta = {"project_id": req.project_id, "language": req.language.lower()}
+    cached = _from_cache(req)
+    if cached is not None:
+        return {"submission_id": _submit_job(lambda on_event: cached, meta=meta), "status": "queued"}
+
+    ticket = _enter(request)
+
+    def work(on_event: EventCallback) -> dict:
+        try:
+            ticket.wait(JUDGE_ADMISSION_WAIT_SEC)
+            return _judge(req, on_event=on_event)
+        finally:
+            ticket.release()
+
+    try:
+        submission_id = _submit_job(work, meta=meta)
+    except BaseException:
+        ticket.release()
+        raise
+    return {"submission_id": submission_id, "status": "queued"}
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _event_stream(events: "queue.Queue[tuple[str, dict] | None]") -> StreamingResponse:
+    def stream():
+        while True:
+            item = events.get()
+            if item is None:
+                return
+            yield _sse(*item)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    elif req.language.lower() in {"python", "py"}:
-        result = run_python_submission(
-            project_id=req.project_id,
-            language=req.language,
-            code=req.code,
-            stdin_args=req.stdin_args or "",
-        )
+
+
+@router.post("/submit/stream")
+def submit_stream(req: SubmitRequest, request: Request = None) -> StreamingResponse:
+    """
+    Server-sent events for a submission: status ("queued" first while it
+    waits for a judge slot), compile_finished, test_started / test_finished
+    per test case, then a final "result" event carrying the same payload
+    POST /submit returns. A cached verdict goes straight to "result".
+    """
+    _check_request(req)
+    events: "queue.Queue[tuple[str, dict] | None]" = queue.Queue()
+
+    cached = _from_cache(req)
+    if cached is not None:
+        events.put(("result", {"project_id": req.project_id, **cached}))
+        events.put(None)
+        return _event_stream(events)
+
+    ticket = _enter(request)
+
+    def work() -> None:
+        try:
+            events.put(("status", {"status": "queued"}))
+            with ticket:
+                result = _judge(req, on_event=lambda event, data: events.put((event, data)))
+            events.put(("result", {"project_id": req.project_id, **result}))
+        except Exception as e:
+            events.put(("error", {"detail": str(e)}))
+        finally:
+            events.put(None)
+
+    threading.Thread(target=work, name="judge-stream", daemon=True).start()
+    return _event_stream(events)
+
+
+def _check_batch(req: BatchSubmitRequest) -> None:
+    if req.judge_mode not in JUDGE_MODES:
+        raise HTTPException(status_code=400, detail=f"Unknown judge_mode: {req.judge_mode} (full|fail_fast|sample_first).")
+    if not req.entries:
+        raise HTTPException(status_code=400, detail="No entries to judge.")
+
+
+def _judge_batch(req: BatchSubmitRequest, on_row=None) -> dict:
+    # Unsupported languages don't fail the batch: they get an "unsupported_language" row
+    return judge_batch(
+        project_id=req.project_id,
+        entries=[e.dict() for e in req.entries],
+        stdin_args=req.stdin_args or "",
+        judge_mode=req.judge_mode,
+        on_row=on_row,
+    )
+
+
+@router.post("/submit/batch")
+def submit_batch(req: BatchSubmitRequest, request: Request = None) -> dict:
+    """
+    Judge a whole section's code against one part and return a per-user verdict table.
+    Identical sources are judged once. Instructors only.
+    """
+    _require_instructor(request)
+    _check_batch(req)
+
+    result = _judge_batch(req)
 
     if result.get("status") == "unknown_project":
         raise HTTPException(status_code=404, detail=f"Unknown project_id: {req.project_id}")
@@ -99,6 +389,150 @@ def submit(req: SubmitRequest) -> dict:
     return {"project_id": req.project_id, **result}
 
 
+@router.post("/submit/batch/async")
+def submit_batch_async(req: BatchSubmitRequest, request: Request = None) -> dict:
+    """
+    Enqueue a batch; poll GET /submit/{submission_id} for the verdict table.
+    Instructors only.
+    """
+    _require_instructor(request)
+    _check_batch(req)
+
+    submission_id = _submit_job(
+        lambda on_event: {"project_id": req.project_id, **_judge_batch(req)},
+        meta={"project_id": req.project_id, "language": "batch"},
+        background=True,
+    )
+    return {"submission_id": submission_id, "status": "queued"}
+
+
+@router.post("/submit/batch/stream")
+def submit_batch_stream(req: BatchSubmitRequest, request: Request = None) -> StreamingResponse:
+    """
+    Server-sent events for a batch: a "row" event per user as verdicts come
+    in, then a final "result" event with the full table in input order.
+    Instructors only.
+    """
+    _require_instructor(request)
+    _check_batch(req)
+
+    events: "queue.Queue[tuple[str, dict] | None]" = queue.Queue()
+
+    def work() -> None:
+        try:
+            result = _judge_batch(req, on_row=lambda row: events.put(("row", row)))
+            events.put(("result", {"project_id": req.project_id, **result}))
+        except Exception as e:
+            events.put(("error", {"detail": str(e)}))
+        finally:
+            events.put(None)
+
+    threading.Thread(target=work, name="judge-batch-stream", daemon=True).start()
+    return _event_stream(events)
+
+
+@router.get("/submit/{submission_id}")
+def submission_status(submission_id: str) -> dict:
+    job = get_job(submission_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown submission_id: {submission_id}")
+
+    response = {
+        "submission_id": job["id"],
+        "project_id": job.get("project_id", ""),
+        "status": job["status"],
+        "queued_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+    }
+    if job["status"] == "done":
+        response["result"] = job["result"]
+    elif job["status"] == "error":
+        response["detail"] = job.get("error", "")
+    return response
+
+
+@router.get("/judge/stats")
+def judge_stats() -> dict:
+    return {
+        "part_cache": part_cache_stats(),
+        "compile_cache": get_compile_cache().stats(),
+        "verdict_cache": verdict_cache_stats(),
+        "workspaces": get_workspace_pool().stats(),
+        "checkers": checker_stats(),
+    }
+
+
+@router.get("/judge/metrics")
+def judge_metrics() -> dict:
+    """
+    Load metrics: admission (running / queued / wait times / rejections)
+    and the async job queue depth.
+    """
+    return {
+        "admission": get_admission().stats(),
+        "job_queue_depth": queue_depth(),
+    }
+
+
+@router.post("/judge/parts/{part_id}/invalidate")
+def judge_invalidate_part(part_id: str) -> dict:
+    """
+    Drop a part from the judge cache after its test cases were edited.
+    """
+    return {"part_id": part_id, "invalidated": invalidate_part(part_id)}
+
+
+@router.post("/judge/testdata")
+async def upload_testdata(request: Request) -> dict:
+    """
+    Store a test input or expected output (raw request body) and return its
+    reference, for use in a part's "testcases" entries. The body is streamed
+    to disk, so multi-megabyte files are fine, up to JUDGE_TESTDATA_MAX_MB (413 beyond);
+    507 once the store holds JUDGE_TESTDATA_TOTAL_MB. Instructors only.
+    """
+    _require_instructor(request)
+    too_large = HTTPException(
+        status_code=413, detail=f"Test data is larger than {JUDGE_TESTDATA_MAX_BYTES // (1024 * 1024)} MB."
+    )
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > JUDGE_TESTDATA_MAX_BYTES:
+        raise too_large
+
+    writer = get_testdata_store().open_writer()
+    try:
+        async for chunk in request.stream():
+            # Content-Length may be absent (chunked) or wrong: count what actually arrives
+            if writer.size + len(chunk) > JUDGE_TESTDATA_MAX_BYTES:
+                raise too_large
+            writer.write(chunk)
+    except BaseException:
+        writer.abort()
+        raise
+    try:
+        # Checked on commit: the same bytes already stored take no extra room
+        ref = writer.commit()
+    except StoreFull as e:
+        raise HTTPException(status_code=507, detail=str(e))
+    return {"ref": ref, "size": writer.size}
+
+
+@router.post("/judge/parts/{part_id}/regrade")
+def judge_regrade_part(part_id: str, request: Request = None) -> dict:
+    """
+    Queue an incremental regrade of the part's stored submissions: only those
+    judged against older test data, and only their new or changed test cases.
+    Poll GET /submit/{submission_id} for the per-user table. Instructors only.
+    """
+    _require_instructor(request)
+    submission_id = _submit_job(
+        lambda on_event: {"project_id": part_id, **regrade_part(part_id)},
+        meta={"project_id": part_id, "language": "regrade"},
+        background=True,
+    )
+    return {"submission_id": submission_id, "status": "queued"}
+
+
 @router.post("/complete")
 def complete(req: CompleteRequest):
     from users.repo import get_db
@@ -0,0 +1,107 @@
+"""
+Admission ordering: FIFO among waiters, background behind interactive, and
+tickets nobody waits on never hold up the line.
+"""
+import threading
+import time
+
+import pytest
+
+from judge import jobs
+from judge.admission import AdmissionController, Overloaded
+
+
+def _waiter(ctl, order, name, background=False, hold=0.05, started=None):
+    def run():
+        if started is not None:
+            started.set()
+        with ctl.admit(background=background):
+            order.append(name)
+            time.sleep(hold)
+
+    t = threading.Thread(target=run, daemon=True)
+    t.start()
+    return t
+
+
+def _wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_fifo_and_background_last():
+    ctl = AdmissionController(max_concurrent=1, max_queued=8, per_user=0)
+    order = []
+    with ctl.admit():
+        threads = [_waiter(ctl, order, "bg", background=True)]
+        _wait_until(lambda: ctl.stats()["queued_background"] == 1)
+        for name in ("a", "b", "c"):
+            threads.append(_waiter(ctl, order, name))
+            _wait_until(lambda: ctl.stats()["queued"] == len(threads) - 1)
+    for t in threads:
+        t.join(5)
+    assert order == ["a", "b", "c", "bg"]
+
+
+def test_idle_ticket_does_not_block():
+    ctl = AdmissionController(max_concurrent=1, max_queued=8, per_user=0)
+    idle = ctl.enter()
+    started = time.monotonic()
+    with ctl.admit():
+        pass
+    with ctl.admit(background=True):
+        pass
+    assert time.monotonic() - started < 1.0
+    # Once someone waits on it, it goes ahead of the tickets taken after it
+    order = []
+    with ctl.admit():
+        t = _waiter(ctl, order, "later")
+        _wait_until(lambda: ctl.stats()["queued"] == 2)
+        waiter = threading.Thread(target=lambda: (idle.wait(5), order.append("idle"), idle.release()), daemon=True)
+        waiter.start()
+        time.sleep(0.05)
+    t.join(5)
+    waiter.join(5)
+    assert order == ["idle", "later"]
+
+
+def test_limits():
+    ctl = AdmissionController(max_concurrent=1, max_queued=2, per_user=1)
+    first = ctl.enter("u")
+    with pytest.raises(Overloaded):
+        ctl.enter("u")
+    ctl.enter("v")
+    with pytest.raises(Overloaded):
+        ctl.enter("w")  # queue full
+    first.release()
+    ctl.enter("u").release()
+
+
+def test_async_submit_behind_batch_jobs_does_not_deadlock():
+    """
+    Two batch-style jobs wait on background admission while an interactive
+    ticket taken at request time waits for a job worker. Neither may wait
+    on the other.
+    """
+    ctl = AdmissionController(max_concurrent=1, max_queued=8, per_user=0)
+    hold = ctl.enter()
+    hold.wait()
+
+    def batch(on_event):
+        with ctl.admit(background=True):
+            return {"status": "done"}
+
+    ticket = ctl.enter()
+
+    def submit(on_event):
+        with ticket:
+            return {"status": "accepted"}
+
+    ids = [jobs.submit_job(batch, background=True) for _ in range(2)]
+    ids.append(jobs.submit_job(submit))
+    time.sleep(0.05)
+    hold.release()
+    _wait_until(lambda: all(jobs.get_job(i)["status"] == "done" for i in ids))
+    assert [jobs.get_job(i)["result"]["status"] for i in ids] == ["done", "done", "accepted"]
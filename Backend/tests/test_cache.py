@@ -0,0 +1,36 @@
+"""
+TTLCache bounded by total size as well as entry count.
+"""
+from core.cache import TTLCache
+
+
+def test_evicts_oldest_past_max_bytes():
+    cache = TTLCache(max_entries=100, ttl_sec=60, max_bytes=10, sizeof=len)
+    cache.set("a", "xxxx")
+    cache.set("b", "xxxx")
+    cache.get("a")  # a is now the most recently used
+    cache.set("c", "xxxx")
+    assert cache.get("b") is None
+    assert cache.get("a") == "xxxx"
+    assert cache.get("c") == "xxxx"
+    assert cache.stats()["bytes"] == 8
+
+
+def test_oversized_value_is_not_stored():
+    cache = TTLCache(max_entries=100, ttl_sec=60, max_bytes=10, sizeof=len)
+    cache.set("a", "xxxx")
+    cache.set("a", "x" * 11)
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 0
+
+
+def test_replacing_and_invalidating_keep_the_total():
+    cache = TTLCache(max_entries=100, ttl_sec=60, max_bytes=100, sizeof=len)
+    cache.set("a", "xxxx")
+    cache.set("a", "xx")
+    cache.set("b", "xxx")
+    assert cache.stats()["bytes"] == 5
+    cache.invalidate("b")
+    assert cache.stats()["bytes"] == 2
+    cache.clear()
+    assert cache.stats()["bytes"] == 0
@@ -0,0 +1,105 @@
+"""
+The streaming matchers must agree with comparing whole outputs, however the
+output is split into chunks.
+"""
+import random
+from collections import Counter
+
+from judge.compare import (
+    StreamingMatcher,
+    TokenMatcher,
+    UnorderedLinesMatcher,
+    expected_file_lines,
+    normalize,
+    text_tokens,
+)
+
+_ALPHABET = [" ", "\n", "\r", "\t", "a", "b", "1", "é"]
+_ROUNDS = 20000
+
+
+def _random_text(rng: random.Random) -> str:
+    return "".join(rng.choice(_ALPHABET) for _ in range(rng.randint(0, 12)))
+
+
+def _pair(rng: random.Random):
+    expected = _random_text(rng)
+    roll = rng.random()
+    if roll < 0.3:
+        actual = expected
+    elif roll < 0.5:
+        # Same text with different line endings and trailing whitespace
+        actual = expected.replace("\n", rng.choice(["\n", "\r\n", " \n"])) + rng.choice(["", "\n", "\n\n", " "])
+    else:
+        actual = _random_text(rng)
+    return actual, expected
+
+
+def _feed(matcher, actual: str, rng: random.Random) -> bool:
+    """
+    Feed actual in random chunks (splitting UTF-8 sequences too); returns
+    matcher.finish(). Once feed() reports a mismatch it must stick.
+    """
+    data = actual.encode("utf-8")
+    i = 0
+    stopped = False
+    while i < len(data):
+        k = rng.randint(1, 4)
+        if not matcher.feed(data[i:i + k]):
+            stopped = True
+        i += k
+    result = matcher.finish()
+    assert not (stopped and result)
+    return result
+
+
+def test_streaming_matcher_equals_normalize():
+    rng = random.Random(1)
+    for _ in range(_ROUNDS):
+        actual, expected = _pair(rng)
+        assert _feed(StreamingMatcher(expected), actual, rng) == (normalize(actual) == normalize(expected)), (
+            actual,
+            expected,
+        )
+
+
+def test_streaming_matcher_with_file_expected(tmp_path):
+    rng = random.Random(2)
+    path = tmp_path / "expected"
+    for _ in range(2000):
+        actual, expected = _pair(rng)
+        path.write_bytes(expected.encode("utf-8"))
+        matcher = StreamingMatcher(lines=expected_file_lines(str(path)))
+        assert _feed(matcher, actual, rng) == (normalize(actual) == normalize(expected)), (actual, expected)
+
+
+def test_stops_at_first_wrong_line():
+    matcher = StreamingMatcher("1\n2\n3")
+    assert matcher.feed(b"1\n")
+    assert not matcher.feed(b"4\n")
+    assert not matcher.finish()
+
+
+def test_token_matcher_equals_split():
+    rng = random.Random(3)
+    for _ in range(_ROUNDS):
+        actual, expected = _pair(rng)
+        assert _feed(TokenMatcher(text_tokens(expected)), actual, rng) == (actual.split() == expected.split()), (
+            actual,
+            expected,
+        )
+
+
+def test_unordered_lines_matcher_equals_counter():
+    def lines(text: str) -> Counter:
+        return Counter(line.strip() for line in text.replace("\r\n", "\n").replace("\r", "\n").split("\n") if line.strip())
+
+    rng = random.Random(4)
+    for _ in range(_ROUNDS):
+        actual, expected = _pair(rng)
+        if rng.random() < 0.3:
+            shuffled = expected.split("\n")
+            rng.shuffle(shuffled)
+            actual = "\n".join(shuffled)
+        matcher = UnorderedLinesMatcher(expected.splitlines())
+        assert _feed(matcher, actual, rng) == (lines(actual) == lines(expected)), (actual, expected)
@@ -0,0 +1,70 @@
+"""
+Judge modes: which test cases run, which are reported as skipped.
+"""
+import threading
+
+import pytest
+
+from judge.modes import run_cases, submission_status
+
+
+def _runner(failing):
+    ran = []
+    lock = threading.Lock()
+
+    def run_one(case):
+        with lock:
+            ran.append(case[0])
+        return {"id": f"tc{case[0]}", "passed": case[0] not in failing, "skipped": False}
+
+    return run_one, ran
+
+
+CASES = [(i, "", "") for i in range(1, 7)]
+
+
+def _skipped(results):
+    return [r["id"] for r in results if r.get("skipped")]
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_fail_fast_skips_everything_after_the_first_failure(parallel):
+    run_one, ran = _runner(failing={3, 5})
+    results = run_cases(run_one, CASES, mode="fail_fast", parallel=parallel)
+    assert [r["id"] for r in results] == [f"tc{i}" for i in range(1, 7)]
+    assert [r["passed"] for r in results[:3]] == [True, True, False]
+    # tc5 failing too doesn't matter: past the first failure it's skipped
+    assert _skipped(results) == ["tc4", "tc5", "tc6"]
+    if not parallel:
+        assert sorted(ran) == [1, 2, 3]
+    assert submission_status(results) == "wrong_answer"
+
+
+def test_fail_fast_all_pass():
+    run_one, ran = _runner(failing=set())
+    results = run_cases(run_one, CASES, mode="fail_fast", parallel=False)
+    assert _skipped(results) == []
+    assert sorted(ran) == [1, 2, 3, 4, 5, 6]
+    assert submission_status(results) == "accepted"
+
+
+def test_sample_first_stops_after_a_failing_sample():
+    run_one, ran = _runner(failing={2})
+    results = run_cases(run_one, CASES, mode="sample_first", sample_count=2, parallel=False)
+    assert sorted(ran) == [1, 2]
+    assert _skipped(results) == ["tc3", "tc4", "tc5", "tc6"]
+
+
+def test_sample_first_runs_hidden_tests_after_passing_samples():
+    run_one, ran = _runner(failing={5})
+    results = run_cases(run_one, CASES, mode="sample_first", sample_count=2, parallel=False)
+    assert sorted(ran) == [1, 2, 3, 4, 5, 6]
+    assert _skipped(results) == []
+    assert [r["passed"] for r in results] == [True, True, True, True, False, True]
+
+
+def test_full_runs_everything():
+    run_one, ran = _runner(failing={1})
+    results = run_cases(run_one, CASES, mode="full", parallel=False)
+    assert sorted(ran) == [1, 2, 3, 4, 5, 6]
+    assert _skipped(results) == []
@@ -0,0 +1,39 @@
+"""
+prescreen_local blocks only unmistakable requests for the whole solution.
+"""
+import os
+
+import pytest
+
+pytest.importorskip("httpx")
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
+
+from ai_utils import prescreen_local  # noqa: E402
+
+
+@pytest.mark.parametrize("text", [
+    "Write the entire program for me",
+    "can you please give me the full solution",
+    "Just give me the code",
+    "just send the answer",
+    "I'm stuck. Give me the complete code.",
+    "give me the code for the whole assignment",
+    "Please do my homework for me",
+    "solve this for me",
+])
+def test_blocks_extraction_requests(text):
+    assert prescreen_local(text)
+
+
+@pytest.mark.parametrize("text", [
+    "Why does my loop never stop?",
+    "Can you explain what a complete binary tree is?",
+    "Is my solution complete, or am I missing a case?",
+    "Show me the whole program structure so I can plan it",
+    "Give me pseudocode for the full solution",
+    "Could you outline the entire program?",
+    "How do I write the full name to the file?",
+    "My code for the entire project crashes on line 3",
+])
+def test_allows_questions_and_plan_requests(text):
+    assert not prescreen_local(text)
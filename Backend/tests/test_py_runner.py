@@ -0,0 +1,63 @@
+"""
+A zygote run must look like running `python3 script.py` in a fresh interpreter.
+"""
+import sys
+import time
+
+import pytest
+
+from judge.compare import StreamingMatcher
+from judge.py_runner import ZygotePool
+from judge.sandbox import run_limited
+
+pytestmark = pytest.mark.skipif(sys.platform != "linux", reason="the zygote pool needs fork and /proc")
+
+SCRIPTS = {
+    "echo": "print(int(input()) * 2)",
+    "exit_code": "import sys\nprint('x')\nsys.exit(3)",
+    "exit_message": "raise SystemExit('bye')",
+    "exception": "def f():\n    1 / 0\nf()",
+    "keyboard_interrupt": "print('a')\nraise KeyboardInterrupt",
+    "os_exit": "import os\nprint('buffered')\nos._exit(0)",
+    "syntax_error": "def (:\n",
+    "atexit": "import atexit\natexit.register(lambda: print('bye'))\nprint('hi')",
+    "modules": "import sys\nprint(sorted(sys.modules))",
+    "main_module": "import os, sys\nprint(__name__, __file__ == sys.argv[0], __spec__, sys.path[0] == os.path.dirname(__file__))",
+    "unicode": "print('héllo ✓')",
+}
+FIELDS = ("exit_code", "stdout", "stderr", "timed_out", "stopped_early", "output_limit_exceeded")
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = ZygotePool(1)
+    yield pool
+    pool.close()
+
+
+@pytest.mark.parametrize("name", sorted(SCRIPTS))
+def test_matches_fresh_interpreter(pool, tmp_path, name):
+    script = tmp_path / f"{name}.py"
+    script.write_text(SCRIPTS[name] + "\n", encoding="utf-8")
+    warm = pool.run(str(script), "21\n", 5.0)
+    fresh = run_limited(["python3", str(script)], "21\n", 5.0)
+    assert {k: warm[k] for k in FIELDS} == {k: fresh[k] for k in FIELDS}
+
+
+def test_stops_early_on_wrong_output(pool, tmp_path):
+    script = tmp_path / "spam.py"
+    script.write_text("while True:\n    print('wrong')\n", encoding="utf-8")
+    started = time.monotonic()
+    result = pool.run(str(script), "", 5.0, matcher=StreamingMatcher("42"))
+    assert result["stopped_early"] and not result["timed_out"]
+    assert time.monotonic() - started < 2.0
+
+
+def test_time_limit(pool, tmp_path):
+    script = tmp_path / "spin.py"
+    script.write_text("while True:\n    pass\n", encoding="utf-8")
+    result = pool.run(str(script), "", 0.5)
+    assert result["timed_out"]
+    # The zygote survives its child being killed
+    script.write_text("print('ok')\n", encoding="utf-8")
+    assert pool.run(str(script), "", 5.0)["stdout"] == "ok\n"
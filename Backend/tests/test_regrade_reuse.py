@@ -0,0 +1,66 @@
+"""
+A regrade reruns only the test cases that were added or changed.
+"""
+import sys
+
+import pytest
+
+pytest.importorskip("firebase_admin")
+pytestmark = pytest.mark.skipif(sys.platform != "linux", reason="the judge sandbox needs Linux")
+
+from judge.drivers import get_driver  # noqa: E402
+from judge.engine import judge_code  # noqa: E402
+from judge.submissions import _stored_tests  # noqa: E402
+
+CODE = "print(2 * int(input()))"
+
+
+@pytest.fixture
+def driver(monkeypatch):
+    driver = get_driver("py")
+    runs = []
+    real_run = driver.run
+
+    def run(artifact, stdin_data, *args, **kwargs):
+        runs.append(stdin_data)
+        return real_run(artifact, stdin_data, *args, **kwargs)
+
+    monkeypatch.setattr(driver, "run", run)
+    monkeypatch.setattr(driver, "runs", runs, raising=False)
+    return driver
+
+
+def test_only_new_and_changed_cases_run(driver):
+    v1 = {"id": "p", "inputs": ["1\n", "2\n", "3\n"], "outputs": ["2", "4", "6"]}
+    first = judge_code(driver, v1, CODE)
+    assert first["status"] == "accepted"
+    previous = _stored_tests(v1, first)
+
+    # tc3's expected output changes, tc4 is new
+    v2 = {"id": "p", "inputs": ["1\n", "2\n", "3\n", "4\n"], "outputs": ["2", "4", "7", "8"]}
+    driver.runs.clear()
+    result = judge_code(driver, v2, CODE, reuse=previous)
+
+    assert sorted(driver.runs) == ["3\n", "4\n"]
+    assert [t["id"] for t in result["tests"]] == ["tc1", "tc2", "tc3", "tc4"]
+    assert [t["passed"] for t in result["tests"]] == [True, True, False, True]
+    assert result["status"] == "wrong_answer"
+
+
+def test_changed_limits_invalidate_every_case(driver):
+    v1 = {"id": "p", "inputs": ["1\n", "2\n"], "outputs": ["2", "4"]}
+    previous = _stored_tests(v1, judge_code(driver, v1, CODE))
+
+    driver.runs.clear()
+    judge_code(driver, {**v1, "time_limit_sec": 5}, CODE, reuse=previous)
+    assert sorted(driver.runs) == ["1\n", "2\n"]
+
+
+def test_nothing_changed_runs_nothing(driver):
+    v1 = {"id": "p", "inputs": ["1\n", "2\n"], "outputs": ["2", "4"]}
+    previous = _stored_tests(v1, judge_code(driver, v1, CODE))
+
+    driver.runs.clear()
+    result = judge_code(driver, v1, CODE, reuse=previous)
+    assert driver.runs == []
+    assert result["status"] == "accepted"
@@ -0,0 +1,86 @@
+"""
+assess_risk tiers, and the rule that only watchdog-approved answers are cached.
+"""
+import asyncio
+import os
+
+import pytest
+
+pytest.importorskip("httpx")
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
+
+import ai_utils  # noqa: E402
+from ai_utils import assess_risk  # noqa: E402
+from tutor_cache import TutorCache  # noqa: E402
+
+USER_CODE = "def total(xs):\n    s = 0\n    for x in xs:\n        s += x\n"
+
+
+def test_short_hint_is_low():
+    assert assess_risk("Check what your loop returns when xs is empty.", USER_CODE)["tier"] == "low"
+
+
+def test_quoting_the_students_code_is_low():
+    draft = "This line never runs for an empty list:\n```python\ns += x\n```\nWhat should total return then?"
+    assert assess_risk(draft, USER_CODE)["tier"] == "low"
+
+
+def test_prose_walkthrough_is_not_low():
+    draft = (
+        "First, read the numbers into a list. Then sort them. Next, walk the list keeping a running sum. "
+        "After that, compare it with the target. Finally, print the index."
+    )
+    risk = assess_risk(draft, "")
+    assert risk["steps"] >= 5
+    assert risk["tier"] == "high"
+
+
+def test_numbered_steps_are_not_low():
+    draft = "1. Read n\n2. Loop from 1 to n\n3. Add each i to the sum\n"
+    assert assess_risk(draft, "")["tier"] != "low"
+
+
+def test_presented_as_complete_is_not_low():
+    assert assess_risk("Add a return at the end and you're done.", USER_CODE)["tier"] != "low"
+
+
+def test_complete_program_is_high():
+    draft = (
+        "```python\ndef solve():\n    n = int(input())\n    print(n * 2)\n\n"
+        "if __name__ == '__main__':\n    solve()\n```"
+    )
+    risk = assess_risk(draft, "")
+    assert risk["complete_program"]
+    assert risk["tier"] == "high"
+
+
+def _ask(monkeypatch, draft, verdict):
+    cache = TutorCache(max_entries=16, ttl_sec=60)
+    monkeypatch.setattr(ai_utils, "get_tutor_cache", lambda: cache)
+
+    async def chat(**kwargs):
+        return {"choices": [{"message": {"content": draft}}]}
+
+    async def watchdog(**kwargs):
+        return verdict
+
+    monkeypatch.setattr(ai_utils, "openrouter_chat", chat)
+    monkeypatch.setattr(ai_utils, "watchdog_check", watchdog)
+    answer = asyncio.run(ai_utils.call_llm("why is my total wrong", USER_CODE, "Sum a list"))
+    cached = cache.get("why is my total wrong", USER_CODE, "Sum a list", ai_utils.MAIN_MODEL, ai_utils.POLICY_VERSION)
+    return answer, cached
+
+
+def test_locally_approved_draft_is_not_cached(monkeypatch):
+    monkeypatch.setattr(ai_utils, "TUTOR_RISK_SKIP_WATCHDOG", True)
+    hint = "Check what your loop returns when xs is empty."
+    answer, cached = _ask(monkeypatch, hint, {"ok": False})
+    assert answer == hint
+    assert cached is None
+
+
+def test_watchdog_approved_draft_is_cached(monkeypatch):
+    monkeypatch.setattr(ai_utils, "TUTOR_RISK_SKIP_WATCHDOG", False)
+    hint = "Check what your loop returns when xs is empty."
+    answer, cached = _ask(monkeypatch, hint, {"ok": True, "reason": "", "risk": "low", "fix": ""})
+    assert answer == cached == hint
@@ -0,0 +1,58 @@
+"""
+StreamingPostFilter must reach the same verdict as simple_post_filter on
+the finished draft, however the draft is split into deltas.
+"""
+import os
+
+import pytest
+
+pytest.importorskip("httpx")
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
+
+from ai_utils import MAX_CODE_LINES, StreamingPostFilter, simple_post_filter  # noqa: E402
+
+
+def _feed(draft, size):
+    f = StreamingPostFilter()
+    for i in range(0, len(draft), size):
+        if not f.feed(draft[i:i + size]):
+            break
+    return f
+
+
+def _code(lines):
+    return "```python\n" + "".join(f"x{i} = {i}\n" for i in range(lines)) + "```\n"
+
+
+DRAFTS = [
+    "Try printing the loop variable on each pass.",
+    "Look at this part:\n" + _code(MAX_CODE_LINES) + "What happens when n is 0?",
+    "Look at this part:\n" + _code(MAX_CODE_LINES + 1),
+    "Two pieces:\n" + _code(8) + "and\n" + _code(8),
+    "Sure, here is the full solution you asked for.",
+    "That would be a Complete Solution, which I can't write.",
+]
+
+
+@pytest.mark.parametrize("draft", DRAFTS)
+@pytest.mark.parametrize("size", [1, 3, 7, 1000])
+def test_matches_simple_post_filter(draft, size):
+    assert _feed(draft, size).ok == simple_post_filter(draft)[0]
+
+
+def test_cuts_off_inside_an_open_block():
+    f = StreamingPostFilter()
+    assert f.feed("```python\n")
+    for i in range(MAX_CODE_LINES):
+        assert f.feed(f"x{i} = {i}\n")
+    assert not f.feed("y = 1\n")
+    assert f.reason == "Too much code in response."
+    # Nothing more is accepted once it has tripped
+    assert not f.feed("fine text")
+
+
+def test_phrase_split_across_deltas():
+    f = StreamingPostFilter()
+    assert f.feed("OK, here is the fu")
+    assert not f.feed("ll solution:")
+    assert f.reason == "Looks like a full solution."
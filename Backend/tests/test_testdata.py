@@ -0,0 +1,24 @@
+"""
+The test data store stays under its total size cap.
+"""
+import pytest
+
+from judge import testdata
+from judge.testdata import StoreFull
+
+
+def test_store_rejects_blobs_past_the_total_cap(tmp_path):
+    store = testdata.TestDataStore(str(tmp_path), max_total_bytes=10)
+    ref = store.put_bytes(b"123456")
+    assert store.resolve(ref).size == 6
+    with pytest.raises(StoreFull):
+        store.put_bytes(b"abcdef")
+    # The same bytes again take no extra space
+    assert store.put_bytes(b"123456") == ref
+    assert store.total_bytes == 6
+    assert not list(tmp_path.glob(".tmp_*"))
+
+
+def test_store_counts_existing_blobs(tmp_path):
+    testdata.TestDataStore(str(tmp_path)).put_bytes(b"1234")
+    assert testdata.TestDataStore(str(tmp_path), max_total_bytes=10).total_bytes == 4
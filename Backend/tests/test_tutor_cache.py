@@ -0,0 +1,50 @@
+"""
+Near-duplicate tutor cache lookups must never answer a different question.
+"""
+import pytest
+
+import tutor_cache
+from tutor_cache import TutorCache
+
+CODE = "def loop(n):\n    while True:\n        pass\n"
+QUESTION = "why does my loop never stop when n is negative"
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setattr(tutor_cache, "TUTOR_CACHE_NEAR_DUP", True)
+    cache = TutorCache(max_entries=16, ttl_sec=60)
+    cache.set(QUESTION, CODE, "Loops", "model", "v1", "answer")
+    return cache
+
+
+def test_near_dup_is_off_by_default(monkeypatch):
+    monkeypatch.setattr(tutor_cache, "TUTOR_CACHE_NEAR_DUP", False)
+    cache = TutorCache(max_entries=16, ttl_sec=60)
+    cache.set(QUESTION, CODE, "Loops", "model", "v1", "answer")
+    assert cache.get(QUESTION + " please", CODE, "Loops", "model", "v1") is None
+    assert cache.get("Why does my loop NEVER stop when n is negative?", CODE, "Loops", "model", "v1") == "answer"
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "why does my loop never stop when n is positive",
+        "why does my loop always stop when n is negative",
+        "why does my loop stop when n is negative",
+        "why does my loop never stop when n is not negative",
+        "why does my loop never start when n is negative",
+    ],
+)
+def test_meaning_changes_do_not_match(cache, question):
+    assert cache.get(question, CODE, "Loops", "model", "v1") is None
+
+
+def test_filler_changes_match(cache):
+    assert cache.get("please why does my loop never stop when n is negative", CODE, "Loops", "model", "v1") == "answer"
+    assert cache.stats()["near_hits"] == 1
+
+
+def test_other_code_or_project_does_not_match(cache):
+    assert cache.get(QUESTION, CODE + "# changed\n", "Loops", "model", "v1") is None
+    assert cache.get(QUESTION, CODE, "Recursion", "model", "v1") is None
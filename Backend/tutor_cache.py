@@ -0,0 +1,168 @@
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+
+from core.cache import TTLCache
+
+TUTOR_CACHE = os.getenv("TUTOR_CACHE", "1") == "1"
+TUTOR_CACHE_TTL_SEC = float(os.getenv("TUTOR_CACHE_TTL_SEC", "3600"))
+TUTOR_CACHE_MAX = int(os.getenv("TUTOR_CACHE_MAX", "4096"))
+# Near-duplicate lookup (opt-in): reuse an answer to a similar question about
+# the same code and project (word + bigram Jaccard similarity of the
+# questions, differing only in filler words)
+TUTOR_CACHE_NEAR_DUP = os.getenv("TUTOR_CACHE_NEAR_DUP", "0") == "1"
+TUTOR_CACHE_SIMILARITY = float(os.getenv("TUTOR_CACHE_SIMILARITY", "0.8"))
+# Questions remembered per (code, project, model, policy) for the near-duplicate lookup
+TUTOR_CACHE_BUCKET_MAX = int(os.getenv("TUTOR_CACHE_BUCKET_MAX", "64"))
+
+_WORD_RE = re.compile(r"[a-z0-9_+#]+")
+# Words two near-duplicate questions may differ in. Anything else (a
+# negation, "positive" for "negative") can change what is being asked.
+_FILLER_WORDS = frozenset(
+    "a an the please pls can could would you i me my we to just so um hi hey thanks thank "
+    "help really exactly again here there this that".split()
+)
+
+
+def normalize_question(text: str) -> str:
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+
+def _normalize_code(code: str) -> str:
+    return "\n".join(line.rstrip() for line in code.replace("\r\n", "\n").split("\n")).strip()
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _shingles(question: str) -> FrozenSet[str]:
+    words = question.split()
+    return frozenset(words + [f"{a} {b}" for a, b in zip(words, words[1:])])
+
+
+def _similarity(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _same_content_words(a: str, b: str) -> bool:
+    return set(a.split()) ^ set(b.split()) <= _FILLER_WORDS
+
+
+class TutorCache:
+    """
+    Watchdog-approved tutor answers, keyed on the normalized question, the
+    user's code, the project description, the model and the policy version.
+
+    Exact lookups go through a TTLCache. Near-duplicate lookups compare the
+    question against the others asked about the same code and project; a
+    match must be similar enough and differ only in filler words, and the
+    answer is only reused if that entry is still live in the exact cache.
+    """
+
+    def __init__(self, max_entries: int, ttl_sec: float):
+        self._exact = TTLCache(max_entries=max_entries, ttl_sec=ttl_sec)
+        self._lock = threading.Lock()
+        # context key -> {exact key: question shingles}, least recently added first
+        self._buckets: "OrderedDict[Tuple, OrderedDict[Tuple, FrozenSet[str]]]" = OrderedDict()
+        self.max_buckets = max_entries
+        self.near_hits = 0
+
+    @staticmethod
+    def keys(question: str, code: str, project_description: str, model: str, policy_version: str) -> Tuple[Tuple, Tuple]:
+        """
+        (exact key, context key): the context key leaves out the question.
+        """
+        context = (
+            _digest(_normalize_code(code)),
+            _digest(" ".join(project_description.split())),
+            model,
+            policy_version,
+        )
+        return (normalize_question(question), *context), context
+
+    def get(
+        self, question: str, code: str, project_description: str, model: str, policy_version: str
+    ) -> Optional[str]:
+        exact_key, context = self.keys(question, code, project_description, model, policy_version)
+        answer = self._exact.get(exact_key)
+        if answer is not None or not TUTOR_CACHE_NEAR_DUP:
+            return answer
+
+        shingles = _shingles(exact_key[0])
+        with self._lock:
+            bucket = self._buckets.get(context)
+            candidates = list(bucket.items()) if bucket else []
+        best_key, best = None, TUTOR_CACHE_SIMILARITY
+        for key, other in candidates:
+            score = _similarity(shingles, other)
+            if score >= best and _same_content_words(exact_key[0], key[0]):
+                best_key, best = key, score
+        if best_key is None:
+            return None
+        answer = self._exact.get(best_key)
+        if answer is None:
+            # Expired or evicted: forget it here too
+            with self._lock:
+                bucket = self._buckets.get(context)
+                if bucket is not None:
+                    bucket.pop(best_key, None)
+            return None
+        with self._lock:
+            self.near_hits += 1
+        return answer
+
+    def set(
+        self, question: str, code: str, project_description: str, model: str, policy_version: str, answer: str
+    ) -> None:
+        exact_key, context = self.keys(question, code, project_description, model, policy_version)
+        self._exact.set(exact_key, answer)
+        if not TUTOR_CACHE_NEAR_DUP:
+            return
+        with self._lock:
+            bucket = self._buckets.get(context)
+            if bucket is None:
+                bucket = self._buckets[context] = OrderedDict()
+            self._buckets.move_to_end(context)
+            bucket[exact_key] = _shingles(exact_key[0])
+            bucket.move_to_end(exact_key)
+            while len(bucket) > TUTOR_CACHE_BUCKET_MAX:
+                bucket.popitem(last=False)
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+
+    def clear(self) -> None:
+        self._exact.clear()
+        with self._lock:
+            self._buckets.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._exact.stats()
+        with self._lock:
+            stats["near_hits"] = self.near_hits
+            stats["contexts"] = len(self._buckets)
+        return stats
+
+
+_cache: Optional[TutorCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_tutor_cache() -> Optional[TutorCache]:
+    """
+    The process-wide tutor cache, or None when TUTOR_CACHE=0.
+    """
+    global _cache
+    if not TUTOR_CACHE:
+        return None
+    if _cache is not None:
+        return _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TutorCache(TUTOR_CACHE_MAX, TUTOR_CACHE_TTL_SEC)
+    return _cache
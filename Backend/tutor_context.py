@@ -0,0 +1,53 @@
+import asyncio
+import os
+from typing import Any, Dict, Optional
+
+from core.cache import TTLCache
+from judge.testdata import load_manifest
+from users.repo import get_db
+
+TUTOR_CONTEXT_TTL_SEC = float(os.getenv("TUTOR_CONTEXT_TTL_SEC", "600"))
+TUTOR_CONTEXT_MAX = int(os.getenv("TUTOR_CONTEXT_MAX", "1024"))
+
+_contexts = TTLCache(max_entries=TUTOR_CONTEXT_MAX, ttl_sec=TUTOR_CONTEXT_TTL_SEC)
+
+
+def format_project_context(part: Dict[str, Any]) -> str:
+    """
+    The tutor's view of a part: its name and description only (never test data).
+    """
+    name = (part.get("name") or "").strip()
+    description = (part.get("description") or "").strip()
+    return f"Project: {name}\n\n{description}" if name else description
+
+
+def _fetch_context(part_id: str) -> Optional[str]:
+    doc = get_db().collection("parts").document(part_id).get()
+    if doc.exists:
+        return format_project_context(doc.to_dict() or {})
+    # Projects from the local manifest (projects.json)
+    local = load_manifest().get("projects", {}).get(part_id)
+    return format_project_context(local) if local is not None else None
+
+
+async def get_project_context(part_id: str) -> Optional[str]:
+    """
+    Project context for a part, from the parts collection through an
+    in-process TTL cache, or None if there is no such part. Misses are
+    fetched on a worker thread so the event loop never waits on Firestore.
+    """
+    key = str(part_id)
+    context = _contexts.get(key)
+    if context is None:
+        context = await asyncio.to_thread(_fetch_context, key)
+        if context is not None:
+            _contexts.set(key, context)
+    return context
+
+
+def invalidate_project_context(part_id: str) -> bool:
+    return _contexts.invalidate(str(part_id))
+
+
+def project_context_stats() -> Dict[str, Any]:
+    return _contexts.stats()
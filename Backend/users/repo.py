@@ -9,9 +9,10 @@ from google.auth.exceptions import DefaultCredentialsError
 
 # --- Mock DB Implementation ---
 class MockSnapshot:
-    def __init__(self, data):
+    def __init__(self, data, doc_id=None):
         self._data = data
         self.exists = data is not None
+        self.id = doc_id
 
     def to_dict(self):
         return self._data
@@ -22,7 +23,7 @@ class MockDocument:
         self.id = doc_id
 
     def get(self):
-        return MockSnapshot(self._collection.get(self.id))
+        return MockSnapshot(self._collection.get(self.id), self.id)
 
     def set(self, data, merge=False):
         if merge and self.id in self._collection:
@@ -34,6 +35,22 @@ class MockDocument:
         if self.id in self._collection:
             self._collection[self.id].update(data)
 
+class MockQuery:
+    # Only equality filters, which is all the backend queries with
+    def __init__(self, docs, filters=()):
+        self._docs = docs
+        self._filters = filters
+
+    def where(self, field, op, value):
+        if op != "==":
+            raise NotImplementedError(f"MockQuery only supports '==', got {op!r}")
+        return MockQuery(self._docs, self._filters + ((field, value),))
+
+    def stream(self):
+        for doc_id, data in list(self._docs.items()):
+            if all(data.get(field) == value for field, value in self._filters):
+                yield MockSnapshot(data, doc_id)
+
 class MockCollection:
     def __init__(self):
         self._docs = {}
@@ -41,6 +58,12 @@ class MockCollection:
     def document(self, doc_id):
         return MockDocument(self._docs, doc_id)
 
+    def where(self, field, op, value):
+        return MockQuery(self._docs).where(field, op, value)
+
+    def stream(self):
+        return MockQuery(self._docs).stream()
+
     def add(self, data):
         # Simulate firestore .add() which returns (update_time, document_ref)
         # For mock, we just generate a random ID
@@ -84,10 +84,13 @@ const EditorPage = () => {
     console.log("Execution Payload:", payload)
 
     try {
+      // Signed-in users get their own per-user judge limits
+      const token = localStorage.getItem('token')
       const response = await fetch('http://localhost:8000/submit', {
         method: 'POST',
         headers: {
-          'Content-Type': 'application/json'
+          'Content-Type': 'application/json',
+          ...(token ? { 'Authorization': `Bearer ${token}` } : {})
         },
         body: JSON.stringify(payload)
       })
@@ -152,10 +155,13 @@ const EditorPage = () => {
     setIsSending(true)
     setError(null)
 
+    // With a part, the backend looks its description up itself; the
+    // generic description is the fallback when it doesn't know the part
     const requestBody = {
       text_from_user: messageToSend,
       code: code || '',
-      project_description: 'Code editor practice problem'
+      project_description: 'Code editor practice problem',
+      ...(partId ? { part_id: partId } : {})
     }
 
     try {